@@ -41,6 +41,14 @@ from app.models.user import User
 from app.models.task import Task
 from app.models.notification import Notification
 from app.models.user_setting import UserSetting
+from app.models.google_item import GoogleItem
+from app.models.google_sync_state import GoogleSyncState
+from app.models.reminder_delivery import ReminderDelivery
+from app.models.reminder_text import ReminderText
+from app.models.user_task_stats import UserTaskStats
+from app.models.daily_summary import DailySummary
+from app.models.user_daily_stats import UserDailyStats
+from app.models.job_run import JobRun
 
 target_metadata = Base.metadata
 
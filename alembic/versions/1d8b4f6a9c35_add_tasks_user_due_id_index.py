@@ -0,0 +1,28 @@
+"""Add index tasks (user_id, due_date, id) for keyset pagination
+
+Revision ID: 1d8b4f6a9c35
+Revises: 7a2f0d9e4b18
+Create Date: 2026-10-17 19:47:15.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d8b4f6a9c35'
+down_revision: Union[str, Sequence[str], None] = '7a2f0d9e4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_user_due_id', 'tasks', ['user_id', 'due_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_due_id', table_name='tasks')
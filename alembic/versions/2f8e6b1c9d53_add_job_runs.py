@@ -0,0 +1,33 @@
+"""Add job_runs (last run day of the daily background jobs)
+
+Revision ID: 2f8e6b1c9d53
+Revises: 6c1f3a8d2e47
+Create Date: 2026-10-17 21:48:06.927135
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8e6b1c9d53'
+down_revision: Union[str, Sequence[str], None] = '6c1f3a8d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_runs',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_run_on', sa.Date(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_runs')
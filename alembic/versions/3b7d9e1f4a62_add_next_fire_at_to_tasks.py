@@ -0,0 +1,51 @@
+"""Add next_fire_at reminder stage columns to tasks
+
+Revision ID: 3b7d9e1f4a62
+Revises: 560a2b3dab15
+Create Date: 2026-10-17 09:12:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e1f4a62'
+down_revision: Union[str, Sequence[str], None] = '560a2b3dab15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('reminder_offsets', sa.String(), nullable=True))
+    op.add_column('tasks', sa.Column('next_fire_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('next_fire_stage', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('last_fired_stage', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_tasks_next_fire_at'), 'tasks', ['next_fire_at'], unique=False)
+
+    # Carry over progress recorded by the legacy notified_* flags
+    op.execute("""
+        UPDATE tasks SET last_fired_stage = CASE
+            WHEN notified_due THEN 0
+            WHEN notified_10m THEN 10
+            WHEN notified_20m THEN 20
+        END
+    """)
+    # Let the first sweep compute the real next stage for every live task
+    op.execute("""
+        UPDATE tasks SET next_fire_at = now()
+        WHERE (status = 'pending' AND due_date IS NOT NULL)
+           OR (end_time IS NOT NULL AND notified_end IS NOT TRUE AND end_time >= now() - interval '5 minutes')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tasks_next_fire_at'), table_name='tasks')
+    op.drop_column('tasks', 'last_fired_stage')
+    op.drop_column('tasks', 'next_fire_stage')
+    op.drop_column('tasks', 'next_fire_at')
+    op.drop_column('tasks', 'reminder_offsets')
@@ -0,0 +1,50 @@
+"""Add user_task_stats counters
+
+Revision ID: 5e9a7c3b1d84
+Revises: f2b6c40d8a19
+Create Date: 2026-10-17 14:02:37.905116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a7c3b1d84'
+down_revision: Union[str, Sequence[str], None] = 'f2b6c40d8a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_tasks', sa.Integer(), nullable=False),
+    sa.Column('completed_tasks', sa.Integer(), nullable=False),
+    sa.Column('pending_tasks', sa.Integer(), nullable=False),
+    sa.Column('overdue_tasks', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Seed the counters from the existing tasks
+    op.execute("""
+        INSERT INTO user_task_stats (user_id, total_tasks, completed_tasks, pending_tasks, overdue_tasks)
+        SELECT user_id,
+               count(*),
+               count(*) FILTER (WHERE status = 'completed'),
+               count(*) FILTER (WHERE status = 'pending'),
+               count(*) FILTER (WHERE status = 'pending' AND due_date IS NOT NULL AND last_fired_stage = 0)
+        FROM tasks
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_task_stats')
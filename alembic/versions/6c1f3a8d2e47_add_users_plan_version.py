@@ -0,0 +1,28 @@
+"""Add users.plan_version for the shared daily plan cache invalidation
+
+Revision ID: 6c1f3a8d2e47
+Revises: 1d8b4f6a9c35
+Create Date: 2026-10-17 21:12:40.318524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1f3a8d2e47'
+down_revision: Union[str, Sequence[str], None] = '1d8b4f6a9c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('plan_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'plan_version')
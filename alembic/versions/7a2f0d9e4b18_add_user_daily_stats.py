@@ -0,0 +1,72 @@
+"""Add tasks.completed_at and the user_daily_stats rollup
+
+Revision ID: 7a2f0d9e4b18
+Revises: e5a19c7d3f20
+Create Date: 2026-10-17 19:08:52.371644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2f0d9e4b18'
+down_revision: Union[str, Sequence[str], None] = 'e5a19c7d3f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    # Best estimate for existing completions: the last update (written as IST wall clock, see get_ist_time)
+    op.execute("""
+        UPDATE tasks SET completed_at = updated_at - interval '5 hours 30 minutes'
+        WHERE status = 'completed' AND updated_at IS NOT NULL
+    """)
+
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created_tasks', sa.Integer(), nullable=False),
+    sa.Column('completed_tasks', sa.Integer(), nullable=False),
+    sa.Column('completed_on_time', sa.Integer(), nullable=False),
+    sa.Column('overdue_tasks', sa.Integer(), nullable=False),
+    sa.Column('completion_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Seed the whole history (same rules as daily_stats_service.RECONCILE_SQL)
+    op.execute("""
+        INSERT INTO user_daily_stats
+            (user_id, day, created_tasks, completed_tasks, completed_on_time, overdue_tasks, completion_seconds)
+        SELECT user_id, day, sum(created), sum(completed), sum(on_time), sum(overdue), sum(seconds)
+        FROM (
+            SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+                   1 AS created, 0 AS completed, 0 AS on_time, 0 AS overdue, 0 AS seconds
+            FROM tasks WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT user_id, (completed_at AT TIME ZONE 'Asia/Kolkata')::date,
+                   0, 1, CASE WHEN due_date IS NULL OR completed_at <= due_date THEN 1 ELSE 0 END, 0,
+                   GREATEST(floor(EXTRACT(EPOCH FROM completed_at - (created_at - interval '5 hours 30 minutes'))), 0)::bigint
+            FROM tasks WHERE status = 'completed' AND completed_at IS NOT NULL
+            UNION ALL
+            SELECT user_id, (due_date AT TIME ZONE 'Asia/Kolkata')::date, 0, 0, 0, 1, 0
+            FROM tasks WHERE due_date IS NOT NULL AND (
+                (status = 'completed' AND completed_at > due_date)
+                OR (status = 'pending' AND last_fired_stage = 0)
+            )
+        ) src
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id, day
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_daily_stats')
+    op.drop_column('tasks', 'completed_at')
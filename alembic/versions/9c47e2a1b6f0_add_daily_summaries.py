@@ -0,0 +1,44 @@
+"""Add daily_summaries for pre-built morning/evening summaries
+
+Revision ID: 9c47e2a1b6f0
+Revises: 5e9a7c3b1d84
+Create Date: 2026-10-17 15:20:11.482930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c47e2a1b6f0'
+down_revision: Union[str, Sequence[str], None] = '5e9a7c3b1d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('summary_type', sa.String(), nullable=False),
+    sa.Column('summary_date', sa.String(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('body', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'summary_type', 'summary_date', name='uq_daily_summaries_key')
+    )
+    op.create_index(op.f('ix_daily_summaries_id'), 'daily_summaries', ['id'], unique=False)
+    op.create_index(op.f('ix_daily_summaries_summary_date'), 'daily_summaries', ['summary_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_daily_summaries_summary_date'), table_name='daily_summaries')
+    op.drop_index(op.f('ix_daily_summaries_id'), table_name='daily_summaries')
+    op.drop_table('daily_summaries')
@@ -0,0 +1,61 @@
+"""Add google_items mirror and google_sync_state tables
+
+Revision ID: a4c2e8f17b03
+Revises: 3b7d9e1f4a62
+Create Date: 2026-10-17 10:05:44.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c2e8f17b03'
+down_revision: Union[str, Sequence[str], None] = '3b7d9e1f4a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('google_items',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('google_id', sa.String(), nullable=False),
+    sa.Column('list_id', sa.String(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('start_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted', sa.Boolean(), nullable=True),
+    sa.Column('raw', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('synced_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'kind', 'google_id', name='uq_google_items_user_kind_google_id')
+    )
+    op.create_index(op.f('ix_google_items_id'), 'google_items', ['id'], unique=False)
+    op.create_index(op.f('ix_google_items_start_at'), 'google_items', ['start_at'], unique=False)
+    op.create_index('ix_google_items_user_id_start_at', 'google_items', ['user_id', 'start_at'], unique=False)
+    op.create_table('google_sync_state',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('calendar_sync_token', sa.String(), nullable=True),
+    sa.Column('tasks_updated_min', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_google_sync_state_last_synced_at'), 'google_sync_state', ['last_synced_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_google_sync_state_last_synced_at'), table_name='google_sync_state')
+    op.drop_table('google_sync_state')
+    op.drop_index('ix_google_items_user_id_start_at', table_name='google_items')
+    op.drop_index(op.f('ix_google_items_start_at'), table_name='google_items')
+    op.drop_index(op.f('ix_google_items_id'), table_name='google_items')
+    op.drop_table('google_items')
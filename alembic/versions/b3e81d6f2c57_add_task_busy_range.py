@@ -0,0 +1,59 @@
+"""Add tasks.busy_range (tstzrange) with a GiST index for overlap checks
+
+Revision ID: b3e81d6f2c57
+Revises: 9c47e2a1b6f0
+Create Date: 2026-10-17 17:41:08.203716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e81d6f2c57'
+down_revision: Union[str, Sequence[str], None] = '9c47e2a1b6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated columns need an IMMUTABLE expression; timestamptz + interval is only
+    # STABLE in general (days/months depend on the session zone), but whole minutes don't.
+    # An end_time before due_date gives an empty range, which overlaps nothing.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION task_busy_range(due timestamptz, ends timestamptz, kind text)
+        RETURNS tstzrange LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT CASE WHEN due IS NULL THEN NULL ELSE tstzrange(
+                due,
+                GREATEST(due, COALESCE(ends, due + CASE WHEN kind = 'meeting' THEN interval '60 minutes' ELSE interval '30 minutes' END)),
+                '[)'
+            ) END
+        $$
+    """)
+    op.add_column('tasks', sa.Column(
+        'busy_range', postgresql.TSTZRANGE(),
+        sa.Computed('task_busy_range(due_date, end_time, type)', persisted=True), nullable=True
+    ))
+
+    # (user_id, busy_range) needs btree_gist for the integer column; without the
+    # extension, index the range alone and let the planner combine it with ix_tasks_user_id
+    bind = op.get_bind()
+    has_btree_gist = bind.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'"
+    )).scalar()
+    if has_btree_gist:
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.create_index('ix_tasks_user_busy_range', 'tasks', ['user_id', 'busy_range'], unique=False, postgresql_using='gist')
+    else:
+        op.create_index('ix_tasks_user_busy_range', 'tasks', ['busy_range'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_busy_range', table_name='tasks')
+    op.drop_column('tasks', 'busy_range')
+    op.execute("DROP FUNCTION IF EXISTS task_busy_range(timestamptz, timestamptz, text)")
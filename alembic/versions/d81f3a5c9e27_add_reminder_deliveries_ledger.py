@@ -0,0 +1,42 @@
+"""Add reminder_deliveries ledger
+
+Revision ID: d81f3a5c9e27
+Revises: a4c2e8f17b03
+Create Date: 2026-10-17 11:20:08.634170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3a5c9e27'
+down_revision: Union[str, Sequence[str], None] = 'a4c2e8f17b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reminder_deliveries',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('item_id', sa.String(), nullable=False),
+    sa.Column('stage', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source', 'item_id', 'stage', name='uq_reminder_deliveries_key')
+    )
+    op.create_index(op.f('ix_reminder_deliveries_created_at'), 'reminder_deliveries', ['created_at'], unique=False)
+    op.create_index(op.f('ix_reminder_deliveries_user_id'), 'reminder_deliveries', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reminder_deliveries_user_id'), table_name='reminder_deliveries')
+    op.drop_index(op.f('ix_reminder_deliveries_created_at'), table_name='reminder_deliveries')
+    op.drop_table('reminder_deliveries')
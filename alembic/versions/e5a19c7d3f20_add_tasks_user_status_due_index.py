@@ -0,0 +1,31 @@
+"""Add covering index tasks (user_id, status, due_date) INCLUDE (last_fired_stage)
+
+Revision ID: e5a19c7d3f20
+Revises: b3e81d6f2c57
+Create Date: 2026-10-17 18:26:44.917350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a19c7d3f20'
+down_revision: Union[str, Sequence[str], None] = 'b3e81d6f2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tasks_user_status_due', 'tasks', ['user_id', 'status', 'due_date'],
+        unique=False, postgresql_include=['last_fired_stage']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_status_due', table_name='tasks')
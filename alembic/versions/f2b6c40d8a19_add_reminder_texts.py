@@ -0,0 +1,41 @@
+"""Add reminder_texts for pre-generated reminder copy
+
+Revision ID: f2b6c40d8a19
+Revises: d81f3a5c9e27
+Create Date: 2026-10-17 12:41:52.170356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6c40d8a19'
+down_revision: Union[str, Sequence[str], None] = 'd81f3a5c9e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reminder_texts',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('item_id', sa.String(), nullable=False),
+    sa.Column('stage', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('body', sa.String(), nullable=False),
+    sa.Column('fire_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source', 'item_id', 'stage', name='uq_reminder_texts_key')
+    )
+    op.create_index(op.f('ix_reminder_texts_fire_at'), 'reminder_texts', ['fire_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reminder_texts_fire_at'), table_name='reminder_texts')
+    op.drop_table('reminder_texts')
@@ -37,3 +37,15 @@ async def get_current_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+async def get_current_admin(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """The signed-in user, if listed in ADMIN_EMAILS (process-wide stats endpoints)"""
+    admins = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if (current_user.email or "").lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
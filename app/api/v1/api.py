@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import tasks, user_settings, notifications, users, ai, calendar, places, ringai
+from app.api.v1.endpoints import tasks, user_settings, notifications, users, ai, calendar, places, ringai, admin
 
 api_router = APIRouter()
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
@@ -10,4 +10,5 @@ api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"]
 api_router.include_router(ai.router, tags=["ai"])
 api_router.include_router(places.router, prefix="/places", tags=["places"])
 api_router.include_router(ringai.router, prefix="/ringai", tags=["ringai"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 
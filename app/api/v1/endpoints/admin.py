@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_admin
+from app.models.user import User
+from app.core.job_stats import job_stats
+from app.core.groq_client import budget_stats
+from app.core.llm_telemetry import llm_telemetry
+from app.services.ai_service import reminder_cache, voice_cache, voice_coalesced
+from app.services.voice_fast_path import fast_path_stats
+from app.services import plan_cache
+
+router = APIRouter()
+
+@router.get("/scheduler-stats")
+async def get_scheduler_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Per-phase timing and overrun counters of the notification job (this process only)"""
+    return job_stats.snapshot()
+
+@router.get("/cache-stats")
+async def get_cache_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Hit/miss counters of the in-process caches"""
+    return {
+        "reminder_messages": reminder_cache.stats(),
+        "voice_intents": {**voice_cache.stats(), "coalesced": voice_coalesced["joined"]},
+        "daily_plans": plan_cache.stats(),
+    }
+
+@router.get("/voice-stats")
+async def get_voice_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Share of voice commands answered by the local fast path vs. the LLM"""
+    return fast_path_stats.snapshot()
+
+@router.get("/llm-stats")
+async def get_llm_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Per LLM call site: latency histogram, token usage, outcomes, budget misses and hedges"""
+    return {**llm_telemetry.snapshot(), "budgets": budget_stats.snapshot()}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.core.database import get_db
+from datetime import datetime
+from app.core.database import get_db, AsyncSessionLocal
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, PlanResponse, SummaryResponse, VoiceProcessRequest, VoiceProcessResponse
-from app.services import task_service, ai_service, google_maps_service
+from app.services import task_service, ai_service, google_maps_service, daily_stats_service
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,83 @@ async def process_voice(
     res = await ai_service.process_voice_command(request.text, db, current_user.id, request.current_time)
     
     # 🗺️ GOOGLE MAPS INTEGRATION
+    await attach_nearby_places(res, request)
+    
+    # 🎯 Overlap Check for Voice Command (Only for Tasks)
+    await check_voice_conflict(db, current_user.id, res)
+
+    return res
+
+@router.post("/process-voice/stream")
+async def process_voice_stream(
+    request: VoiceProcessRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streaming variant of /process-voice (Server-Sent Events), so the app can
+    start speaking before the whole answer is ready. Events, in order:
+      sentence  {"corrected_sentence"}        as soon as the model has written it
+      field     {name: value}                 each extracted field (intent, title, time, ...), never before the sentence
+      message   {"message", "status"}         the text to speak (after the overlap check for tasks)
+      conflict  {"title", "type", "time"}     only if the new task overlaps an existing one
+      places    {"nearby_places", "message"}  only for nearby searches
+      done      the full response, identical to /process-voice
+    """
+    async def events():
+        # Own session: with this FastAPI version the request's session is closed before the body streams
+        async with AsyncSessionLocal() as db:
+            draft, conflict = None, None
+            # Fields the model writes before the sentence wait for it, so speech can start first
+            held, sentence_sent = [], False
+            async for event in ai_service.stream_voice_command(request.text, db, current_user.id, request.current_time):
+                kind, payload = event[0], event[1:]
+                if kind == "field":
+                    name, value = payload
+                    if name == "corrected_sentence":
+                        yield sse_event("sentence", {"corrected_sentence": value})
+                        sentence_sent = True
+                        for field in held:
+                            yield field
+                        held = []
+                    elif name != "status":
+                        field = sse_event("field", {name: value})
+                        if sentence_sent:
+                            yield field
+                        else:
+                            held.append(field)
+                elif kind == "draft":
+                    draft = payload[0]
+                    if not sentence_sent:
+                        # The model never wrote one: use the draft's
+                        yield sse_event("sentence", {"corrected_sentence": draft.get("corrected_sentence")})
+                        sentence_sent = True
+                    for field in held:
+                        yield field
+                    held = []
+                    # A conflict replaces the message, so check before anything is spoken
+                    conflict = await check_voice_conflict(db, current_user.id, draft)
+                    yield sse_event("message", {"message": draft.get("message"), "status": draft.get("status")})
+                    if conflict:
+                        yield sse_event("conflict", conflict)
+                else:
+                    res = payload[0]
+                    if conflict:
+                        res["message"], res["status"] = draft["message"], draft["status"]
+                    if await attach_nearby_places(res, request):
+                        yield sse_event("places", {"nearby_places": res.get("nearby_places", []), "message": res["message"]})
+                    yield sse_event("done", VoiceProcessResponse(**res).dict())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def attach_nearby_places(res: dict, request: VoiceProcessRequest) -> bool:
+    """Run the Google nearby search for NearbySearch intents; True if it ran"""
     intent = res.get("intent")
     
     if intent == "NearbySearch":
@@ -49,19 +129,22 @@ async def process_voice(
         else:
             res["message"] = "I can find places for you, but I need your location access."
             res["status"] = "incomplete"
+        return True
 
     elif intent == "Directions":
         # Placeholder for routing
         pass
-    
-    # 🎯 Overlap Check for Voice Command (Only for Tasks)
-    if intent == "CreateTask" and res.get("status") == "ready" and res.get("time"):
+    return False
+
+async def check_voice_conflict(db: AsyncSession, user_id: int, res: dict):
+    """Turn a ready voice task that overlaps an existing one back into a question; returns the conflict"""
+    if res.get("intent") == "CreateTask" and res.get("status") == "ready" and res.get("time"):
         from dateutil import parser
         try:
             start_t = parser.parse(res["time"])
             end_t = parser.parse(res["end_time"]) if res.get("end_time") else None
             
-            conflict = await task_service.check_time_overlap(db, current_user.id, start_t, end_t)
+            conflict = await task_service.check_time_overlap(db, user_id, start_t, end_t)
             if conflict:
                 from datetime import timedelta
                 ist_time = conflict.due_date + timedelta(hours=5, minutes=30)
@@ -74,20 +157,40 @@ async def process_voice(
                 # but for now let's just warn and let user decide if they want to force it or click cancel.
                 # Actually user said "dont add overlap tasks".
                 res["status"] = "incomplete" 
+                return {"title": conflict.title, "type": conflict.type, "time": time_str}
         except Exception as e:
             print(f"Overlap check error: {e}")
-
-    return res
+    return None
 
 
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
+    task_status: Optional[str] = Query(None, alias="status"),
+    type: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    is_external: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return await task_service.get_tasks(db, skip=skip, limit=limit, user_id=current_user.id)
+    """
+    Tasks ordered by due date (undated last). When more remain, the X-Next-Cursor
+    header holds the cursor for the next page (same filters, pass it as ?cursor=).
+    """
+    try:
+        tasks, next_cursor = await task_service.get_tasks(
+            db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor,
+            status=task_status, task_type=type, due_from=due_from, due_to=due_to, is_external=is_external
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
 
 @router.get("/plan/", response_model=PlanResponse)
 async def get_daily_plan(
@@ -106,10 +209,14 @@ async def get_summary(
 
 @router.get("/insights")
 async def get_insights(
+    range: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return await task_service.get_user_insights(db, user_id=current_user.id)
+    """All-time counters; with range=week|month also the per-day history from the daily rollup"""
+    if range and range not in daily_stats_service.RANGES:
+        raise HTTPException(status_code=400, detail=f"range must be one of: {', '.join(daily_stats_service.RANGES)}")
+    return await task_service.get_user_insights(db, user_id=current_user.id, range_name=range)
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
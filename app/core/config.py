@@ -20,10 +20,53 @@ class Settings(BaseSettings):
     FIREBASE_CREDENTIALS: str = "firebase-service-account.json"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev_secret_key_change_me_in_prod")
     GROQ_API_KEY: str | None = os.getenv("GROQ_API_KEY")
+    GROQ_BASE_URL: str | None = os.getenv("GROQ_BASE_URL") # Override the API host (e.g. the local stand-in used by the benchmarks)
     GOOGLE_CLIENT_ID: str | None = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET: str | None = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_MAPS_API_KEY: str | None = os.getenv("GOOGLE_MAPS_API_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 # 7 days
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "") # Comma-separated accounts allowed on /admin/* (empty: nobody)
+
+    # Reminder engine
+    REMINDER_LOOKAHEAD_MINUTES: int = 30 # Fire times loaded into the in-memory heap
+    REMINDER_REFRESH_MINUTES: int = 10 # Full reload of the look-ahead window
+    REMINDER_OFFSETS: str = "20,10,0" # Default lead times (minutes) when a task doesn't set its own
+    REMINDER_TEXT_LOOKAHEAD_MINUTES: int = 90 # AI reminder copy is written this far ahead
+    REMINDER_TEXT_BATCH_SIZE: int = 100 # Max texts generated per scheduler run
+    REMINDER_TEXT_CONCURRENCY: int = 5 # Parallel LLM calls while pre-generating
+
+    # Groq (LLM)
+    GROQ_MAX_CONCURRENCY: int = 8 # In-flight LLM requests per process (also the connection pool size)
+    GROQ_TIMEOUT_SECONDS: float = 15.0 # Default per-call timeout
+    GROQ_MAX_RETRIES: int = 1
+    LLM_BUDGET_REMINDER_SECONDS: float = 1.5 # Abandon a reminder phrasing call after this (template is used)
+    LLM_BUDGET_VOICE_SECONDS: float = 3.0 # Voice command parsing
+    LLM_BUDGET_SUMMARY_SECONDS: float = 8.0 # Morning/Evening summaries
+    LLM_BUDGET_CHAT_SECONDS: float = 8.0 # Free-form ask_ai replies
+    LLM_HEDGE_ENABLED: bool = False # Fire a second identical request when the first is slow
+    LLM_HEDGE_AFTER_FRACTION: float = 0.5 # ...after this share of the budget has passed
+    REMINDER_CACHE_SIZE: int = 2000 # Cached reminder messages (LRU beyond this)
+    REMINDER_CACHE_TTL_SECONDS: int = 60 * 60 * 24 # Keeps phrasing from going stale
+    REMINDER_CACHE_PATH: str | None = os.getenv("REMINDER_CACHE_PATH") # JSON file to persist the cache across restarts
+    VOICE_FAST_PATH_ENABLED: bool = True # Parse simple voice commands locally instead of calling the LLM
+    VOICE_CACHE_SIZE: int = 1000 # Parsed voice intents kept for retries / repeated utterances
+    VOICE_CACHE_TTL_SECONDS: int = 120 # Short: results depend on the time of day
+    PLAN_CACHE_SIZE: int = 2000 # Assembled daily plans, per (user, date)
+    PLAN_CACHE_TTL_SECONDS: int = 120 # Writes invalidate at once; the TTL lets the Google mirror get re-checked
+
+    # Morning/Evening summaries
+    SUMMARY_CONCURRENCY: int = 10 # Users whose summary is built in parallel
+    SUMMARY_PREBUILD_MINUTES: int = 15 # Summaries are written this far ahead of the delivery time
+    SUMMARY_CATCHUP_MINUTES: int = 60 # A summary missed at its minute (downtime, failed send) is still sent this late
+
+    # Insights
+    DAILY_STATS_RECONCILE_HOUR: int = 3 # Local (IST) hour of the nightly rebuild of the daily productivity rollup
+
+    # Google mirror
+    GOOGLE_SYNC_INTERVAL_MINUTES: int = 10 # Background incremental sync per user
+    GOOGLE_PLAN_MAX_AGE_MINUTES: int = 2 # Daily plan re-syncs a mirror older than this
+    GOOGLE_PLAN_BUDGET_SECONDS: float = 1.5 # ...but waits at most this long for it (then serves the mirror as-is)
+    GOOGLE_SYNC_BATCH_SIZE: int = 50 # Users synced per scheduler run
 
     # Ringg.ai
     RINGGAI_API_KEY: str | None = os.getenv("RINGGAI_API_KEY")
@@ -1,8 +1,13 @@
 import firebase_admin
 from firebase_admin import credentials, messaging
 from app.core.config import settings
+from app.core.job_stats import count_push
+import asyncio
 import os
 
+# messaging.send_each accepts at most 500 messages per call
+FCM_BATCH_SIZE = 500
+
 class FCMManager:
     _instance = None
     _initialized = False
@@ -55,66 +60,121 @@ class FCMManager:
         except Exception as e:
             print(f"❌ CRITICAL: Failed to initialize Firebase: {e}")
 
-    async def send_notification(self, token: str, title: str, body: str, data: dict = None, click_action: str = None):
+    def _build_message(self, token: str, title: str, body: str, data: dict = None, click_action: str = None):
         """
-        Send a push notification to a specific device token (Async)
+        Build a data-only FCM message. Returns None if the payload is not sendable.
         """
         if not token:
             print("⚠️ No FCM token provided")
             return None
 
-        try:
-            # 🛡️ Defensive Check: Ensure Title and Body are never empty
-            if not title or not title.strip():
-                print(f"⚠️ Notification Title missing for token {token[:10]}... Skipping.")
-                return None
-            
-            if not body or not body.strip():
-                print(f"⚠️ Notification Body missing for title '{title}'. Skipping.")
-                return None
+        # 🛡️ Defensive Check: Ensure Title and Body are never empty
+        if not title or not title.strip():
+            print(f"⚠️ Notification Title missing for token {token[:10]}... Skipping.")
+            return None
+        
+        if not body or not body.strip():
+            print(f"⚠️ Notification Body missing for title '{title}'. Skipping.")
+            return None
 
-            # Construct data payload including notification content
-            data_payload = data or {}
-            data_payload['notification_title'] = title
-            data_payload['notification_body'] = body
-            if click_action:
-                data_payload['click_action'] = click_action
-
-            # ⚡ CRITICAL FIX: For DATA-ONLY messages, DON'T include AndroidNotification or APNSPayload
-            # If we include them, Android auto-displays empty notifications!
-            # We only set priority to ensure delivery
-            android_config = messaging.AndroidConfig(
-                priority='high'
-            )
+        # Construct data payload including notification content
+        data_payload = data or {}
+        data_payload['notification_title'] = title
+        data_payload['notification_body'] = body
+        if click_action:
+            data_payload['click_action'] = click_action
 
-            apns_config = messaging.APNSConfig(
-                headers={'apns-priority': '10'}
-            )
+        # ⚡ CRITICAL FIX: For DATA-ONLY messages, DON'T include AndroidNotification or APNSPayload
+        # If we include them, Android auto-displays empty notifications!
+        # We only set priority to ensure delivery
+        android_config = messaging.AndroidConfig(
+            priority='high'
+        )
 
-            # ⚡ DATA-ONLY message - no 'notification' block, no auto-display
-            # Our JS handlers will display it with full control
-            message = messaging.Message(
-                data=data_payload,
-                token=token,
-                android=android_config,
-                apns=apns_config
-            )
+        apns_config = messaging.APNSConfig(
+            headers={'apns-priority': '10'}
+        )
+
+        # ⚡ DATA-ONLY message - no 'notification' block, no auto-display
+        # Our JS handlers will display it with full control
+        return messaging.Message(
+            data=data_payload,
+            token=token,
+            android=android_config,
+            apns=apns_config
+        )
+
+    @staticmethod
+    def _classify_error(error: Exception) -> str:
+        """Map a Firebase send error to 'STALE_TOKEN' or a readable message"""
+        if isinstance(error, messaging.UnregisteredError) or "Requested entity was not found" in str(error):
+            return "STALE_TOKEN"
+        return str(error)
+
+    async def send_notification(self, token: str, title: str, body: str, data: dict = None, click_action: str = None):
+        """
+        Send a push notification to a specific device token (Async)
+        """
+        try:
+            message = self._build_message(token, title, body, data, click_action)
+            if message is None:
+                return None
             
             # Use to_thread for the synchronous blocking network call
-            import asyncio
             response = await asyncio.to_thread(messaging.send, message)
             print(f"✅ Successfully sent notification: {response}")
+            count_push()
             return response
-        except messaging.UnregisteredError:
-            print(f"⚠️ Token is invalid/unregistered. Cleaning up: {token[:20]}...")
-            raise ValueError("STALE_TOKEN")
         except Exception as e:
-            if "Requested entity was not found" in str(e):
-                print(f"⚠️ FCM Token not found in current project. Cleaning up: {token[:20]}...")
+            if self._classify_error(e) == "STALE_TOKEN":
+                print(f"⚠️ Token is invalid/unregistered. Cleaning up: {token[:20]}...")
                 raise ValueError("STALE_TOKEN")
             print(f"❌ Failed to send notification: {e}")
             return None
 
+    async def send_batch(self, notifications: list):
+        """
+        Send many notifications with messaging.send_each, in chunks of up to 500.
+
+        Each item is a dict with the send_notification arguments
+        (token, title, body, data, click_action).
+        Async generator: yields (index, message_id, error) for every item as soon as
+        its chunk completes. error is None on success, "STALE_TOKEN" for unregistered
+        tokens, "INVALID" for unsendable payloads, else the Firebase error message.
+        """
+        pending = []
+        for index, item in enumerate(notifications):
+            message = self._build_message(**item)
+            if message is None:
+                yield index, None, "INVALID"
+                continue
+            pending.append((index, message))
+
+        async def send_chunk(chunk):
+            try:
+                batch = await asyncio.to_thread(messaging.send_each, [m for _, m in chunk])
+                return chunk, batch.responses, None
+            except Exception as e:
+                return chunk, None, e
+
+        chunks = [pending[i:i + FCM_BATCH_SIZE] for i in range(0, len(pending), FCM_BATCH_SIZE)]
+        for next_done in asyncio.as_completed([send_chunk(c) for c in chunks]):
+            chunk, responses, chunk_error = await next_done
+            if chunk_error:
+                print(f"❌ Failed to send batch of {len(chunk)} notifications: {chunk_error}")
+            else:
+                sent = sum(1 for r in responses if r.success)
+                count_push(sent)
+                print(f"✅ Batch sent: {sent}/{len(chunk)} delivered")
+
+            for pos, (index, _) in enumerate(chunk):
+                if chunk_error:
+                    yield index, None, str(chunk_error)
+                elif responses[pos].success:
+                    yield index, responses[pos].message_id, None
+                else:
+                    yield index, None, self._classify_error(responses[pos].exception)
+
     async def send_morning_summary(self, token: str, task_count: int, first_task_time: str):
         """Send morning summary notification"""
         title = "Good Morning! ☀️"
@@ -1,13 +1,251 @@
-from groq import Groq
+import asyncio
+import logging
+import time
+import httpx
+from groq import AsyncGroq
 from app.core.config import settings
+from app.core.job_stats import count_llm_call
+from app.core.llm_telemetry import llm_telemetry
 
-# Initialize the Groq client only once
+logger = logging.getLogger(__name__)
+
+# One pooled HTTP connection set shared by every Groq request (keeps TLS warm)
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=settings.GROQ_MAX_CONCURRENCY,
+        max_keepalive_connections=settings.GROQ_MAX_CONCURRENCY
+    ),
+    timeout=httpx.Timeout(settings.GROQ_TIMEOUT_SECONDS, connect=5.0)
+)
+
+# Initialize the async Groq client only once
 if settings.GROQ_API_KEY:
-    groq_client = Groq(api_key=settings.GROQ_API_KEY)
+    groq_client = AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        base_url=settings.GROQ_BASE_URL,
+        http_client=http_client,
+        max_retries=settings.GROQ_MAX_RETRIES
+    )
 else:
     # In production, you'd want to handle this more strictly
     groq_client = None
 
+# Caps in-flight LLM requests process-wide; created lazily on the running loop
+_semaphore = None
+
+# call_site -> latency budget in seconds (whole call, including the wait for a slot)
+CALL_SITE_BUDGETS = {
+    "friendly_reminder": settings.LLM_BUDGET_REMINDER_SECONDS,
+    "voice_command": settings.LLM_BUDGET_VOICE_SECONDS,
+    "voice_command_stream": settings.LLM_BUDGET_VOICE_SECONDS,
+    "summary": settings.LLM_BUDGET_SUMMARY_SECONDS,
+    "ask_ai": settings.LLM_BUDGET_CHAT_SECONDS,
+}
+
+
+class LLMBudgetExceeded(asyncio.TimeoutError):
+    """The call was abandoned because it ran past its call site's latency budget"""
+
+
+class BudgetStats:
+    """Per call site: calls, budget misses and hedged requests"""
+
+    def __init__(self):
+        self.sites = {}
+
+    def _site(self, call_site: str) -> dict:
+        return self.sites.setdefault(call_site, {"calls": 0, "budget_misses": 0, "hedges": 0, "hedge_wins": 0})
+
+    def record(self, call_site: str, missed: bool = False, hedged: bool = False, hedge_won: bool = False):
+        site = self._site(call_site)
+        site["calls"] += 1
+        site["budget_misses"] += int(missed)
+        site["hedges"] += int(hedged)
+        site["hedge_wins"] += int(hedge_won)
+
+    def snapshot(self) -> dict:
+        return {
+            call_site: {
+                **counts,
+                "budget_seconds": CALL_SITE_BUDGETS.get(call_site),
+                "miss_rate": round(counts["budget_misses"] / counts["calls"], 4) if counts["calls"] else 0,
+            }
+            for call_site, counts in self.sites.items()
+        }
+
+
+budget_stats = BudgetStats()
+
 def get_groq_client():
-    """Returns the initialized Groq client."""
+    """Returns the initialized async Groq client."""
     return groq_client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY)
+    return _semaphore
+
+async def _request(client, call_site: str, timeout: float, **kwargs):
+    """One Groq request, recorded in llm_telemetry whatever its outcome"""
+    queued = time.perf_counter()
+    async with _get_semaphore():
+        count_llm_call()
+        started = time.perf_counter()
+        try:
+            completion = await client.chat.completions.create(
+                timeout=timeout or settings.GROQ_TIMEOUT_SECONDS,
+                **kwargs
+            )
+        except asyncio.CancelledError:
+            # Abandoned by its budget or lost a hedge race
+            llm_telemetry.record(call_site, kwargs.get("model"), time.perf_counter() - started,
+                                 started - queued, cancelled=True)
+            raise
+        except Exception as e:
+            llm_telemetry.record(call_site, kwargs.get("model"), time.perf_counter() - started,
+                                 started - queued, error=e)
+            raise
+        llm_telemetry.record(call_site, kwargs.get("model"), time.perf_counter() - started,
+                             started - queued, usage=getattr(completion, "usage", None))
+        return completion
+
+async def create_chat_completion(call_site: str, timeout: float = None, **kwargs):
+    """
+    Non-blocking chat completion through the shared client.
+    call_site names the caller (e.g. "voice_command") for instrumentation and
+    picks its latency budget (CALL_SITE_BUDGETS). Waits for a slot when
+    GROQ_MAX_CONCURRENCY requests are already in flight.
+
+    A call still unanswered when its budget runs out is abandoned with
+    LLMBudgetExceeded, so the caller can serve its template instead of
+    stalling. With LLM_HEDGE_ENABLED a second identical request is fired once
+    LLM_HEDGE_AFTER_FRACTION of the budget has passed; the first answer wins.
+    """
+    client = get_groq_client()
+    if client is None:
+        raise RuntimeError("GROQ_API_KEY is not configured")
+
+    budget = CALL_SITE_BUDGETS.get(call_site)
+    if budget is None:
+        budget_stats.record(call_site)
+        return await _request(client, call_site, timeout, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    hedge_at = loop.time() + budget * settings.LLM_HEDGE_AFTER_FRACTION if settings.LLM_HEDGE_ENABLED else None
+    pending = {asyncio.ensure_future(_request(client, call_site, timeout, **kwargs))}
+    hedge = None
+    error = None
+    try:
+        while pending:
+            until = hedge_at if hedge is None and hedge_at is not None else deadline
+            done, pending = await asyncio.wait(
+                pending, timeout=max(until - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            for request in done:
+                if request.exception() is None:
+                    budget_stats.record(call_site, hedged=hedge is not None, hedge_won=request is hedge)
+                    return request.result()
+                error = request.exception()
+            if done:
+                continue
+            if hedge is None and hedge_at is not None:
+                # First request is slow: race an identical one against it
+                hedge = asyncio.ensure_future(_request(client, call_site, timeout, **kwargs))
+                pending.add(hedge)
+                continue
+            budget_stats.record(call_site, missed=True, hedged=hedge is not None)
+            logger.warning(f"⏱️ [LLM] {call_site} exceeded its {budget}s budget, using fallback")
+            raise LLMBudgetExceeded(f"{call_site} exceeded its {budget}s budget")
+    finally:
+        # Abandoned requests are cancelled so they free their slot right away
+        for request in pending:
+            request.cancel()
+
+    budget_stats.record(call_site, hedged=hedge is not None)
+    raise error
+
+async def stream_chat_completion(call_site: str, timeout: float = None, **kwargs):
+    """
+    Streaming variant of create_chat_completion: yields the content deltas as
+    they arrive. The concurrency slot is held until the stream is consumed, and
+    the call site's budget applies to the first token.
+    """
+    client = get_groq_client()
+    if client is None:
+        raise RuntimeError("GROQ_API_KEY is not configured")
+
+    queued = time.perf_counter()
+    started = None
+    stream = None
+
+    async def open_stream():
+        nonlocal started, stream
+        await _get_semaphore().acquire()
+        try:
+            count_llm_call()
+            started = time.perf_counter()
+            stream = await client.chat.completions.create(
+                timeout=timeout or settings.GROQ_TIMEOUT_SECONDS,
+                stream=True,
+                **kwargs
+            )
+            chunks = stream.__aiter__()
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return chunks, None
+        except BaseException as e:
+            # Includes the cancellation by wait_for when the budget runs out
+            await _close_stream(stream)
+            _get_semaphore().release()
+            llm_telemetry.record(call_site, kwargs.get("model"), time.perf_counter() - started, started - queued,
+                                 error=e, cancelled=isinstance(e, asyncio.CancelledError))
+            raise
+
+    # The budget covers the time to the first token; after that the text is flowing
+    budget = CALL_SITE_BUDGETS.get(call_site)
+    try:
+        chunks, chunk = await asyncio.wait_for(open_stream(), timeout=budget)
+    except asyncio.TimeoutError:
+        budget_stats.record(call_site, missed=True)
+        logger.warning(f"⏱️ [LLM] {call_site} exceeded its {budget}s budget, using fallback")
+        raise LLMBudgetExceeded(f"{call_site} exceeded its {budget}s budget")
+    budget_stats.record(call_site)
+
+    usage, error = None, None
+    try:
+        while chunk is not None:
+            # Groq reports usage on the last chunk of a stream
+            x_groq = getattr(chunk, "x_groq", None)
+            usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        # Consumer stopped early (e.g. the SSE client went away): free the connection too
+        await _close_stream(stream)
+        _get_semaphore().release()
+        llm_telemetry.record(call_site, kwargs.get("model"), time.perf_counter() - started, started - queued,
+                             usage=usage, error=error,
+                             cancelled=isinstance(error, (asyncio.CancelledError, GeneratorExit)))
+
+async def _close_stream(stream):
+    """Release a stream's pooled connection (a no-op once it was read to the end)"""
+    if stream is None:
+        return
+    try:
+        await stream.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [LLM] Failed to close stream: {e}")
+
+async def close_groq_client():
+    """Close the pooled connections on shutdown"""
+    await http_client.aclose()
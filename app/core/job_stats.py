@@ -0,0 +1,131 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+# Phase currently running in this task context (None outside the scheduled job)
+_current_phase: ContextVar = ContextVar("job_phase", default=None)
+
+
+class PhaseStats:
+    """Running totals for one phase of the notification job"""
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows_scanned = 0
+        self.pushes_sent = 0
+        self.llm_calls = 0
+        self.last_run_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "avg_seconds": round(self.total_seconds / self.runs, 4) if self.runs else 0,
+            "last_seconds": round(self.last_seconds, 4),
+            "max_seconds": round(self.max_seconds, 4),
+            "rows_scanned": self.rows_scanned,
+            "pushes_sent": self.pushes_sent,
+            "llm_calls": self.llm_calls,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+class JobStats:
+    """
+    In-process instrumentation for the scheduled notification job.
+    Tracks duration, rows scanned, pushes sent and LLM calls per phase,
+    plus overrunning, skipped and misfired runs.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.runs = 0
+        self.overruns = 0
+        self.skipped_runs = 0   # Previous run still busy (max_instances reached)
+        self.missed_runs = 0    # Fired too late (misfire_grace_time exceeded)
+        self.failed_runs = 0
+        self.last_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.last_run_at = None
+        self.started_at = datetime.now(timezone.utc)
+
+    @contextmanager
+    def run(self, interval_seconds: float):
+        """Measure a whole job run and count it as an overrun if it outlasts its interval"""
+        started = time.perf_counter()
+        self.last_run_at = datetime.now(timezone.utc)
+        try:
+            yield
+        except Exception:
+            self.failed_runs += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.runs += 1
+            self.last_run_seconds = elapsed
+            self.max_run_seconds = max(self.max_run_seconds, elapsed)
+            if elapsed > interval_seconds:
+                self.overruns += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Measure one phase; counters recorded inside it are attributed to the phase"""
+        stats = self.phases.setdefault(name, PhaseStats())
+        token = _current_phase.set(stats)
+        started = time.perf_counter()
+        stats.last_run_at = datetime.now(timezone.utc)
+        try:
+            yield stats
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.runs += 1
+            stats.total_seconds += elapsed
+            stats.last_seconds = elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            _current_phase.reset(token)
+
+    def snapshot(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped_runs": self.skipped_runs,
+            "missed_runs": self.missed_runs,
+            "failed_runs": self.failed_runs,
+            "last_run_seconds": round(self.last_run_seconds, 4),
+            "max_run_seconds": round(self.max_run_seconds, 4),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "phases": {name: stats.to_dict() for name, stats in self.phases.items()},
+        }
+
+
+def count_rows(n: int):
+    """Record rows read by the current phase"""
+    stats = _current_phase.get()
+    if stats:
+        stats.rows_scanned += n
+
+
+def count_push(n: int = 1):
+    """Record pushes delivered by the current phase"""
+    stats = _current_phase.get()
+    if stats:
+        stats.pushes_sent += n
+
+
+def count_llm_call(n: int = 1):
+    """Record LLM requests made by the current phase"""
+    stats = _current_phase.get()
+    if stats:
+        stats.llm_calls += n
+
+
+job_stats = JobStats()
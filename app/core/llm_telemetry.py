@@ -0,0 +1,108 @@
+from collections import deque
+from datetime import datetime, timezone
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one is open-ended
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 15.0)
+# Requests per call site kept for the rolling histogram / percentiles
+WINDOW = 500
+
+
+class CallSiteStats:
+    """Counters for one call site plus a rolling window of its recent requests"""
+
+    def __init__(self):
+        self.requests = 0
+        self.outcomes = {}      # ok | timeout | cancelled | <ExceptionName> -> count
+        self.models = {}        # model -> count
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_seconds = 0.0
+        self.queue_seconds = 0.0
+        # (latency seconds, prompt tokens, completion tokens, outcome)
+        self.recent = deque(maxlen=WINDOW)
+        self.last_error = None
+        self.last_at = None
+
+    def to_dict(self) -> dict:
+        latencies = sorted(r[0] for r in self.recent)
+        buckets = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS}
+        buckets["inf"] = 0
+        for latency in latencies:
+            bound = next((b for b in LATENCY_BUCKETS if latency <= b), None)
+            buckets[f"le_{bound}" if bound is not None else "inf"] += 1
+
+        def percentile(p):
+            return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)], 4) if latencies else 0
+
+        recent_errors = sum(1 for r in self.recent if r[3] not in ("ok", "cancelled"))
+        # Token averages only over answered requests
+        answered = [r for r in self.recent if r[3] == "ok"]
+        return {
+            "requests": self.requests,
+            "outcomes": dict(self.outcomes),
+            "error_rate": round(recent_errors / len(self.recent), 4) if self.recent else 0,
+            "models": dict(self.models),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_prompt_tokens": round(sum(r[1] for r in answered) / len(answered), 1) if answered else 0,
+            "avg_completion_tokens": round(sum(r[2] for r in answered) / len(answered), 1) if answered else 0,
+            "avg_seconds": round(self.total_seconds / self.requests, 4) if self.requests else 0,
+            "avg_queue_seconds": round(self.queue_seconds / self.requests, 4) if self.requests else 0,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+            "p99_seconds": percentile(0.99),
+            "histogram": buckets,
+            "window": len(self.recent),
+            "last_error": self.last_error,
+            "last_at": self.last_at.isoformat() if self.last_at else None,
+        }
+
+
+class LLMTelemetry:
+    """
+    In-process telemetry for every Groq request (hedges included): latency,
+    time waiting for a slot, token usage, model and outcome per call site.
+    """
+
+    def __init__(self):
+        self.sites = {}
+        self.started_at = datetime.now(timezone.utc)
+
+    def record(self, call_site: str, model: str, seconds: float, queue_seconds: float = 0.0,
+               usage=None, error: BaseException = None, cancelled: bool = False):
+        stats = self.sites.setdefault(call_site, CallSiteStats())
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        if cancelled:
+            outcome = "cancelled"
+        elif error is None:
+            outcome = "ok"
+        elif isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower():
+            outcome = "timeout"
+        else:
+            outcome = type(error).__name__
+
+        stats.requests += 1
+        stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+        if model:
+            stats.models[model] = stats.models.get(model, 0) + 1
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.total_seconds += seconds
+        stats.queue_seconds += queue_seconds
+        stats.recent.append((seconds, prompt_tokens, completion_tokens, outcome))
+        stats.last_at = datetime.now(timezone.utc)
+        if error is not None and not cancelled:
+            stats.last_error = f"{type(error).__name__}: {error}"[:300]
+
+    def snapshot(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "prompt_tokens": sum(s.prompt_tokens for s in self.sites.values()),
+            "completion_tokens": sum(s.completion_tokens for s in self.sites.values()),
+            "call_sites": {name: stats.to_dict() for name, stats in self.sites.items()},
+        }
+
+
+llm_telemetry = LLMTelemetry()
@@ -3,8 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.database import engine, Base
-from app.models import task, user_setting, user, notification  # Register models
+from app.models import task, user_setting, user, notification, google_item, google_sync_state, reminder_delivery, reminder_text, user_task_stats, daily_summary, user_daily_stats, job_run  # Register models
 from app.services.scheduler import start_scheduler, shutdown_scheduler
+from app.core.groq_client import close_groq_client
+from app.services.ai_service import reminder_cache
 
 # Tables are created manually in pgAdmin
 
@@ -20,6 +22,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     shutdown_scheduler()
+    await close_groq_client()
+    reminder_cache.save()
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
@@ -29,6 +33,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"], # Pagination cursor of GET /tasks/
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
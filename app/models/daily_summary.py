@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DailySummary(Base):
+    """Morning/Evening summary text built ahead of the user's delivery time"""
+    __tablename__ = "daily_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "summary_type", "summary_date", name="uq_daily_summaries_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    summary_type = Column(String, nullable=False) # MORNING | EVENING
+    summary_date = Column(String, nullable=False, index=True) # Local (IST) date, YYYY-MM-DD
+    fingerprint = Column(String, nullable=False) # Hash of the name + tasks the text was written for
+    body = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, BigInteger, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class GoogleItem(Base):
+    """Local mirror of a user's Google Calendar event or Google Task"""
+    __tablename__ = "google_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", "google_id", name="uq_google_items_user_kind_google_id"),
+        Index("ix_google_items_user_id_start_at", "user_id", "start_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String, nullable=False) # event | task
+    google_id = Column(String, nullable=False) # Event id, or "tasklist_id|task_id" for tasks
+    list_id = Column(String, nullable=True) # Task list of a Google Task
+    title = Column(String, nullable=True)
+    status = Column(String, nullable=True) # Event: confirmed/cancelled, Task: needsAction/completed
+    start_at = Column(DateTime(timezone=True), nullable=True, index=True) # Event start / task due
+    deleted = Column(Boolean, default=False) # Cancelled, deleted or hidden in Google
+    raw = Column(JSONB, nullable=True) # Resource as returned by the Google API
+    synced_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
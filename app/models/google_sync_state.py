@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.core.database import Base
+
+class GoogleSyncState(Base):
+    """Incremental sync cursors for a user's Google mirror"""
+    __tablename__ = "google_sync_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    calendar_sync_token = Column(String, nullable=True) # nextSyncToken of the primary calendar
+    tasks_updated_min = Column(DateTime(timezone=True), nullable=True) # updatedMin for the next Tasks poll
+    last_synced_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class JobRun(Base):
+    """Last completed run of a once-a-day background job, shared by all worker processes"""
+    __tablename__ = "job_runs"
+
+    name = Column(String, primary_key=True)
+    last_run_on = Column(Date, nullable=False) # Local (IST) day of the last completed run
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ReminderDelivery(Base):
+    """Ledger of claimed reminder sends; the unique key makes every stage fire once"""
+    __tablename__ = "reminder_deliveries"
+    __table_args__ = (
+        UniqueConstraint("source", "item_id", "stage", name="uq_reminder_deliveries_key"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    source = Column(String, nullable=False) # task | google
+    item_id = Column(String, nullable=False) # Item plus its fire time, see delivery_ledger
+    stage = Column(Integer, nullable=False) # Lead minutes, -1 = nudge, -2 = meeting end
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ReminderText(Base):
+    """AI reminder copy generated ahead of time for one stage of a task / Google item"""
+    __tablename__ = "reminder_texts"
+    __table_args__ = (
+        UniqueConstraint("source", "item_id", "stage", name="uq_reminder_texts_key"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    source = Column(String, nullable=False) # task | google
+    item_id = Column(String, nullable=False) # Task id / google_items id
+    stage = Column(Integer, nullable=False) # Lead minutes (0 = Due Now)
+    fingerprint = Column(String, nullable=False) # Hash of title + due time the text was written for
+    body = Column(String, nullable=False)
+    fire_at = Column(DateTime(timezone=True), index=True) # When the stage is due (for pruning)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, BigInteger, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, BigInteger, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import TSTZRANGE
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,11 +23,26 @@ class Task(Base):
     notified_completion = Column(Boolean, default=False)
     notified_30m_post = Column(Boolean, default=False)
     last_nudged_at = Column(DateTime(timezone=True), nullable=True) # Last time user was nudged
+    completed_at = Column(DateTime(timezone=True), nullable=True) # When status last became completed (UTC)
+    reminder_offsets = Column(String, nullable=True) # e.g. "20,10,0" (minutes before due)
+    next_fire_at = Column(DateTime(timezone=True), nullable=True, index=True) # When the next stage is due
+    next_fire_stage = Column(Integer, nullable=True) # Lead minutes, -1 = nudge, -2 = meeting end
+    last_fired_stage = Column(Integer, nullable=True) # Last lead stage processed
     med_timing = Column(String, nullable=True) # e.g. "morning,afternoon,night"
     external_id = Column(String, nullable=True) # ID from Google Calendar/Tasks
     is_external = Column(Boolean, default=False)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     created_at = Column(DateTime(timezone=True), default=get_ist_time)
     updated_at = Column(DateTime(timezone=True), default=get_ist_time, onupdate=get_ist_time)
+    # Time the task occupies (end_time, else 60 min for meetings / 30 min otherwise); used for overlap checks
+    busy_range = Column(TSTZRANGE, Computed("task_busy_range(due_date, end_time, type)", persisted=True))
+
+    __table_args__ = (
+        Index("ix_tasks_user_busy_range", "user_id", "busy_range", postgresql_using="gist"),
+        # Covers the per-user status counts (index-only) and the pending-by-due-date lookups
+        Index("ix_tasks_user_status_due", "user_id", "status", "due_date", postgresql_include=["last_fired_stage"]),
+        # Keyset pagination of GET /tasks/ on (due_date, id)
+        Index("ix_tasks_user_due_id", "user_id", "due_date", "id"),
+    )
 
     owner = relationship("User", back_populates="tasks")
@@ -19,6 +19,8 @@ class User(Base):
     google_refresh_token = Column(String, nullable=True)
     google_token_expiry = Column(DateTime, nullable=True)
 
+    plan_version = Column(Integer, nullable=False, default=0, server_default="0") # Bumped by every write that changes the daily plan (plan_cache)
+
     tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
     settings = relationship("UserSetting", back_populates="owner", uselist=False, cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="owner", cascade="all, delete-orphan")
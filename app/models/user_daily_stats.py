@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class UserDailyStats(Base):
+    """Per-user, per-local-day (IST) productivity rollup, kept current by daily_stats_service"""
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created_tasks = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+    completed_on_time = Column(Integer, nullable=False, default=0) # Completed by their due time (or undated)
+    overdue_tasks = Column(Integer, nullable=False, default=0) # Due this day and missed (still pending past Due Now, or done late)
+    completion_seconds = Column(BigInteger, nullable=False, default=0) # Sum of created -> completed durations
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
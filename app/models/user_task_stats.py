@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class UserTaskStats(Base):
+    """Per-user task counters, kept current by task_stats_service on every task change"""
+    __tablename__ = "user_task_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_tasks = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+    pending_tasks = Column(Integer, nullable=False, default=0)
+    overdue_tasks = Column(Integer, nullable=False, default=0) # Pending tasks whose Due Now stage has passed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
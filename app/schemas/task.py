@@ -2,6 +2,16 @@ from pydantic import BaseModel, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+def _normalize_offsets(v):
+    """Validate a comma separated list of reminder lead times, e.g. "30,10,0" """
+    if v is None or not v.strip():
+        return None
+    from app.services.reminder_schedule import parse_offsets
+    try:
+        return ",".join(str(m) for m in parse_offsets(v))
+    except ValueError:
+        raise ValueError('reminder_offsets must be a comma separated list of minutes, e.g. "20,10,0"')
+
 class TaskBase(BaseModel):
     title: str
     raw_text: Optional[str] = None
@@ -10,6 +20,7 @@ class TaskBase(BaseModel):
     due_date: Optional[datetime] = None
     end_time: Optional[datetime] = None
     med_timing: Optional[str] = None
+    reminder_offsets: Optional[str] = None
 
     @field_validator('title')
     def title_must_not_be_empty(cls, v):
@@ -23,6 +34,10 @@ class TaskBase(BaseModel):
             return v.strip()
         return v
 
+    @field_validator('reminder_offsets')
+    def validate_reminder_offsets(cls, v):
+        return _normalize_offsets(v)
+
 class TaskCreate(TaskBase):
     pass
 
@@ -34,8 +49,13 @@ class TaskUpdate(BaseModel):
     due_date: Optional[datetime] = None
     end_time: Optional[datetime] = None
     med_timing: Optional[str] = None
+    reminder_offsets: Optional[str] = None
     external_id: Optional[str] = None
 
+    @field_validator('reminder_offsets')
+    def validate_reminder_offsets(cls, v):
+        return _normalize_offsets(v)
+
 class TaskResponse(TaskBase):
     id: int
     status: str
@@ -63,6 +83,7 @@ class PlanResponse(BaseModel):
     total_count: int
     time_bound_count: int
     upcoming: List[TaskResponse] = []
+    partial: bool = False # Google items may be stale (their sync missed the time budget)
 
 class SummaryResponse(BaseModel):
     completed_count: int
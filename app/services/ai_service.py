@@ -1,13 +1,58 @@
-from app.core.groq_client import get_groq_client
+from app.core.groq_client import get_groq_client, create_chat_completion, stream_chat_completion, LLMBudgetExceeded
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.json_stream import JsonFieldStream
+from app.services import voice_fast_path
+import asyncio
+import json
 import logging
+import time
 
 import logging
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.task_service import get_user_insights
+from app.core.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
+# Reminder phrasing for recurring (title, lead, time) inputs, e.g. daily medicines
+reminder_cache = TTLCache(
+    maxsize=settings.REMINDER_CACHE_SIZE,
+    ttl_seconds=settings.REMINDER_CACHE_TTL_SECONDS,
+    path=settings.REMINDER_CACHE_PATH
+)
+
+def reminder_cache_key(title: str, due_time: str, lead_mins: int) -> str:
+    """Case/whitespace-insensitive key so "Call  Mom" and "call mom" share an entry"""
+    return f"{' '.join(title.lower().split())}|{lead_mins}|{due_time.strip().upper()}"
+
+# Parsed voice intents, for client retries and repeated utterances
+voice_cache = TTLCache(
+    maxsize=settings.VOICE_CACHE_SIZE,
+    ttl_seconds=settings.VOICE_CACHE_TTL_SECONDS
+)
+# key -> in-flight parse shared by identical concurrent requests
+_voice_inflight = {}
+voice_coalesced = {"joined": 0}
+
+def voice_cache_key(user_id: int, text: str, current_time: str = None) -> str:
+    """
+    Same user + same words + same local minute. The model resolves "in 2 hours",
+    "at 5" or "tonight" against the clock (and the prompt's energy context
+    follows the hour), so a parse is only reused while the clock reads the same.
+    """
+    minute = None
+    if current_time:
+        try:
+            from dateutil import parser
+            minute = parser.parse(current_time).strftime("%Y-%m-%dT%H:%M")
+        except (ValueError, OverflowError):
+            pass
+    minute = minute or datetime.now().strftime("%Y-%m-%dT%H:%M")
+    normalized = " ".join(text.lower().split()).rstrip(".!?")
+    return f"{user_id}|{minute}|{normalized}"
+
 def determine_energy_level(hour: int) -> str:
     """
     Returns energy level based on hour of day.
@@ -38,7 +83,8 @@ async def ask_ai(prompt: str) -> str:
 
     try:
         # Using llama-3.1-8b-instant as requested
-        chat_completion = client.chat.completions.create(
+        chat_completion = await create_chat_completion(
+            "ask_ai",
             messages=[
                 {
                     "role": "system",
@@ -99,13 +145,14 @@ Assistant Reply: <assistant response>"""
         logger.error(f"Error calling Groq API: {str(e)}")
         return f"I encountered an error while processing your request: {str(e)}"
 
-async def generate_ai_summary(summary_type: str, user_name: str, tasks: list) -> str:
+async def generate_ai_summary(summary_type: str, user_name: str, tasks: list, fallback: bool = True) -> str:
     """
     Generates a daily summary (Morning/Evening) based on user's tasks.
+    - fallback: return a generic line on failure instead of None
     """
     client = get_groq_client()
     if not client:
-        return ""
+        return "" if fallback else None
 
     # Format tasks for the prompt
     task_list_str = ""
@@ -129,7 +176,8 @@ async def generate_ai_summary(summary_type: str, user_name: str, tasks: list) ->
         user_prompt = f"Here are my tasks for today:\n{task_list_str}\n\nCan you give me a quick evening summary?"
 
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = await create_chat_completion(
+            "summary",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -139,21 +187,29 @@ async def generate_ai_summary(summary_type: str, user_name: str, tasks: list) ->
         return chat_completion.choices[0].message.content.strip()
     except Exception as e:
         logger.error(f"Error generating AI summary: {str(e)}")
-        return "You have some tasks scheduled for today. Have a productive day!" if summary_type == "MORNING" else "Hope you had a productive day!"
+        return summary_fallback(summary_type) if fallback else None
+
+def summary_fallback(summary_type: str) -> str:
+    """Generic summary line used when the LLM is unavailable"""
+    return "You have some tasks scheduled for today. Have a productive day!" if summary_type == "MORNING" else "Hope you had a productive day!"
 
-async def generate_friendly_reminder(title: str, due_time: str, lead_mins: int) -> str:
+async def generate_friendly_reminder(title: str, due_time: str, lead_mins: int, fallback: bool = True) -> str:
     """
     Generate a friendly reminder message using Groq.
-    - lead_mins: 20, 10, or 0 (Due Now)
+    - lead_mins: minutes before due (e.g. 20, 10), or 0 (Due Now)
+    - fallback: return a plain template on failure instead of None
     """
+    cache_key = reminder_cache_key(title, due_time, lead_mins)
+    cached = reminder_cache.get(cache_key)
+    if cached:
+        return cached
+
     client = get_groq_client()
     if not client:
-        return f"Reminder: {title} at {due_time}"
+        return f"Reminder: {title} at {due_time}" if fallback else None
 
-    if lead_mins == 20:
-        time_msg = "in 20 minutes"
-    elif lead_mins == 10:
-        time_msg = "in 10 minutes"
+    if lead_mins > 0:
+        time_msg = f"in {lead_mins} minutes"
     else:
         time_msg = "right now"
 
@@ -166,7 +222,8 @@ async def generate_friendly_reminder(title: str, due_time: str, lead_mins: int)
     user_prompt = f"The task is '{title}' and it's due {time_msg} (at {due_time}). Phrase it nicely with an emoji."
     
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = await create_chat_completion(
+            "friendly_reminder",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -183,26 +240,174 @@ async def generate_friendly_reminder(title: str, due_time: str, lead_mins: int)
         elif lead_mins == 20 and "10" in ai_response and "20" not in ai_response:
              ai_response = ai_response.replace("10", "20")
 
+        # Only real AI output is cached, never the fallback templates
+        reminder_cache.set(cache_key, ai_response)
         return ai_response
     except Exception as e:
         logger.error(f"Error generating AI reminder: {str(e)}")
-        return f"Friendly reminder: {title} at {due_time}!"
+        return f"Friendly reminder: {title} at {due_time}!" if fallback else None
 
 async def process_voice_command(text: str, db: AsyncSession, user_id: int, current_time: str = None) -> dict:
     """
     Assistant Lifecycle Processing:
     idle -> incomplete -> ready
     """
+    # ⚡ Common shapes ("remind me to X at 5 pm tomorrow", "find X near me") are
+    # parsed locally; anything the parser isn't sure about goes to the model
+    if settings.VOICE_FAST_PATH_ENABLED:
+        fast = voice_fast_path.parse(text, current_time)
+        if fast:
+            return fast
+
+    key = voice_cache_key(user_id, text, current_time)
+    cached = voice_cache.get(key)
+    if cached:
+        logger.info(f"♻️ [Voice] Cache hit for '{text}'")
+        # Callers add fields to the response, so never hand out the cached dict
+        return dict(cached)
+
+    # Single flight: identical requests arriving together share one LLM call
+    pending = _voice_inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_shared_voice_parse(text, user_id, current_time))
+        _voice_inflight[key] = pending
+        pending.add_done_callback(lambda done: _finish_voice_parse(key, done))
+    else:
+        voice_coalesced["joined"] += 1
+        logger.info(f"🔗 [Voice] Joined in-flight parse for '{text}'")
+
+    # Shielded so a disconnecting client doesn't cancel the call the others wait on
+    result = await asyncio.shield(pending)
+    return dict(result)
+
+
+async def _shared_voice_parse(text: str, user_id: int, current_time: str = None) -> dict:
+    """
+    The parse behind a single-flight entry. It can outlive the request that
+    started it (others wait on it), so it reads through its own session rather
+    than the first caller's, which get_db closes when that request ends.
+    """
+    async with AsyncSessionLocal() as db:
+        return await _parse_voice_command(text, db, user_id, current_time)
+
+
+def _finish_voice_parse(key: str, done: asyncio.Future):
+    """Cache a finished parse (errors are retried next time) and retire the in-flight entry"""
+    _voice_inflight.pop(key, None)
+    if done.cancelled() or done.exception() is not None:
+        return
+    result = done.result()
+    if result.get("status") != "error":
+        voice_cache.set(key, result)
+
+
+# Order fields are replayed in when a parse didn't come from the stream; the
+# sentence leads (as in the prompt's examples) so speech can start on it
+VOICE_FIELDS = ("corrected_sentence", "status", "intent", "title", "time", "end_time",
+                "category", "destination", "type")
+
+
+async def stream_voice_command(text: str, db: AsyncSession, user_id: int, current_time: str = None):
+    """
+    Streaming process_voice_command. Yields, in order:
+      ("field", name, value)  every raw field as soon as the model has written it
+      ("draft", response)     once "message" is written: the response so far (safety checks applied)
+      ("result", response)    the same dict process_voice_command returns
+    """
+    known = voice_fast_path.parse(text, current_time) if settings.VOICE_FAST_PATH_ENABLED else None
+    key = voice_cache_key(user_id, text, current_time)
+    if not known:
+        known = voice_cache.get(key)
+    if not known and key in _voice_inflight:
+        voice_coalesced["joined"] += 1
+        known = await asyncio.shield(_voice_inflight[key])
+
+    if known:
+        # Nothing to stream: replay the finished parse
+        for name in VOICE_FIELDS:
+            if name in known:
+                yield "field", name, known[name]
+        yield "draft", dict(known)
+        yield "result", dict(known)
+        return
+
+    if not get_groq_client():
+        error = _voice_error(text, "Service Error", "Service unavailable.")
+        yield "draft", error
+        yield "result", error
+        return
+
+    system_prompt = await _build_voice_prompt(db, user_id, current_time)
+    stream = JsonFieldStream()
+    seen = {}
+    drafted = False
+    try:
+        logger.info(f"🎤 [AI Input] Streaming: '{text}'")
+        llm_started = time.perf_counter()
+        # No response_format: Groq's JSON mode can't be streamed, the prompt asks for JSON only
+        async for delta in stream_chat_completion(
+            "voice_command_stream",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Input: {text}"}
+            ],
+            model="llama-3.1-8b-instant"
+        ):
+            for name, value in stream.feed(delta):
+                seen[name] = value
+                if name == "message":
+                    drafted = True
+                    yield "draft", _voice_response(dict(seen), text)
+                else:
+                    yield "field", name, value
+        voice_fast_path.fast_path_stats.record_llm(time.perf_counter() - llm_started)
+        response = _voice_response(stream.result(), text)
+        voice_cache.set(key, response)
+    except LLMBudgetExceeded:
+        response = _voice_error(text, "Timeout", "Sorry, I'm a little slow right now. Could you say that again?")
+    except Exception as e:
+        logger.error(f"❌ AI Parsing Error: {str(e)}")
+        response = _voice_error(text, "Parsing Error", "I had trouble processing that. Can you repeat it?")
+
+    if not drafted:
+        yield "draft", dict(response)
+    yield "result", dict(response)
+
+
+async def _parse_voice_command(text: str, db: AsyncSession, user_id: int, current_time: str = None) -> dict:
+    """LLM parse of one voice command (see process_voice_command)"""
     client = get_groq_client()
     if not client:
-        return {
-            "status": "error",
-            "title": "Service Error",
-            "corrected_sentence": text,
-            "message": "Service unavailable.",
-            "is_cancelled": False
-        }
+        return _voice_error(text, "Service Error", "Service unavailable.")
 
+    system_prompt = await _build_voice_prompt(db, user_id, current_time)
+    
+    try:
+        logger.info(f"🎤 [AI Input] Processing: '{text}'")
+        
+        llm_started = time.perf_counter()
+        chat_completion = await create_chat_completion(
+            "voice_command",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Input: {text}"}
+            ],
+            model="llama-3.1-8b-instant",
+            response_format={"type": "json_object"}
+        )
+        voice_fast_path.fast_path_stats.record_llm(time.perf_counter() - llm_started)
+        
+        result = json.loads(chat_completion.choices[0].message.content)
+        return _voice_response(result, text)
+    except LLMBudgetExceeded:
+        return _voice_error(text, "Timeout", "Sorry, I'm a little slow right now. Could you say that again?")
+    except Exception as e:
+        logger.error(f"❌ AI Parsing Error: {str(e)}")
+        return _voice_error(text, "Parsing Error", "I had trouble processing that. Can you repeat it?")
+
+
+async def _build_voice_prompt(db: AsyncSession, user_id: int, current_time: str = None) -> str:
+    """System prompt for the voice parser, with the user's energy and momentum context"""
     # Strict multi-stage prompt for Grammar & Intent
     # Strict multi-stage prompt for Grammar & Intent
     
@@ -285,10 +490,10 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
     Example 1 (Task):
     Input: "remind me to call my mom tomorrow morning 5 o clock"
     Output: {{
+      "corrected_sentence": "You have a reminder to call your mom tomorrow at 5:00 AM.",
       "status": "ready",
       "intent": "CreateTask",
       "title": "Call Mom",
-      "corrected_sentence": "You have a reminder to call your mom tomorrow at 5:00 AM.",
       "time": "2026-01-29T05:00:00",
       "end_time": null,
       "type": "reminder",
@@ -298,10 +503,10 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
     Example 2 (Map Search):
     Input: "find hospitals near me"
     Output: {{
+      "corrected_sentence": "You want to find hospitals nearby.",
       "status": "ready",
       "intent": "NearbySearch",
       "title": "Find Hospitals",
-      "corrected_sentence": "You want to find hospitals nearby.",
       "time": null,
       "end_time": null,
       "category": "hospital",
@@ -312,10 +517,10 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
     Example 3 (Book Hotel):
     Input: "book a hotel in Chennai for tomorrow"
     Output: {{
+      "corrected_sentence": "You want to book a hotel in Chennai for tomorrow.",
       "status": "ready",
       "intent": "BookHotel",
       "title": "Book Hotel in Chennai",
-      "corrected_sentence": "You want to book a hotel in Chennai for tomorrow.",
       "time": null,
       "end_time": null,
       "location": "Chennai",
@@ -327,10 +532,10 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
     Example 4 (Book Appointment):
     Input: "book a doctor appointment tomorrow at 10am"
     Output: {{
+      "corrected_sentence": "You want to book a doctor appointment tomorrow at 10:00 AM.",
       "status": "ready",
       "intent": "BookAppointment",
       "title": "Doctor Appointment",
-      "corrected_sentence": "You want to book a doctor appointment tomorrow at 10:00 AM.",
       "time": "2026-01-29T10:00:00",
       "end_time": null,
       "location": null,
@@ -341,10 +546,10 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
     
     Return ONLY a JSON object:
     {{
+      "corrected_sentence": "Full polished sentence in 2nd person",
       "status": "ready" | "incomplete",
       "intent": "CreateTask" | "NearbySearch" | "Directions" | "ReverseGeocode" | "BookHotel" | "BookAppointment" | "General",
       "title": "Clean Short Title",
-      "corrected_sentence": "Full polished sentence in 2nd person",
       "time": "ISO 8601 string or null",
       "end_time": "ISO 8601 string or null",
       "category": "map search keyword or null",
@@ -355,63 +560,45 @@ async def process_voice_command(text: str, db: AsyncSession, user_id: int, curre
       "message": "Spoken assistant response"
     }}
     """
-    
-    try:
-        logger.info(f"🎤 [AI Input] Processing: '{text}'")
-        
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Input: {text}"}
-            ],
-            model="llama-3.1-8b-instant",
-            response_format={"type": "json_object"}
-        )
-        
-        import json
-        result = json.loads(chat_completion.choices[0].message.content)
-        logger.info(f"🤖 [AI Output] Status: {result.get('status')}, Title: {result.get('title')}, Sentence: {result.get('corrected_sentence')}, Time: {result.get('time')}")
-        
-        # Production Safety: Cast values and handle defaults
-        status = str(result.get("status", "incomplete"))
-        intent = str(result.get("intent", "CreateTask"))
-        title = str(result.get("title", "New Task")).strip() or "New Task"
-        corrected = str(result.get("corrected_sentence", text)).strip() or text
-        
-        # 🛡️ SAFETY CHECK: If status is "ready" but no time was extracted FOR TASKS, force incomplete
-        if status == "ready" and intent == "CreateTask" and not result.get("time"):
-            logger.warning(f"⚠️ AI returned 'ready' for Task but no time found. Forcing incomplete state.")
-            status = "incomplete"
-            result["message"] = "At what time should I set this reminder?"
-        
-        return {
-            "status": status,
-            "intent": intent,
-            "title": title,
-            "corrected_sentence": corrected,
-            "time": result.get("time"),
-            "end_time": result.get("end_time"),
-            "category": result.get("category"),
-            "destination": result.get("destination"),
-            "type": str(result.get("type", "task")),
-            "message": str(result.get("message", "Processing...")),
-            "is_cancelled": False
-        }
-    except Exception as e:
-        logger.error(f"❌ AI Parsing Error: {str(e)}")
-        return {
-            "status": "error",
-            "title": "Parsing Error",
-            "corrected_sentence": text,
-            "message": "I had trouble processing that. Can you repeat it?",
-            "is_cancelled": False
-        }
-
-
-
-
-
-
-
+    return system_prompt
 
 
+def _voice_response(result: dict, text: str) -> dict:
+    """Raw model JSON -> process_voice_command response"""
+    logger.info(f"🤖 [AI Output] Status: {result.get('status')}, Title: {result.get('title')}, Sentence: {result.get('corrected_sentence')}, Time: {result.get('time')}")
+    
+    # Production Safety: Cast values and handle defaults
+    status = str(result.get("status", "incomplete"))
+    intent = str(result.get("intent", "CreateTask"))
+    title = str(result.get("title", "New Task")).strip() or "New Task"
+    corrected = str(result.get("corrected_sentence", text)).strip() or text
+    
+    # 🛡️ SAFETY CHECK: If status is "ready" but no time was extracted FOR TASKS, force incomplete
+    if status == "ready" and intent == "CreateTask" and not result.get("time"):
+        logger.warning(f"⚠️ AI returned 'ready' for Task but no time found. Forcing incomplete state.")
+        status = "incomplete"
+        result["message"] = "At what time should I set this reminder?"
+    
+    return {
+        "status": status,
+        "intent": intent,
+        "title": title,
+        "corrected_sentence": corrected,
+        "time": result.get("time"),
+        "end_time": result.get("end_time"),
+        "category": result.get("category"),
+        "destination": result.get("destination"),
+        "type": str(result.get("type", "task")),
+        "message": str(result.get("message", "Processing...")),
+        "is_cancelled": False
+    }
+
+
+def _voice_error(text: str, title: str, message: str) -> dict:
+    return {
+        "status": "error",
+        "title": title,
+        "corrected_sentence": text,
+        "message": message,
+        "is_cancelled": False
+    }
@@ -0,0 +1,219 @@
+"""
+Per-user, per-local-day productivity rollup (user_daily_stats) behind the
+week/month insights.
+
+A task counts towards at most three days:
+    created_tasks                          the day it was created
+    completed_tasks, completed_on_time,    the day it was completed
+    completion_seconds
+    overdue_tasks                          the day it was due, if it is still pending
+                                           past its Due Now stage or was completed late
+
+contribution() derives all of it from the task's current fields, so the
+rollup moves with the same before/after deltas as the all-time counters
+(task_stats_service.TaskStatsTracker), and reconcile() rebuilds any range
+from the tasks table with the same rules.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, delete, text, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.job_run import JobRun
+from app.models.task import Task
+from app.models.user_daily_stats import UserDailyStats
+from app.utils.timezone import get_ist_time
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+COLUMNS = ("created_tasks", "completed_tasks", "completed_on_time", "overdue_tasks", "completion_seconds")
+# Insights ranges, in days (today included)
+RANGES = {"week": 7, "month": 30}
+# Days rebuilt by the nightly reconcile
+RECONCILE_DAYS = 35
+# pg advisory lock id serializing the nightly reconcile across worker processes
+RECONCILE_LOCK_KEY = 7310903
+# job_runs.name of the nightly reconcile
+RECONCILE_JOB = "daily_stats_reconcile"
+# Local day of the last reconcile this process knows of (saves the job_runs lookup)
+_reconciled = {"day": None}
+# created_at is written by get_ist_time (IST wall clock stored as UTC), i.e. this far ahead of the real instant
+CREATED_AT_SHIFT = timedelta(hours=5, minutes=30)
+
+# Same rules as contribution(), for every task at once
+RECONCILE_SQL = text("""
+    INSERT INTO user_daily_stats
+        (user_id, day, created_tasks, completed_tasks, completed_on_time, overdue_tasks, completion_seconds)
+    SELECT user_id, day, sum(created), sum(completed), sum(on_time), sum(overdue), sum(seconds)
+    FROM (
+        SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+               1 AS created, 0 AS completed, 0 AS on_time, 0 AS overdue, 0 AS seconds
+        FROM tasks WHERE created_at IS NOT NULL
+        UNION ALL
+        SELECT user_id, (completed_at AT TIME ZONE 'Asia/Kolkata')::date,
+               0, 1, CASE WHEN due_date IS NULL OR completed_at <= due_date THEN 1 ELSE 0 END, 0,
+               GREATEST(floor(EXTRACT(EPOCH FROM completed_at - (created_at - interval '5 hours 30 minutes'))), 0)::bigint
+        FROM tasks WHERE status = 'completed' AND completed_at IS NOT NULL
+        UNION ALL
+        SELECT user_id, (due_date AT TIME ZONE 'Asia/Kolkata')::date, 0, 0, 0, 1, 0
+        FROM tasks WHERE due_date IS NOT NULL AND (
+            (status = 'completed' AND completed_at > due_date)
+            OR (status = 'pending' AND last_fired_stage = 0)
+        )
+    ) src
+    WHERE user_id IS NOT NULL AND day >= :since
+    GROUP BY user_id, day
+""")
+
+
+def _utc(dt: datetime) -> datetime:
+    # Naive values are stored as UTC by the driver
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def local_day(dt: datetime) -> date:
+    return _utc(dt).astimezone(IST).date()
+
+
+def is_late(task: Task) -> bool:
+    return (
+        task.status == "completed" and task.completed_at is not None
+        and task.due_date is not None and _utc(task.completed_at) > _utc(task.due_date)
+    )
+
+
+def contribution(task: Task) -> dict:
+    """(day, column) -> what this task adds to the rollup"""
+    out = {}
+
+    def add(day, column, value):
+        if value:
+            out[(day, column)] = out.get((day, column), 0) + value
+
+    # Not flushed yet means created just now
+    created = _utc(task.created_at or get_ist_time()) - CREATED_AT_SHIFT
+    add(local_day(created), "created_tasks", 1)
+
+    if task.status == "completed" and task.completed_at is not None:
+        day = local_day(task.completed_at)
+        add(day, "completed_tasks", 1)
+        add(day, "completed_on_time", int(not is_late(task)))
+        add(day, "completion_seconds", max(int((_utc(task.completed_at) - created).total_seconds()), 0))
+
+    # Pending past the Due Now stage: the rule of task_stats_service.is_overdue
+    missed = task.status == "pending" and task.last_fired_stage == 0
+    if task.due_date is not None and (missed or is_late(task)):
+        add(local_day(task.due_date), "overdue_tasks", 1)
+    return out
+
+
+def diff(after: dict, before: dict) -> dict:
+    keys = set(after) | set(before)
+    return {k: after.get(k, 0) - before.get(k, 0) for k in keys if after.get(k, 0) != before.get(k, 0)}
+
+
+async def apply_delta(db: AsyncSession, user_id: int, delta: dict):
+    """Add a (day, column) -> value delta to the user's daily rows (created on first use)"""
+    if user_id is None or not delta:
+        return
+    per_day = {}
+    for (day, column), value in delta.items():
+        per_day.setdefault(day, dict.fromkeys(COLUMNS, 0))[column] += value
+
+    stmt = insert(UserDailyStats).values([
+        {"user_id": user_id, "day": day, **values} for day, values in sorted(per_day.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+        set_={
+            **{name: getattr(UserDailyStats, name) + stmt.excluded[name] for name in COLUMNS},
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(stmt)
+
+
+async def reconcile(db: AsyncSession, now_utc: datetime, days: int = RECONCILE_DAYS) -> int:
+    """
+    Rebuild the last `days` local days of every user from the tasks table
+    (repairs drift, e.g. from writes that bypass the services) and record the
+    day in job_runs. Commits.
+    """
+    since = local_day(now_utc) - timedelta(days=days - 1)
+    # Waits for in-flight task transactions and holds new increments until the
+    # rebuilt rows are committed, so none are lost or counted twice
+    await db.execute(text("LOCK TABLE user_daily_stats IN SHARE ROW EXCLUSIVE MODE"))
+    await db.execute(delete(UserDailyStats).where(UserDailyStats.day >= since))
+    result = await db.execute(RECONCILE_SQL, {"since": since})
+    today = local_day(now_utc)
+    stmt = insert(JobRun).values(name=RECONCILE_JOB, last_run_on=today)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[JobRun.name],
+        set_={"last_run_on": stmt.excluded.last_run_on, "updated_at": func.now()}
+    ))
+    await db.commit()
+    _reconciled["day"] = today
+    logger.info(f"📊 [DailyStats] Rebuilt {result.rowcount} user-days since {since}")
+    return result.rowcount
+
+
+async def reconcile_if_due(db: AsyncSession, now_utc: datetime) -> bool:
+    """
+    Nightly reconcile: runs once per local day, on the first job run at or after
+    DAILY_STATS_RECONCILE_HOUR, so a skipped tick only delays it. One worker
+    runs it; the others skip (advisory lock) and find the day recorded after.
+    """
+    now_ist = _utc(now_utc).astimezone(IST)
+    today = now_ist.date()
+    if now_ist.hour < settings.DAILY_STATS_RECONCILE_HOUR or _reconciled["day"] == today:
+        return False
+
+    locked = await db.execute(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY)))
+    if not locked.scalar():
+        return False
+    last_run_on = await db.scalar(select(JobRun.last_run_on).filter(JobRun.name == RECONCILE_JOB))
+    if last_run_on is not None and last_run_on >= today:
+        _reconciled["day"] = last_run_on
+        # Releases the advisory lock
+        await db.commit()
+        return False
+
+    # Commits, which also releases the advisory lock
+    await reconcile(db, now_utc)
+    return True
+
+
+async def get_range(db: AsyncSession, user_id: int, range_name: str, today: date) -> dict:
+    """Per-day rows (zero-filled) and totals for the last RANGES[range_name] local days"""
+    start = today - timedelta(days=RANGES[range_name] - 1)
+    result = await db.execute(
+        select(UserDailyStats).filter(
+            UserDailyStats.user_id == user_id,
+            UserDailyStats.day >= start,
+            UserDailyStats.day <= today
+        )
+    )
+    rows = {row.day: row for row in result.scalars().all()}
+
+    def summarize(values: dict) -> dict:
+        completed = values["completed_tasks"]
+        return {
+            "created_tasks": values["created_tasks"],
+            "completed_tasks": completed,
+            "overdue_tasks": values["overdue_tasks"],
+            "on_time_rate": int(values["completed_on_time"] / completed * 100) if completed else 0,
+            "avg_completion_hours": round(values["completion_seconds"] / completed / 3600, 1) if completed else 0,
+        }
+
+    days, totals = [], dict.fromkeys(COLUMNS, 0)
+    for offset in range(RANGES[range_name]):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        values = {name: (getattr(row, name) if row else 0) for name in COLUMNS}
+        for name in COLUMNS:
+            totals[name] += values[name]
+        days.append({"date": day.isoformat(), **summarize(values)})
+
+    return {"range": range_name, "start": start.isoformat(), "end": today.isoformat(), "totals": summarize(totals), "days": days}
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.reminder_delivery import ReminderDelivery
+
+SOURCE_TASK = "task"
+SOURCE_GOOGLE = "google"
+
+# Ledger rows older than this can no longer collide with a live stage
+RETENTION = timedelta(days=7)
+
+
+def task_item_id(task_id: int, fire_at: datetime) -> str:
+    """Fire time is part of the key so rescheduled tasks and repeated nudges fire again"""
+    return f"{task_id}@{int(fire_at.timestamp())}"
+
+
+def google_item_id(user_id: int, google_id: str, start_at: datetime) -> str:
+    """Shared events have the same id for every attendee, hence the user prefix"""
+    return f"{user_id}:{google_id}@{int(start_at.timestamp())}"
+
+
+def entry(source: str, item_id: str, stage: int, user_id: int) -> dict:
+    return {"source": source, "item_id": item_id, "stage": stage, "user_id": user_id}
+
+
+async def claim(db: AsyncSession, entries: list) -> set:
+    """
+    Claim sends in one round trip: INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    Returns the (source, item_id, stage) keys this caller won; anything missing
+    was already delivered (or is being delivered) by someone else.
+    """
+    if not entries:
+        return set()
+    stmt = insert(ReminderDelivery).values(entries).on_conflict_do_nothing(
+        constraint="uq_reminder_deliveries_key"
+    ).returning(ReminderDelivery.source, ReminderDelivery.item_id, ReminderDelivery.stage)
+    result = await db.execute(stmt)
+    return {tuple(row) for row in result.all()}
+
+
+async def release(db: AsyncSession, keys: list):
+    """Drop claims whose send failed so a retry can claim them again"""
+    if not keys:
+        return
+    await db.execute(delete(ReminderDelivery).where(
+        tuple_(ReminderDelivery.source, ReminderDelivery.item_id, ReminderDelivery.stage).in_(keys)
+    ))
+
+
+async def prune(db: AsyncSession, now: datetime):
+    """Remove ledger rows past RETENTION"""
+    await db.execute(delete(ReminderDelivery).where(ReminderDelivery.created_at < now - RETENTION))
@@ -1,10 +1,12 @@
 import os
+import asyncio
 import datetime
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.core.config import settings
+from app.services import plan_cache
 
 # Path to the credentials file you uploaded
 CLIENT_SECRET_FILE = "client_secret.json"
@@ -49,17 +51,20 @@ async def exchange_code_for_tokens(db: AsyncSession, user: User, code: str):
     user.google_token_expiry = credentials.expiry
 
     db.add(user)
+    # Google items join the daily plan from now on
+    await plan_cache.invalidate(db, user.id)
     await db.commit()
     await db.refresh(user)
     
     return user
 
-async def get_google_data(user: User, db: AsyncSession, time_min: str = None, time_max: str = None):
+async def get_credentials(user: User, db: AsyncSession):
     """
-    Fetch both Events and Tasks from Google.
+    Build (and refresh if needed) the user's Google credentials.
+    Returns None if the user isn't synced or the refresh failed.
     """
     if not user.google_refresh_token:
-        return {"events": [], "tasks": []}
+        return None
 
     import google.oauth2.credentials
     from google.auth.transport.requests import Request
@@ -76,17 +81,27 @@ async def get_google_data(user: User, db: AsyncSession, time_min: str = None, ti
         # DO NOT Pass scopes here, let the token dictate them.
     )
 
+    if creds.expired:
+        try:
+            # Token endpoint round trip; keep it off the event loop
+            await asyncio.to_thread(creds.refresh, Request())
+            user.google_access_token = creds.token
+            db.add(user)
+            await db.commit()
+        except Exception as refresh_err:
+             print(f"⚠️ Refresh failed: {refresh_err}")
+             # If refresh fails entirely, we can't proceed
+             return None
+    return creds
+
+async def get_google_data(user: User, db: AsyncSession, time_min: str = None, time_max: str = None):
+    """
+    Fetch both Events and Tasks from Google.
+    """
     try:
-        if creds.expired:
-            try:
-                creds.refresh(Request())
-                user.google_access_token = creds.token
-                db.add(user)
-                await db.commit()
-            except Exception as refresh_err:
-                 print(f"⚠️ Refresh failed: {refresh_err}")
-                 # If refresh fails entirely, we can't proceed
-                 return {"events": [], "tasks": []}
+        creds = await get_credentials(user, db)
+        if creds is None:
+            return {"events": [], "tasks": []}
 
         # 1. Fetch Calendar Events (Assume this scope is always present for synced users)
         events = []
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from dateutil import parser
+from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.models.google_item import GoogleItem
+from app.models.google_sync_state import GoogleSyncState
+from app.services.google_calendar_service import get_credentials
+from app.services import plan_cache
+
+logger = logging.getLogger(__name__)
+
+# How far back the first (full) calendar sync reaches
+FULL_SYNC_PAST = timedelta(days=7)
+# Tasks updatedMin is moved back a little to absorb clock skew with Google
+UPDATED_MIN_SKEW = timedelta(minutes=1)
+# Rows per upsert statement (keeps us far below the bind parameter limit)
+UPSERT_CHUNK = 500
+
+# user_id -> running refresh() task, so concurrent plan loads share one sync
+_refreshing = {}
+
+
+def _parse_time(value: str):
+    """Google timestamps / all-day dates -> aware UTC datetime"""
+    if not value:
+        return None
+    try:
+        dt = parser.parse(value)
+    except (ValueError, OverflowError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _event_row(user_id: int, event: dict) -> dict:
+    start = event.get('start', {}).get('dateTime') or event.get('start', {}).get('date')
+    return {
+        "user_id": user_id,
+        "kind": "event",
+        "google_id": event["id"],
+        "list_id": None,
+        "title": event.get("summary", "Event"),
+        "status": event.get("status"),
+        "start_at": _parse_time(start),
+        "deleted": event.get("status") == "cancelled",
+        "raw": event,
+    }
+
+
+def _task_row(user_id: int, list_id: str, task: dict) -> dict:
+    task['_list_id'] = list_id
+    return {
+        "user_id": user_id,
+        "kind": "task",
+        "google_id": f"{list_id}|{task['id']}",
+        "list_id": list_id,
+        "title": task.get("title", "Task"),
+        "status": task.get("status"),
+        "start_at": _parse_time(task.get("due")),
+        "deleted": bool(task.get("deleted") or task.get("hidden")),
+        "raw": task,
+    }
+
+
+async def _upsert(db: AsyncSession, rows: list):
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(GoogleItem).values(rows[i:i + UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_google_items_user_kind_google_id",
+            set_={
+                "list_id": stmt.excluded.list_id,
+                "title": stmt.excluded.title,
+                "status": stmt.excluded.status,
+                "start_at": stmt.excluded.start_at,
+                "deleted": stmt.excluded.deleted,
+                "raw": stmt.excluded.raw,
+                "synced_at": datetime.now(timezone.utc),
+            }
+        )
+        await db.execute(stmt)
+
+
+async def _sync_calendar(db: AsyncSession, creds, user: User, state: GoogleSyncState, now: datetime) -> int:
+    """Pull calendar changes since the stored syncToken (full sync without one)"""
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+
+    service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+    full_sync = not state.calendar_sync_token
+    params = {"calendarId": "primary", "singleEvents": True, "showDeleted": True, "maxResults": 250}
+    if full_sync:
+        params["timeMin"] = (now - FULL_SYNC_PAST).isoformat().replace('+00:00', 'Z')
+    else:
+        params["syncToken"] = state.calendar_sync_token
+
+    changed = 0
+    page_token = None
+    while True:
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            result = await asyncio.to_thread(service.events().list(**params).execute)
+        except HttpError as e:
+            if e.resp.status == 410 and not full_sync:
+                # Sync token expired: start over with a full sync
+                logger.info(f"♻️ [Mirror] Calendar sync token expired for user {user.id}, full resync")
+                state.calendar_sync_token = None
+                return await _sync_calendar(db, creds, user, state, now)
+            raise
+
+        if full_sync and not page_token:
+            # Replace the old snapshot only once Google answered, so a failed
+            # full sync doesn't leave the mirror without events
+            await db.execute(delete(GoogleItem).where(
+                and_(GoogleItem.user_id == user.id, GoogleItem.kind == "event")
+            ))
+
+        rows = [_event_row(user.id, e) for e in result.get("items", []) if e.get("id")]
+        await _upsert(db, rows)
+        changed += len(rows)
+
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            state.calendar_sync_token = result.get("nextSyncToken")
+            break
+
+    if full_sync:
+        state.last_full_sync_at = now
+    return changed
+
+
+async def _sync_tasks(db: AsyncSession, creds, user: User, state: GoogleSyncState, now: datetime) -> int:
+    """Pull Google Tasks updated since the last poll"""
+    from googleapiclient.discovery import build
+
+    service = build('tasks', 'v1', credentials=creds, cache_discovery=False)
+    lists_result = await asyncio.to_thread(service.tasklists().list().execute)
+    list_ids = [tl['id'] for tl in lists_result.get('items', [])]
+
+    # Tasks of task lists that no longer exist are gone as well
+    await db.execute(
+        update(GoogleItem)
+        .where(and_(
+            GoogleItem.user_id == user.id,
+            GoogleItem.kind == "task",
+            GoogleItem.deleted == False,
+            GoogleItem.list_id.notin_(list_ids) if list_ids else True
+        ))
+        .values(deleted=True)
+    )
+
+    changed = 0
+    for list_id in list_ids:
+        params = {"tasklist": list_id, "showCompleted": True, "showHidden": True, "showDeleted": True, "maxResults": 100}
+        if state.tasks_updated_min:
+            params["updatedMin"] = state.tasks_updated_min.isoformat().replace('+00:00', 'Z')
+
+        page_token = None
+        while True:
+            if page_token:
+                params["pageToken"] = page_token
+            result = await asyncio.to_thread(service.tasks().list(**params).execute)
+            rows = [_task_row(user.id, list_id, t) for t in result.get("items", []) if t.get("id")]
+            await _upsert(db, rows)
+            changed += len(rows)
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+    state.tasks_updated_min = now - UPDATED_MIN_SKEW
+    return changed
+
+
+async def sync_user(db: AsyncSession, user: User) -> bool:
+    """Incrementally refresh one user's mirror. Returns False if Google couldn't be reached."""
+    now = datetime.now(timezone.utc)
+    state = await db.get(GoogleSyncState, user.id)
+    if state is None:
+        state = GoogleSyncState(user_id=user.id)
+        db.add(state)
+
+    creds = await get_credentials(user, db)
+    if creds is None:
+        # Back off until the next interval instead of retrying every minute
+        state.last_synced_at = now
+        await db.commit()
+        return False
+
+    events_changed = tasks_changed = 0
+    try:
+        events_changed = await _sync_calendar(db, creds, user, state, now)
+    except Exception as ce:
+        print(f"⚠️ [Mirror] Calendar sync failed for user {user.id}: {ce}")
+
+    try:
+        tasks_changed = await _sync_tasks(db, creds, user, state, now)
+    except Exception as te:
+        if "403" in str(te) or "401" in str(te):
+            print(f"ℹ️ [Mirror] Tasks sync skipped for user {user.id} (scope likely missing).")
+        else:
+            print(f"⚠️ [Mirror] Tasks sync failed for user {user.id}: {te}")
+
+    state.last_synced_at = now
+    db.add(state)
+    if events_changed or tasks_changed:
+        await plan_cache.invalidate(db, user.id)
+    await db.commit()
+    if events_changed or tasks_changed:
+        logger.info(f"🔄 [Mirror] User {user.id}: {events_changed} events, {tasks_changed} tasks changed")
+    return True
+
+
+async def ensure_fresh(db: AsyncSession, user: User, max_age_minutes: int = None) -> None:
+    """Sync the user's mirror first if it is older than max_age_minutes"""
+    if not user or not user.google_refresh_token:
+        return
+    max_age = timedelta(minutes=max_age_minutes if max_age_minutes is not None else settings.GOOGLE_PLAN_MAX_AGE_MINUTES)
+    state = await db.get(GoogleSyncState, user.id)
+    if state and state.last_synced_at and datetime.now(timezone.utc) - state.last_synced_at < max_age:
+        return
+    try:
+        await sync_user(db, user)
+    except Exception as e:
+        logger.error(f"❌ [Mirror] Sync failed for user {user.id}: {e}")
+        await db.rollback()
+
+
+async def _refresh(user_id: int):
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+            await ensure_fresh(db, user)
+    except Exception as e:
+        logger.error(f"❌ [Mirror] Refresh failed for user {user_id}: {e}")
+
+
+def refresh(user_id: int) -> asyncio.Task:
+    """Start (or join the running) freshness check + sync of a user's mirror, in its own session"""
+    task = _refreshing.get(user_id)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh(user_id))
+        _refreshing[user_id] = task
+        task.add_done_callback(lambda t: _refreshing.pop(user_id, None) if _refreshing.get(user_id) is t else None)
+    return task
+
+
+async def ensure_fresh_within(user_id: int, budget_seconds: float) -> bool:
+    """
+    refresh() bounded by a time budget. False if it didn't finish in time: the
+    sync keeps running in the background (and invalidates the plan cache when
+    it lands), meanwhile readers get the mirror as it is.
+    """
+    try:
+        await asyncio.wait_for(asyncio.shield(refresh(user_id)), timeout=budget_seconds)
+        return True
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ [Mirror] Sync for user {user_id} exceeded {budget_seconds}s, serving the mirror as-is")
+        return False
+
+
+async def sync_due_users(db: AsyncSession, now: datetime) -> int:
+    """Background refresh of mirrors older than GOOGLE_SYNC_INTERVAL_MINUTES (oldest first)"""
+    cutoff = now - timedelta(minutes=settings.GOOGLE_SYNC_INTERVAL_MINUTES)
+
+    # Newly connected users get their state row (and with it a first sync)
+    missing = select(User.id).outerjoin(
+        GoogleSyncState, GoogleSyncState.user_id == User.id
+    ).filter(and_(User.google_refresh_token != None, GoogleSyncState.user_id == None))
+    await db.execute(
+        insert(GoogleSyncState).from_select(["user_id"], missing).on_conflict_do_nothing()
+    )
+
+    # ⚡ Claim due users with SKIP LOCKED so parallel workers never sync the same one
+    due = select(GoogleSyncState.user_id).join(
+        User, User.id == GoogleSyncState.user_id
+    ).filter(
+        and_(
+            User.google_refresh_token != None,
+            or_(GoogleSyncState.last_synced_at == None, GoogleSyncState.last_synced_at <= cutoff)
+        )
+    ).order_by(
+        GoogleSyncState.last_synced_at.asc().nullsfirst()
+    ).limit(settings.GOOGLE_SYNC_BATCH_SIZE).with_for_update(skip_locked=True, of=GoogleSyncState)
+
+    claim = update(GoogleSyncState).where(
+        GoogleSyncState.user_id.in_(due.scalar_subquery())
+    ).values(last_synced_at=now).returning(GoogleSyncState.user_id).execution_options(synchronize_session=False)
+    result = await db.execute(claim)
+    user_ids = result.scalars().all()
+    await db.commit()
+
+    if not user_ids:
+        return 0
+    result = await db.execute(select(User).filter(User.id.in_(user_ids)))
+    users = result.scalars().all()
+
+    synced = 0
+    for user in users:
+        try:
+            if await sync_user(db, user):
+                synced += 1
+        except Exception as e:
+            logger.error(f"❌ [Mirror] Sync failed for user {user.id}: {e}")
+            await db.rollback()
+    return synced
+
+
+async def get_mirror_data(db: AsyncSession, user_id: int, time_min: datetime, time_max: datetime) -> dict:
+    """
+    Same shape as google_calendar_service.get_google_data, read from the mirror:
+    events starting inside [time_min, time_max] and all live Google Tasks.
+    """
+    query = select(GoogleItem.kind, GoogleItem.raw).filter(
+        and_(
+            GoogleItem.user_id == user_id,
+            GoogleItem.deleted == False,
+            or_(
+                GoogleItem.kind == "task",
+                and_(GoogleItem.start_at >= time_min, GoogleItem.start_at <= time_max)
+            )
+        )
+    ).order_by(GoogleItem.start_at)
+    result = await db.execute(query)
+
+    data = {"events": [], "tasks": []}
+    for kind, raw in result.all():
+        data["events" if kind == "event" else "tasks"].append(raw)
+    return data
+
+
+async def set_task_status(db: AsyncSession, user_id: int, composite_id: str, status: str):
+    """Reflect a status change we pushed to Google Tasks in the mirror right away"""
+    query = select(GoogleItem).filter(
+        and_(
+            GoogleItem.user_id == user_id,
+            GoogleItem.kind == "task",
+            GoogleItem.google_id == composite_id
+        )
+    )
+    result = await db.execute(query)
+    item = result.scalar_one_or_none()
+    if item:
+        raw = {**(item.raw or {}), "status": status}
+        if status == "completed":
+            raw["completed"] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        else:
+            raw.pop("completed", None)
+        item.status = status
+        item.raw = raw
+        db.add(item)
+        await plan_cache.invalidate(db, user_id)
+        await db.commit()
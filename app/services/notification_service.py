@@ -1,55 +1,129 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_
 from datetime import datetime, timedelta, timezone
 from app.models.task import Task
 from app.models.user_setting import UserSetting
 from app.models.notification import Notification
 from app.core.fcm_manager import fcm_manager
+from app.core.config import settings
+from app.core.job_stats import job_stats, count_rows
+from app.core.database import AsyncSessionLocal
+import asyncio
 import json
 import random
 import logging
-from app.services.ai_service import generate_friendly_reminder
+from contextlib import asynccontextmanager
 from app.models.user import User
-from app.services import google_calendar_service
+from app.models.google_item import GoogleItem
+from app.services import google_mirror_service, delivery_ledger, reminder_text_service, task_stats_service, summary_service, daily_stats_service, plan_cache
+from app.services.delivery_ledger import SOURCE_TASK, SOURCE_GOOGLE, task_item_id, google_item_id
+from app.services.reminder_schedule import (
+    STAGE_NUDGE, STAGE_END, FIRE_GRACE, NUDGE_INTERVAL,
+    compute_next_fire, refresh_next_fire, mark_stage_fired
+)
 
 logger = logging.getLogger(__name__)
 
-async def check_and_send_notifications(db: AsyncSession):
+# Max due stages handled per sweep; the rest are picked up by the next one
+SWEEP_BATCH_SIZE = 200
+MAX_NUDGES_PER_SWEEP = 1
+# Delay before retrying a failed send or a deferred nudge
+RETRY_DELAY = timedelta(minutes=1)
+# Claimed stages stay hidden from other workers this long; if the claiming
+# worker dies mid-sweep they become due again afterwards
+CLAIM_LEASE = timedelta(minutes=2)
+
+# summary_type -> (push title, data type)
+SUMMARY_PUSHES = {
+    "MORNING": ("Good Morning! ☀️", "morning_summary"),
+    "EVENING": ("Evening Update 🌙", "evening_summary"),
+}
+# summary_type -> column holding the date it was last sent
+SUMMARY_COLUMNS = {
+    "MORNING": UserSetting.last_morning_summary_at,
+    "EVENING": UserSetting.last_evening_summary_at,
+}
+
+async def check_and_send_notifications(db: AsyncSession, include_local_reminders: bool = True):
     """
     Check for upcoming tasks and send push notifications
-    Runs every minute from background scheduler
+    Runs every minute from background scheduler.
+    
+    include_local_reminders: set to False when the in-memory reminder engine is
+    running, since it already delivers local reminder stages on time.
     """
     # 🌍 Fix: Use timezone-aware UTC now to match DB
     now = datetime.now(timezone.utc)
     
-    # 1-3. Check for 20-minute, 10-minute, and Due Now reminders for Local & Google
-    for mins in [20, 10, 0]:
-        await process_reminders(db, now, minutes=mins)
-        await process_google_reminders(db, now, minutes=mins)
-
-    # 4. Check for meeting end times to restore sound 🌅
-    await process_meeting_restoration(db, now)
-
-    # 5. Check for completion feedback (tasks due in the past 5-10 mins, still pending)
-    await check_task_completion_reminders(db, now)
-
-    # 5. Check for Morning/Evening Summaries ☕🌙
-    await check_and_send_summaries(db, now)
+    # 1. Local reminders, completion nudges and meeting-end restores in ONE sweep
+    if include_local_reminders:
+        async with guarded_phase(db, "local_stages"):
+            await process_due_stages(db, now)
+
+    # 2. Refresh stale Google mirrors (incremental sync tokens)
+    async with guarded_phase(db, "google_sync"):
+        await google_mirror_service.sync_due_users(db, now)
+
+    # 3. Check for 20-minute, 10-minute, and Due Now reminders for Google
+    async with guarded_phase(db, "google_reminders"):
+        for mins in [20, 10, 0]:
+            await process_google_reminders(db, now, minutes=mins)
+
+    # 4. Check for Morning/Evening Summaries ☕🌙
+    async with guarded_phase(db, "summaries"):
+        await check_and_send_summaries(db, now)
+
+    # 5. Write AI reminder copy for stages entering the look-ahead window,
+    # last so LLM latency never delays a send
+    async with guarded_phase(db, "reminder_texts"):
+        await reminder_text_service.warm_window(db, now)
+
+    # 6. Pre-build summaries due in the next few minutes (same reason)
+    async with guarded_phase(db, "summary_drafts"):
+        await summary_service.prebuild(db, now)
+
+    # 7. Housekeeping: forget ledger entries, texts and summaries that can no longer be used
+    if now.minute == 0:
+        async with guarded_phase(db, "housekeeping"):
+            await delivery_ledger.prune(db, now)
+            await reminder_text_service.prune(db, now)
+            await summary_service.prune(db, now)
+            await db.commit()
+
+    # 8. Nightly: rebuild the recent days of the productivity rollup from the tasks table
+    # (once a day, from DAILY_STATS_RECONCILE_HOUR on)
+    async with guarded_phase(db, "daily_stats_reconcile"):
+        await daily_stats_service.reconcile_if_due(db, now)
 
     # Note: Commits are now handled inside the processing functions to minimize race conditions
 
+@asynccontextmanager
+async def guarded_phase(db: AsyncSession, name: str):
+    """
+    One phase of the job, timed by job_stats. A failure is logged and rolled
+    back so the shared session is usable again and the later phases still run.
+    """
+    try:
+        with job_stats.phase(name):
+            yield
+    except Exception as e:
+        logger.error(f"❌ [Job] Phase '{name}' failed: {e}")
+        await db.rollback()
+
 async def check_and_send_summaries(db: AsyncSession, now_utc: datetime):
     """
-    Check if it's time to send Morning/Evening AI summaries
+    Send the Morning/Evening summaries whose time has come. The text was
+    normally pre-built by summary_service.prebuild, so this only pushes;
+    summaries still missing (or outdated by task changes) are built here,
+    concurrently (bounded by SUMMARY_CONCURRENCY). Everything due goes out
+    as one FCM batch and is committed together. A summary whose minute was
+    missed is still sent up to SUMMARY_CATCHUP_MINUTES later.
     """
-    from app.services.ai_service import generate_ai_summary
     from app.models.user import User
     from sqlalchemy import select
-    from datetime import time as dt_time # Use python standard time
     
     # Simple IST conversion for time check (since settings are in Local Time usually)
     now_ist = now_utc + timedelta(hours=5, minutes=30)
-    current_time_str = now_ist.strftime("%H:%M")
     current_date_str = now_ist.strftime("%Y-%m-%d")
 
     # Fetch all users with settings
@@ -61,39 +135,92 @@ async def check_and_send_summaries(db: AsyncSession, now_utc: datetime):
     )
     result = await db.execute(query)
     users_with_settings = result.all()
+    count_rows(len(users_with_settings))
 
+    # (user, setting, summary_type) for every summary due (not sent yet today, time reached)
+    jobs = []
     for user, setting in users_with_settings:
-        # --- MORNING CHECK ---
-        if setting.morning_enabled and setting.morning_time == current_time_str:
-            if setting.last_morning_summary_at != current_date_str:
-                tasks = await get_user_tasks_for_day(db, user.id, now_ist.date())
-                message = await generate_ai_summary("MORNING", user.full_name, tasks)
-                if message:
-                    await fcm_manager.send_notification(
-                        token=setting.fcm_token,
-                        title="Good Morning! ☀️",
-                        body=message,
-                        data={"type": "morning_summary"}
-                    )
-                    await record_notification(db, user.id, "Good Morning! ☀️", message, {"type": "morning_summary"})
-                    setting.last_morning_summary_at = current_date_str
-                    db.add(setting)
-
-        # --- EVENING CHECK ---
-        if setting.evening_enabled and setting.evening_time == current_time_str:
-            if setting.last_evening_summary_at != current_date_str:
-                tasks = await get_user_tasks_for_day(db, user.id, now_ist.date())
-                message = await generate_ai_summary("EVENING", user.full_name, tasks)
-                if message:
-                    await fcm_manager.send_notification(
-                        token=setting.fcm_token,
-                        title="Evening Update 🌙",
-                        body=message,
-                        data={"type": "evening_summary"}
-                    )
-                    await record_notification(db, user.id, "Evening Update 🌙", message, {"type": "evening_summary"})
-                    setting.last_evening_summary_at = current_date_str
-                    db.add(setting)
+        for summary_type in summary_service.due_summaries(setting, now_ist, ahead=0, behind=settings.SUMMARY_CATCHUP_MINUTES):
+            jobs.append((user, setting, summary_type))
+
+    if not jobs:
+        return
+
+    # ⚡ Claim the summaries atomically (UPDATE ... RETURNING) so that with several
+    # worker processes each summary is built and sent by exactly one of them
+    claimed = set()
+    for summary_type, column in SUMMARY_COLUMNS.items():
+        ids = [setting.id for _, setting, s_type in jobs if s_type == summary_type]
+        if not ids:
+            continue
+        claim = update(UserSetting).where(
+            and_(
+                UserSetting.id.in_(ids),
+                column.is_distinct_from(current_date_str)
+            )
+        ).values({column: current_date_str}).returning(UserSetting.id).execution_options(synchronize_session=False)
+        result = await db.execute(claim)
+        claimed.update((setting_id, summary_type) for setting_id in result.scalars().all())
+    await db.commit()
+
+    jobs = [job for job in jobs if (job[1].id, job[2]) in claimed]
+    if not jobs:
+        return
+    failed = []  # Claims to give back: (setting_id, summary_type)
+
+    print(f"☕ [Summary] Sending {len(jobs)} summaries (parallelism {settings.SUMMARY_CONCURRENCY})")
+    semaphore = asyncio.Semaphore(settings.SUMMARY_CONCURRENCY)
+
+    async def build_summary(user_id: int, user_name: str, summary_type: str):
+        async with semaphore:
+            # Each worker gets its own session: one AsyncSession can't run queries concurrently
+            async with AsyncSessionLocal() as worker_db:
+                # Pre-built draft if it still matches the tasks, otherwise written now
+                return await summary_service.get_or_build(worker_db, user_id, user_name, summary_type, now_ist.date())
+
+    messages = await asyncio.gather(
+        *[build_summary(user.id, user.full_name, summary_type) for user, _, summary_type in jobs],
+        return_exceptions=True
+    )
+
+    outgoing = []  # (job, push kwargs)
+    for job, message in zip(jobs, messages):
+        user, setting, summary_type = job
+        if isinstance(message, Exception):
+            logger.error(f"❌ [Summary] Failed to build {summary_type} summary for user {user.id}: {message}")
+            failed.append((setting.id, summary_type))
+            continue
+        if not message:
+            continue
+        title, data_type = SUMMARY_PUSHES[summary_type]
+        outgoing.append((job, {
+            "token": setting.fcm_token,
+            "title": title,
+            "body": message,
+            "data": {"type": data_type}
+        }))
+
+    async for index, message_id, error in fcm_manager.send_batch([push for _, push in outgoing]):
+        (user, setting, summary_type), push = outgoing[index]
+        if error == "STALE_TOKEN":
+            print(f"🧹 [Cleanup] Clearing stale FCM token for user {user.id}")
+            setting.fcm_token = None
+            db.add(setting)
+        elif error:
+            logger.error(f"❌ [Summary] Failed to send {summary_type} summary to user {user.id}: {error}")
+            failed.append((setting.id, summary_type))
+        else:
+            await record_notification(db, user.id, push["title"], push["body"], {"type": push["data"]["type"]})
+
+    # Failed summaries give their claim back so they can be sent again
+    for setting_id, summary_type in failed:
+        await db.execute(
+            update(UserSetting).where(UserSetting.id == setting_id)
+            .values({SUMMARY_COLUMNS[summary_type]: None})
+            .execution_options(synchronize_session=False)
+        )
+
+    await db.commit()
 
 async def get_user_tasks_for_day(db: AsyncSession, user_id: int, target_date):
     """Helper to fetch tasks for a specific user on a specific day using robust IST filtering"""
@@ -141,85 +268,194 @@ async def get_user_tasks_for_day(db: AsyncSession, user_id: int, target_date):
             
     return tasks
 
-async def check_task_completion_reminders(db: AsyncSession, now: datetime):
+async def process_due_stages(db: AsyncSession, now: datetime):
     """
-    Every 30 minutes after due time, check if user completed the task.
-    Continues until status is 'completed'.
+    Single indexed sweep over Task.next_fire_at that delivers every due stage:
+    reminder lead times (e.g. 20m/10m/Due Now), 30-min completion nudges and
+    meeting-end sound restoration. All pushes of a sweep go out as one FCM batch.
+    Returns [(task_id, next_fire_at)] for every task it advanced.
     """
-    try:
-        # 1. Find all pending tasks that are past due
-        query = select(Task, UserSetting.fcm_token).join(
-            UserSetting, Task.user_id == UserSetting.user_id
-        ).filter(
-            and_(
-                Task.status == "pending",
-                Task.due_date <= now, # Find all overdue tasks
-                Task.notified_due == True,  # ⚡ CRITICAL: Only nudge tasks that got their "Due Now" alert
-                UserSetting.push_enabled == True,
-                UserSetting.fcm_token != None
-            )
+    # ⚡ Claim a batch first: rows locked by another worker are skipped, and the
+    # claimed ones are leased (next_fire_at pushed out) before anything is sent.
+    # Any number of worker processes can drain the queue side by side this way.
+    due = select(Task.id, Task.next_fire_at).filter(
+        and_(
+            Task.next_fire_at != None,
+            Task.next_fire_at <= now
         )
+    ).order_by(Task.next_fire_at).limit(SWEEP_BATCH_SIZE).with_for_update(skip_locked=True).subquery()
 
-        result = await db.execute(query)
-        overdue_tasks = result.all()
-        
-        if overdue_tasks:
-            print(f"🧐 [Nudge] Checking {len(overdue_tasks)} potential overdue tasks...")
+    claim = update(Task).where(Task.id == due.c.id).values(
+        next_fire_at=now + CLAIM_LEASE
+    ).returning(Task.id, due.c.next_fire_at).execution_options(synchronize_session=False)
 
-        # ⚡ CRITICAL: Only send ONE nudge per check cycle to prevent spam
-        # Sort tasks by how long they've been waiting (oldest first)
-        nudges_sent = 0
-        max_nudges_per_cycle = 1
-        
-        # Sort by waiting time (longest waiting gets priority)
-        sorted_tasks = sorted(overdue_tasks, key=lambda x: (
-            x[0].last_nudged_at if x[0].last_nudged_at else x[0].due_date
-        ))
-
-        for task, token in sorted_tasks:
-            # Stop if we've already sent max nudges this cycle
-            if nudges_sent >= max_nudges_per_cycle:
-                print(f"⏸️ [Nudge] Already sent {max_nudges_per_cycle} nudge(s) this cycle. Waiting for next check.")
-                break
-
-            # Improved Logic:
-            # 1. If we already poked them, wait 30 mins from THAT poke
-            # 2. If never poked, wait 30 mins from Due Date
-            last_ref = task.last_nudged_at
-            if last_ref and last_ref.tzinfo is None:
-                 last_ref = last_ref.replace(tzinfo=timezone.utc)
-
-            due_ref = task.due_date
-            if due_ref and due_ref.tzinfo is None:
-                 due_ref = due_ref.replace(tzinfo=timezone.utc)
-
-            # Determine baseline
-            baseline_time = last_ref if last_ref else due_ref
-            
-            # Calculate gap
-            delta_minutes = (now - baseline_time).total_seconds() / 60
-            
-            # ⚡ CRITICAL: Prevent backlog spam - don't send nudges for very old tasks
-            # If task is more than 6 hours overdue and never nudged, skip it
-            if not last_ref and delta_minutes > 360:  # 6 hours
-                print(f"⏩ [Nudge] Skipping old task: '{task.title}' (Overdue by {int(delta_minutes/60)}h)")
-                continue
-            
-            # Trigger if gap >= 30m
-            if delta_minutes >= 30:
-                print(f"🔄 [Nudge] Sending 30m follow-up for: '{task.title}' (Gap: {int(delta_minutes)}m)")
-                # Use send_friendly_push with a special flag for nudges
+    try:
+        result = await db.execute(claim)
+        # task id -> fire time it was due at (keeps the oldest-first order)
+        claimed = dict(result.all())
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to claim due reminder stages: {e}")
+        await db.rollback()
+        return []
+
+    if not claimed:
+        return []
+
+    query = select(Task, UserSetting.push_enabled, UserSetting.fcm_token).outerjoin(
+        UserSetting, Task.user_id == UserSetting.user_id
+    ).filter(Task.id.in_(list(claimed)))
+
+    result = await db.execute(query)
+    due_rows = sorted(result.all(), key=lambda row: claimed[row[0].id])
+    count_rows(len(due_rows))
+
+    # AI copy was written ahead of time: no LLM call on the send path
+    texts = await reminder_text_service.load(db, SOURCE_TASK, [task.id for task, _, _ in due_rows])
+    # 📊 A passed Due Now stage turns a pending task overdue in the user's counters
+    stats = task_stats_service.TaskStatsTracker()
+    for task, _, _ in due_rows:
+        stats.watch(task)
+    print(f"🧐 [Sweep] {len(due_rows)} due reminder stage(s)")
+
+    # ⚡ Only ONE nudge per sweep to prevent spam (oldest waiting first, see NUDGE_STAGGERING.md)
+    nudges_sent = 0
+    retry_in = {}   # task.id -> delay before the stage is tried again
+    outgoing = []   # (task, stage, fire_at, push kwargs)
+
+    # 1. Decide what every due task needs
+    for task, push_enabled, token in due_rows:
+        token = token if push_enabled else None
+
+        # Always recompute from the task itself: the stored stage may be outdated
+        fire_at, stage = compute_next_fire(task, now)
+
+        if fire_at is None or fire_at > now:
+            continue
+        elif stage == STAGE_NUDGE:
+            if not token:
+                retry_in[task.id] = NUDGE_INTERVAL
+            elif nudges_sent >= MAX_NUDGES_PER_SWEEP:
+                print(f"⏸️ [Nudge] Already sent {MAX_NUDGES_PER_SWEEP} nudge(s) this sweep. Deferring '{task.title}'.")
+                retry_in[task.id] = RETRY_DELAY
+            else:
+                print(f"🔄 [Nudge] Sending 30m follow-up for: '{task.title}'")
                 # We use -1 to indicate "Nudge/Poll"
-                success = await send_friendly_push(db, task, token, lead_mins=-1)
-                
-                if success:
-                    task.last_nudged_at = now
-                    db.add(task)
-                    await db.commit()  # ⚡ CRITICAL: Commit immediately to prevent re-sending every minute
-                    print(f"✅ [Nudge] Updated last_nudged_at for task {task.id}")
-                    nudges_sent += 1  # Increment counter
+                outgoing.append((task, stage, fire_at, await build_friendly_push(task, token, STAGE_NUDGE)))
+                nudges_sent += 1
+        elif stage == STAGE_END:
+            if token:
+                outgoing.append((task, stage, fire_at, build_focus_restore(task, token, now)))
+            else:
+                task.notified_end = True
+        else:
+            # Late pre-reminders (e.g. after downtime) are recorded but not sent
+            on_time = now - fire_at <= FIRE_GRACE
+            if token and on_time:
+                # 🤖 Pre-generated AI message (None -> get_natural_message)
+                ai_message = reminder_text_service.lookup(texts, task.id, stage, task.title, task.due_date)
+                outgoing.append((task, stage, fire_at, await build_friendly_push(task, token, stage, ai_message)))
+            else:
+                mark_stage_fired(task, stage, sent=False)
+
+    # 2. ⚡ Claim every send in the ledger in ONE round trip and commit it
+    # before sending, so no other worker can deliver the same stage twice
+    keys = [(SOURCE_TASK, task_item_id(task.id, fire_at), stage) for task, stage, fire_at, _ in outgoing]
+    try:
+        claimed = await delivery_ledger.claim(db, [
+            delivery_ledger.entry(*key, task.user_id) for key, (task, _, _, _) in zip(keys, outgoing)
+        ])
+        await stats.flush(db)
+        # Fired stages show up in the users' daily plans
+        await plan_cache.invalidate_many(db, [task.user_id for task, _, _ in due_rows])
+        await db.commit()
     except Exception as e:
-        print(f"❌ [Nudge] Error in nudge logic: {e}")
+        logger.error(f"❌ Failed to claim reminder sends: {e}")
+        await db.rollback()
+        return []
+
+    sendable = []
+    for key, (task, stage, _, push) in zip(keys, outgoing):
+        if key in claimed:
+            sendable.append((key, task, stage, push))
+        else:
+            # Already delivered elsewhere: just move the task past this stage
+            print(f"⏩ [Sweep] Stage {stage} of task {task.id} already delivered, skipping")
+            apply_stage_sent(task, stage, now)
+
+    # 3. Send everything in one batch and apply the per-message results
+    stale_users = set()
+    failed_keys = []
+    async for index, message_id, error in fcm_manager.send_batch([push for _, _, _, push in sendable]):
+        key, task, stage, push = sendable[index]
+        if error:
+            if error == "STALE_TOKEN":
+                stale_users.add(task.user_id)
+            logger.error(f"❌ Failed to send stage {stage} for task {task.id}: {error}")
+            failed_keys.append(key)
+            retry_in[task.id] = RETRY_DELAY
+            continue
+
+        apply_stage_sent(task, stage, now)
+        if stage == STAGE_END:
+            print(f"🌅 [FocusMode] Sent deactivation signal for: {task.title}")
+        elif stage != STAGE_NUDGE:
+            print(f"🚀 [AI-FCM] Sent {stage}m reminder for: {task.title}")
+        # Focus-restore pushes are silent and not kept in the inbox
+        if stage != STAGE_END:
+            await record_notification(db, task.user_id, push["title"], push["body"], push["data"])
+
+    for user_id in stale_users:
+        await clear_stale_token(db, user_id)
+    # Failed sends give their claim back so the retry can take it
+    await delivery_ledger.release(db, failed_keys)
+
+    # 4. Advance every task to its next stage and commit the whole sweep at once
+    advanced = []
+    for task, _, _ in due_rows:
+        if task.id in retry_in:
+            task.next_fire_at = now + retry_in[task.id]
+        else:
+            refresh_next_fire(task, now)
+        db.add(task)
+        advanced.append((task.id, task.next_fire_at))
+
+    try:
+        await stats.flush(db)
+        await plan_cache.invalidate_many(db, [task.user_id for task, _, _ in due_rows])
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to save reminder sweep: {e}")
+        await db.rollback()
+        return []
+
+    return advanced
+
+def apply_stage_sent(task: Task, stage: int, now: datetime):
+    """Record on the task that a stage went out"""
+    if stage == STAGE_NUDGE:
+        task.last_nudged_at = now
+    elif stage == STAGE_END:
+        task.notified_end = True
+    else:
+        mark_stage_fired(task, stage, sent=True)
+
+def build_focus_restore(task: Task, token: str, now: datetime) -> dict:
+    """
+    Deactivation push for a meeting that has just ended,
+    restoring normal sound settings on the device.
+    """
+    return {
+        "token": token,
+        "title": "Focus Mode 🌅", # Title is required by my guard, but body can be short
+        "body": f"Meeting '{task.title}' ended. Sound restored.",
+        "data": {
+            "task_id": str(task.id),
+            "type": "focus_restore",
+            "toggle_focus": "false",
+            "notification_id": f"end_{task.id}_{int(now.timestamp())}"
+        }
+    }
 
 async def send_completion_poll(db: AsyncSession, task: Task, token: str):
     """Send a 'How did it go?' notification with interactive actions"""
@@ -265,224 +501,119 @@ async def clear_stale_token(db: AsyncSession, user_id: int):
     except Exception as e:
         print(f"❌ [Cleanup] Failed to clear token: {e}")
 
-async def process_reminders(db: AsyncSession, now: datetime, minutes: int):
-    """Process reminders for a specific lead time (10m or 20m)"""
-    
-    # Define range to catch tasks
-    if minutes == 0:
-        # Narrow window: Only catch tasks due in the last 2 minutes (not 5)
-        # This prevents overlap with the nudge system
-        start_range = now - timedelta(minutes=2)
-        end_range = now + timedelta(minutes=1)
-    else:
-        start_range = now + timedelta(minutes=minutes - 2)
-        end_range = now + timedelta(minutes=minutes + 2)
-    
-    if minutes == 20:
-        notified_col = Task.notified_20m
-    elif minutes == 10:
-        notified_col = Task.notified_10m
-    else:
-        notified_col = Task.notified_due
-    
-    
-    # Find pending tasks within the time window that haven't been notified for this lead time
-    query = select(Task, UserSetting.fcm_token).join(
-        UserSetting, Task.user_id == UserSetting.user_id
-    ).filter(
-        and_(
-            Task.status == "pending",
-            Task.due_date >= start_range,
-            Task.due_date <= end_range,
-            notified_col == False,
-            UserSetting.push_enabled == True,
-            UserSetting.fcm_token != None
-        )
-    )
-    
-    result = await db.execute(query)
-    reminders = result.all()
-    
-    for task, token in reminders:
-        try:
-            # 🤖 Generate AI message
-            due_time_str = format_local_time(task.due_date)
-            ai_message = await generate_friendly_reminder(task.title, due_time_str, minutes)
-            
-            success = await send_friendly_push(db, task, token, minutes, ai_message)
-            if success:
-                if minutes == 20: task.notified_20m = True
-                elif minutes == 10: task.notified_10m = True
-                else: task.notified_due = True
-                
-                db.add(task)
-                # ⚡ Commit immediately to prevent double-sends (race condition)
-                await db.commit()
-                print(f"🚀 [AI-FCM] Sent {minutes}m reminder for: {task.title}")
-        except Exception as e:
-            logger.error(f"❌ Failed to process local reminder for task {task.id}: {e}")
 
-async def process_meeting_restoration(db: AsyncSession, now: datetime):
-    """
-    Check for meetings that have just ended and send a deactivation push
-    to restore normal sound settings on the device.
-    """
-    # Look for meetings that ended in the last 5 minutes but haven't been notified of end
-    start_range = now - timedelta(minutes=5)
-    
-    query = select(Task, UserSetting.fcm_token).join(
-        UserSetting, Task.user_id == UserSetting.user_id
+async def process_google_reminders(db: AsyncSession, now: datetime, minutes: int):
+    """Process reminders for Google Calendar/Tasks from the local Google mirror"""
+    # Check a wider window for Google to be safe
+    window_start = now + timedelta(minutes=minutes - 1)
+    window_end = now + timedelta(minutes=minutes + 1)
+
+    # One indexed query over the mirror for all synced users
+    query = select(GoogleItem, UserSetting).join(
+        User, User.id == GoogleItem.user_id
+    ).join(
+        UserSetting, UserSetting.user_id == GoogleItem.user_id
     ).filter(
         and_(
-            Task.end_time != None,
-            Task.end_time <= now,
-            Task.end_time >= start_range,
-            Task.notified_end == False,
+            User.google_refresh_token != None,
             UserSetting.push_enabled == True,
-            UserSetting.fcm_token != None
+            UserSetting.fcm_token != None,
+            GoogleItem.deleted == False,
+            GoogleItem.start_at >= window_start,
+            GoogleItem.start_at <= window_end,
+            # 🛡️ Skip cancelled events and completed tasks
+            GoogleItem.status.is_distinct_from("cancelled"),
+            GoogleItem.status.is_distinct_from("completed")
         )
     )
-    
-    result = await db.execute(query)
-    ended_meetings = result.all()
-    
-    for task, token in ended_meetings:
+    res = await db.execute(query)
+    rows = res.all()
+    count_rows(len(rows))
+
+    # ⚡ Claim every item of this stage in ONE round trip; the unique ledger key
+    # replaces the per-item JSONB lookup over the user's inbox
+    keys = [
+        (SOURCE_GOOGLE, google_item_id(g_item.user_id, g_item.google_id, g_item.start_at), minutes)
+        for g_item, _ in rows
+    ]
+    try:
+        claimed = await delivery_ledger.claim(db, [
+            delivery_ledger.entry(*key, g_item.user_id) for key, (g_item, _) in zip(keys, rows)
+        ])
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to claim Google reminders: {e}")
+        await db.rollback()
+        return
+
+    texts = await reminder_text_service.load(db, SOURCE_GOOGLE, [g_item.id for g_item, _ in rows])
+
+    failed_keys = []
+    for key, (g_item, setting) in zip(keys, rows):
+        if key not in claimed:
+            continue
         try:
-            # Send silent deactivation push
-            data = {
-                "task_id": str(task.id),
-                "type": "focus_restore",
-                "toggle_focus": "false",
-                "notification_id": f"end_{task.id}_{int(now.timestamp())}"
-            }
-            
-            # Use data-only send to avoid showing a banner
+            # Tasks are keyed by their bare Google id, as before the mirror
+            item_id = g_item.google_id.split("|", 1)[-1] if g_item.kind == "task" else g_item.google_id
+            default_title = "Task" if g_item.kind == "task" else "Event"
+            item = {"id": item_id, "title": g_item.title or default_title}
+
+            # 🤖 Pre-generated AI message, else the template messages
+            ai_message = reminder_text_service.lookup(texts, g_item.id, minutes, g_item.title, g_item.start_at)
+            if ai_message:
+                push_title, push_body = f"LARA: {ai_message[:30]}...", ai_message
+            else:
+                push_title, push_body = await get_natural_message(
+                    Task(title=item["title"], due_date=g_item.start_at), minutes
+                )
+
+            # 🎯 SMART FOCUS TRIGGER: Only if keywords match (Professional AND NOT Casual)
+            import re
+            should_toggle_focus = False
+            if minutes == 0:
+                title_lower = item["title"].lower()
+                has_prof = re.search(r'meeting|study|business|project|interview|sync|discussion', title_lower)
+                has_casual = re.search(r'friends|family', title_lower)
+                if has_prof and not has_casual:
+                    should_toggle_focus = True
+            # Send Push
             success = await fcm_manager.send_notification(
-                token=token,
-                title="Focus Mode 🌅", # Title is required by my guard, but body can be short
-                body=f"Meeting '{task.title}' ended. Sound restored.",
-                data=data
+                token=setting.fcm_token,
+                title=push_title,
+                body=push_body,
+                data={
+                    "type": "google_reminder", 
+                    "google_id": item["id"], 
+                    "lead": str(minutes),
+                    "notification_id": f"google_{item['id']}_{minutes}",
+                    "toggle_focus": "true" if should_toggle_focus else "false"
+                }
             )
             
             if success:
-                task.notified_end = True
-                db.add(task)
-                await db.commit()
-                print(f"🌅 [FocusMode] Sent deactivation signal for: {task.title}")
+                await record_notification(
+                    db, g_item.user_id, "Google Reminder", push_body,
+                    {"type": "google_reminder", "google_id": item["id"], "lead": str(minutes)}
+                )
+                print(f"🚀 [AI-Google] Sent {minutes}m reminder for: {item['title']}")
+            else:
+                failed_keys.append(key)
+        except ValueError as e:
+            if str(e) == "STALE_TOKEN":
+                await clear_stale_token(db, g_item.user_id)
+            else:
+                failed_keys.append(key)
         except Exception as e:
-            logger.error(f"❌ Failed to process meeting restoration for task {task.id}: {e}")
+            logger.error(f"Error processing Google item: {e}")
+            failed_keys.append(key)
 
-async def process_google_reminders(db: AsyncSession, now: datetime, minutes: int):
-    """Fetch and process reminders for Google Calendar/Tasks"""
-    # Find users who are synced
-    from sqlalchemy import select
-    query = select(User, UserSetting).join(UserSetting, User.id == UserSetting.user_id).filter(
-        and_(
-            User.google_refresh_token != None,
-            UserSetting.push_enabled == True,
-            UserSetting.fcm_token != None
-        )
-    )
-    res = await db.execute(query)
-    users = res.all()
-    
-    for user, setting in users:
-        try:
-            # Check a wider window for Google to be safe
-            window_start = now + timedelta(minutes=minutes - 1)
-            window_end = now + timedelta(minutes=minutes + 1)
-            
-            data = await google_calendar_service.get_google_data(
-                user, db, 
-                time_min=window_start.isoformat().replace('+00:00', 'Z'),
-                time_max=window_end.isoformat().replace('+00:00', 'Z')
-            )
-            
-            # Combine all Google items
-            all_items = []
-            for e in data.get("events", []):
-                # 🛡️ Skip cancelled events
-                if e.get('status') == 'cancelled':
-                    continue
-                start = e.get('start', {}).get('dateTime') or e.get('start', {}).get('date')
-                if start: all_items.append({"id": e.get("id"), "title": e.get("summary", "Event"), "time": start, "type": "meeting"})
-            
-            for t in data.get("tasks", []):
-                # 🛡️ Skip deleted, hidden or completed tasks
-                if t.get('deleted') or t.get('hidden') or t.get('status') == 'completed':
-                    continue
-                due = t.get("due")
-                if due: all_items.append({"id": t.get("id"), "title": t.get("title", "Task"), "time": due, "type": "task"})
-
-            from dateutil import parser
-            for item in all_items:
-                try:
-                    item_time = parser.parse(item["time"])
-                    if item_time.tzinfo is None: item_time = item_time.replace(tzinfo=timezone.utc)
-                    
-                    # Check if it falls exactly in our window
-                    if window_start <= item_time <= window_end:
-                        # Check if already notified for this stage to avoid spam
-                        notif_key = f"google_{item['id']}_{minutes}"
-                        check_query = select(Notification).where(
-                            and_(
-                                Notification.user_id == user.id,
-                                Notification.data['google_notif_key'].astext == notif_key
-                            )
-                        )
-                        existing = await db.execute(check_query)
-                        if existing.scalar_one_or_none():
-                            continue
-
-                        # 🤖 Generate AI message
-                        due_time_str = format_local_time(item_time)
-                        ai_message = await generate_friendly_reminder(item["title"], due_time_str, minutes)
-
-                        # ⚡ Optimistic Locking: Record it FIRST to block other workers
-                        # We record even before sending. If sending fails, we at least don't double send.
-                        # (Ideally we'd handle retry, but preventing spam is higher priority for user)
-                        try:
-                            await record_notification(
-                                db, user.id, "Google Reminder", ai_message, 
-                                {"type": "google_reminder", "google_id": item["id"], "lead": str(minutes), "google_notif_key": notif_key}
-                            )
-                            await db.commit()
-                        except Exception as db_err:
-                            # If commit fails (e.g. unique constraint race), skip sending
-                            logger.warning(f"⏩ Skipping {item['title']} (likely already processed): {db_err}")
-                            continue
-
-                        # 🎯 SMART FOCUS TRIGGER: Only if keywords match (Professional AND NOT Casual)
-                        import re
-                        should_toggle_focus = False
-                        if minutes == 0:
-                            title_lower = item["title"].lower()
-                            has_prof = re.search(r'meeting|study|business|project|interview|sync|discussion', title_lower)
-                            has_casual = re.search(r'friends|family', title_lower)
-                            if has_prof and not has_casual:
-                                should_toggle_focus = True
-                        # Send Push
-                        success = await fcm_manager.send_notification(
-                            token=setting.fcm_token,
-                            title=f"LARA: {ai_message[:30]}...",
-                            body=ai_message,
-                            data={
-                                "type": "google_reminder", 
-                                "google_id": item["id"], 
-                                "lead": str(minutes),
-                                "notification_id": f"google_{item['id']}_{minutes}",
-                                "toggle_focus": "true" if should_toggle_focus else "false"
-                            }
-                        )
-                        
-                        if success:
-                            print(f"🚀 [AI-Google] Sent {minutes}m reminder for: {item['title']}")
-                except Exception as e:
-                    logger.error(f"Error processing Google item: {e}")
-        except Exception as e:
-            logger.error(f"Failed to process Google reminders for user {user.id}: {e}")
-    
-    # ❌ Local commit removed to prevent greenlet conflicts
+    # Failed sends give their claim back; the next run still sees them in its window
+    await delivery_ledger.release(db, failed_keys)
+    try:
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to save Google reminders: {e}")
+        await db.rollback()
 
 def format_local_time(dt: datetime):
     """Helper to convert UTC from DB to Local Time (IST +5:30) for display"""
@@ -544,8 +675,8 @@ async def get_natural_message(task: Task, lead_mins: int):
     
     return f"{task.title} soon! 🔔", f"{starter} {task.title} scheduled for {due_time}."
 
-async def send_friendly_push(db: AsyncSession, task: Task, token: str, lead_mins: int, ai_message: str = None):
-    """Send a human-friendly FCM notification with natural language"""
+async def build_friendly_push(task: Task, token: str, lead_mins: int, ai_message: str = None) -> dict:
+    """Build the send_notification arguments for a human-friendly reminder push"""
     
     if ai_message:
         # Use the actual task title so the user knows context immediately
@@ -561,7 +692,6 @@ async def send_friendly_push(db: AsyncSession, task: Task, token: str, lead_mins
         body_text = f"Don't forget to take {task.title} at {format_local_time(task.due_date)}."
 
     is_nudge = lead_mins == -1
-    is_due = lead_mins == 0
     
     # 🎯 SMART FOCUS TRIGGER: If this is a meeting/timed task due NOW (0m), 
     # tell the frontend to turn on DND even if in background.
@@ -584,21 +714,25 @@ async def send_friendly_push(db: AsyncSession, task: Task, token: str, lead_mins
         "notification_id": f"{task.id}_{lead_mins}_{int(datetime.now().timestamp())}",
         "toggle_focus": "true" if should_toggle_focus else "false"
     }
-    
-    try:
+
+    return {
+        "token": token,
+        "title": title_text,
+        "body": body_text,
+        "data": data,
         # ✅ Buttons ONLY appear for 'Nudges' (-1) - the 30-min follow-up
         # For 'Due Now' (0m) and pre-notifications (10, 20), NO buttons
-        click_act = "TASK_COMPLETION" if is_nudge else None
-        
-        response = await fcm_manager.send_notification(
-            token=token,
-            title=title_text,
-            body=body_text,
-            data=data,
-            click_action=click_act
-        )
+        "click_action": "TASK_COMPLETION" if is_nudge else None
+    }
+
+async def send_friendly_push(db: AsyncSession, task: Task, token: str, lead_mins: int, ai_message: str = None):
+    """Send a human-friendly FCM notification with natural language"""
+    push = await build_friendly_push(task, token, lead_mins, ai_message)
+    
+    try:
+        response = await fcm_manager.send_notification(**push)
         if response is not None:
-            await record_notification(db, task.user_id, title_text, body_text, data)
+            await record_notification(db, task.user_id, push["title"], push["body"], push["data"])
         return response is not None
     except ValueError as e:
         if str(e) == "STALE_TOKEN":
@@ -620,7 +754,8 @@ async def record_notification(db: AsyncSession, user_id: int, title: str, body:
         if data:
             # Skip countdowns unless it's a Google reminder we need to track
             if data.get("type") != "google_reminder":
-                if data.get("lead_time") in ["10", "20"]:
+                lead_time = str(data.get("lead_time", ""))
+                if lead_time.isdigit() and int(lead_time) > 0:
                     should_skip = True
             
             # Skip completion polls (follow-ups)
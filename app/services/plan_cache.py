@@ -0,0 +1,57 @@
+"""
+Per-(user, date) cache of the assembled daily plan (/tasks/plan/).
+
+Entries hold the plan already serialized (no ORM objects), so a hit never
+touches the session beyond reading the version. The version lives in the
+database (users.plan_version), so a write through any worker process is seen
+by all of them: every write to a user's tasks, Google mirror or profile calls
+invalidate(db, user_id) in its own transaction, before the commit, and keys
+include the version, so older plans are never read again and simply age out
+of the LRU. The version is read before the plan's queries, so a plan built
+while a write lands is stored under the version it started with, i.e. it is
+dead on arrival rather than served stale.
+"""
+import logging
+from datetime import date
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+cache = TTLCache(settings.PLAN_CACHE_SIZE, settings.PLAN_CACHE_TTL_SECONDS)
+invalidations = {"count": 0}
+
+
+async def plan_key(db: AsyncSession, user_id: int, target_date: date) -> str:
+    version = await db.scalar(select(User.plan_version).filter(User.id == user_id))
+    return f"{user_id}|{target_date.isoformat()}|{version or 0}"
+
+
+async def invalidate(db: AsyncSession, user_id: int):
+    """Drop every cached plan of this user (all dates), once the caller commits"""
+    if user_id is not None:
+        await invalidate_many(db, [user_id])
+
+
+async def invalidate_many(db: AsyncSession, user_ids):
+    """
+    invalidate() for several users in one statement. Call it last before the
+    commit: the users rows stay locked until then.
+    """
+    # Sorted so concurrent batches lock the rows in the same order
+    ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if not ids:
+        return
+    await db.execute(
+        update(User).where(User.id.in_(ids)).values(plan_version=User.plan_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    invalidations["count"] += len(ids)
+    logger.debug(f"🗑️ [PlanCache] Invalidated plans of user(s) {ids}")
+
+
+def stats() -> dict:
+    return {**cache.stats(), "invalidations": invalidations["count"]}
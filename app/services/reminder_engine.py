@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, and_
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_stats import job_stats
+from app.models.task import Task
+from app.services.reminder_schedule import as_utc
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderEngine:
+    """
+    Delivers local reminder stages (lead times, nudges, meeting ends) with
+    second-level precision.
+
+    The engine keeps the next_fire_at values of the next few minutes in a heap
+    and sleeps exactly until the earliest one, instead of re-scanning the tasks
+    table every minute. When it wakes it runs the indexed next_fire_at sweep,
+    which is the source of truth for what is due. The window is reloaded every
+    REMINDER_REFRESH_MINUTES and kept current in between by task_service calling
+    schedule_task / unschedule_task on every create, update and delete.
+    """
+
+    def __init__(self, lookahead_minutes: int, refresh_minutes: int):
+        self.lookahead = timedelta(minutes=lookahead_minutes)
+        self.refresh_interval = timedelta(minutes=refresh_minutes)
+        # Heap entries: (fire_at, seq, task_id, version)
+        self._heap = []
+        self._seq = itertools.count()
+        # Latest version per task; heap entries with an older version are stale
+        self._versions = {}
+        self._horizon = None
+        self._next_refresh = None
+        self._wakeup = None
+        self._runner = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def start(self):
+        """Start the engine loop on the current event loop"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._next_refresh = None
+        self._runner = asyncio.get_running_loop().create_task(self._run())
+        logger.info("⏱️ Reminder engine started")
+
+    def stop(self):
+        """Cancel the engine loop"""
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+            logger.info("🛑 Reminder engine stopped")
+
+    def _push(self, task_id: int, fire_at: datetime):
+        """Queue a wake-up for a task, replacing whatever was queued for it before"""
+        version = self._versions.get(task_id, 0) + 1
+        self._versions[task_id] = version
+
+        if fire_at is None:
+            return
+        fire_at = as_utc(fire_at)
+        horizon = self._horizon or (datetime.now(timezone.utc) + self.lookahead)
+        if fire_at > horizon:
+            return
+
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (fire_at, next(self._seq), task_id, version))
+        if earliest is None or fire_at < earliest:
+            # New earliest entry: wake the loop so it can shorten its sleep
+            self._wakeup.set()
+
+    def schedule_task(self, task: Task):
+        """(Re)queue a task after its next_fire_at was recomputed"""
+        if not self.running or task.id is None:
+            return
+        self._push(task.id, task.next_fire_at)
+
+    def unschedule_task(self, task_id: int):
+        """Drop the queued wake-up for a deleted task"""
+        if not self.running:
+            return
+        self._push(task_id, None)
+
+    async def refresh(self):
+        """Load every next_fire_at inside the look-ahead window into the heap"""
+        now = datetime.now(timezone.utc)
+        self._horizon = now + self.lookahead
+
+        async with AsyncSessionLocal() as db:
+            query = select(Task.id, Task.next_fire_at).filter(
+                and_(
+                    Task.next_fire_at != None,
+                    Task.next_fire_at <= self._horizon
+                )
+            )
+            result = await db.execute(query)
+            rows = result.all()
+
+        # Drop stale entries so the heap doesn't grow across refreshes
+        self._heap = [e for e in self._heap if self._versions.get(e[2]) == e[3]]
+        heapq.heapify(self._heap)
+
+        for task_id, fire_at in rows:
+            self._push(task_id, fire_at)
+
+        self._next_refresh = now + self.refresh_interval
+        logger.info(f"⏱️ [Engine] Window refreshed: {len(rows)} upcoming stages")
+
+    def _pop_due(self, now: datetime) -> bool:
+        """Pop all entries that are due; True if at least one is still valid"""
+        any_due = False
+        while self._heap and self._heap[0][0] <= now:
+            _, _, task_id, version = heapq.heappop(self._heap)
+            if self._versions.get(task_id) == version:
+                any_due = True
+        return any_due
+
+    async def _sweep(self, now: datetime) -> bool:
+        """Deliver everything due and requeue the advanced tasks; True if a backlog remains"""
+        from app.services.notification_service import process_due_stages, SWEEP_BATCH_SIZE
+
+        with job_stats.phase("engine_sweep"):
+            async with AsyncSessionLocal() as db:
+                advanced = await process_due_stages(db, now)
+
+        for task_id, fire_at in advanced:
+            self._push(task_id, fire_at)
+
+        # A full batch means more stages are waiting (e.g. after downtime)
+        return len(advanced) >= SWEEP_BATCH_SIZE
+
+    async def _run(self):
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                backlog = False
+                if self._next_refresh is None or now >= self._next_refresh:
+                    await self.refresh()
+                    # Anything already overdue is swept right after a refresh
+                    self._pop_due(now)
+                    backlog = await self._sweep(now)
+                elif self._pop_due(now):
+                    backlog = await self._sweep(now)
+
+                now = datetime.now(timezone.utc)
+                next_at = now if backlog else self._next_refresh
+                if self._heap and self._heap[0][0] < next_at:
+                    next_at = self._heap[0][0]
+                timeout = max((next_at - now).total_seconds(), 0)
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ [Engine] Reminder loop error: {e}")
+                # Back off briefly so a DB outage doesn't spin the loop
+                await asyncio.sleep(5)
+
+
+reminder_engine = ReminderEngine(
+    lookahead_minutes=settings.REMINDER_LOOKAHEAD_MINUTES,
+    refresh_minutes=settings.REMINDER_REFRESH_MINUTES
+)
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.models.task import Task
+
+# Stage codes stored in Task.next_fire_stage / Task.last_fired_stage.
+# Non-negative values are reminder lead times in minutes (0 = Due Now).
+STAGE_NUDGE = -1  # 30-min "did you finish?" follow-up (same code as lead_mins=-1)
+STAGE_END = -2    # Meeting ended -> restore sound on device
+
+# Lead stages that still have a legacy notified_* flag on Task
+LEGACY_FLAGS = {20: "notified_20m", 10: "notified_10m", 0: "notified_due"}
+
+# A pre-reminder that is more than this late is skipped instead of sent
+FIRE_GRACE = timedelta(minutes=2)
+NUDGE_INTERVAL = timedelta(minutes=30)
+# Never-nudged tasks older than this are not nudged (prevents backlog spam)
+NUDGE_MAX_AGE = timedelta(hours=6)
+# Meetings that ended longer ago than this don't get a restore push
+END_GRACE = timedelta(minutes=5)
+
+
+def as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """DB datetimes may come back naive; treat those as UTC"""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_offsets(value: Optional[str]) -> List[int]:
+    """
+    Parse a comma separated list of lead times in minutes (e.g. "30,10,0").
+    Returns them sorted from earliest to latest stage. Due Now (0) is always included.
+    """
+    offsets = {0}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        minutes = int(part)
+        if minutes < 0:
+            raise ValueError(f"Reminder offset must not be negative: {minutes}")
+        offsets.add(minutes)
+    return sorted(offsets, reverse=True)
+
+
+def get_offsets(task: Task) -> List[int]:
+    """Task-specific offsets, falling back to the global REMINDER_OFFSETS"""
+    try:
+        return parse_offsets(task.reminder_offsets or settings.REMINDER_OFFSETS)
+    except ValueError:
+        return parse_offsets(settings.REMINDER_OFFSETS)
+
+
+def compute_next_fire(task: Task, now: datetime) -> Tuple[Optional[datetime], Optional[int]]:
+    """
+    Work out the next stage a task has to fire and when.
+    Returns (fire_at, stage) or (None, None) if nothing is left to send.
+    """
+    candidates = []
+    due = as_utc(task.due_date)
+
+    if task.status == "pending" and due:
+        fired = task.last_fired_stage
+        # 1. Next reminder stage (offsets are ordered earliest first)
+        for offset in get_offsets(task):
+            if fired is not None and offset >= fired:
+                continue
+            fire_at = due - timedelta(minutes=offset)
+            # Missed pre-reminders are skipped, but Due Now is always processed
+            # so the task is reliably marked as having reached its due time.
+            if offset > 0 and fire_at < now - FIRE_GRACE:
+                continue
+            candidates.append((fire_at, offset))
+            break
+
+        # 2. Completion nudges, only after the Due Now push actually went out
+        if fired == 0 and task.notified_due:
+            last_nudged = as_utc(task.last_nudged_at)
+            if last_nudged or now - due <= NUDGE_MAX_AGE:
+                candidates.append(((last_nudged or due) + NUDGE_INTERVAL, STAGE_NUDGE))
+
+    # 3. Meeting end (sent regardless of completion status)
+    end = as_utc(task.end_time)
+    if end and not task.notified_end and end >= now - END_GRACE:
+        candidates.append((end, STAGE_END))
+
+    if not candidates:
+        return None, None
+    return min(candidates, key=lambda c: c[0])
+
+
+def refresh_next_fire(task: Task, now: datetime = None):
+    """Recompute the materialized next_fire_at / next_fire_stage columns"""
+    now = now or datetime.now(timezone.utc)
+    task.next_fire_at, task.next_fire_stage = compute_next_fire(task, now)
+
+
+def reset_reminder_state(task: Task):
+    """Forget sent stages, e.g. after the task was rescheduled"""
+    task.last_fired_stage = None
+    for flag in LEGACY_FLAGS.values():
+        setattr(task, flag, False)
+
+
+def mark_stage_fired(task: Task, stage: int, sent: bool):
+    """Record that a reminder stage was processed (sent or skipped)"""
+    task.last_fired_stage = stage
+    if sent and stage in LEGACY_FLAGS:
+        setattr(task, LEGACY_FLAGS[stage], True)
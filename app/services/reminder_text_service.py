@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, and_, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.task import Task
+from app.models.google_item import GoogleItem
+from app.models.reminder_text import ReminderText
+from app.services.delivery_ledger import SOURCE_TASK, SOURCE_GOOGLE
+from app.services.reminder_schedule import as_utc, get_offsets, parse_offsets
+
+logger = logging.getLogger(__name__)
+
+# Lead stages used for Google items (they have no per-item offsets)
+GOOGLE_STAGES = [20, 10, 0]
+# Texts whose stage fired longer ago than this are pruned
+RETENTION = timedelta(days=1)
+# pg advisory lock id serializing warm_window across worker processes
+WARM_LOCK_KEY = 7310901
+
+# Fire-and-forget generation tasks (kept referenced until they finish)
+_background = set()
+
+
+def fingerprint(title: str, due_at: datetime) -> str:
+    """Identifies the title/time a text was written for; any change invalidates it"""
+    due_at = as_utc(due_at)
+    raw = f"{title or ''}|{due_at.isoformat() if due_at else ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+async def load(db: AsyncSession, source: str, item_ids: list) -> dict:
+    """(item_id, stage) -> (fingerprint, body) for the given items"""
+    if not item_ids:
+        return {}
+    query = select(ReminderText.item_id, ReminderText.stage, ReminderText.fingerprint, ReminderText.body).filter(
+        and_(
+            ReminderText.source == source,
+            ReminderText.item_id.in_([str(i) for i in item_ids])
+        )
+    )
+    result = await db.execute(query)
+    return {(item_id, stage): (fp, body) for item_id, stage, fp, body in result.all()}
+
+
+def lookup(texts: dict, item_id, stage: int, title: str, due_at: datetime):
+    """Pre-generated body for a stage, or None if missing or written for an older title/time"""
+    hit = texts.get((str(item_id), stage))
+    if hit and hit[0] == fingerprint(title, due_at):
+        return hit[1]
+    return None
+
+
+def _stage_needs(source: str, item_id, title: str, due_at: datetime, stages: list, texts: dict, now: datetime) -> list:
+    """Stages of one item that still need (fresh) copy"""
+    due_at = as_utc(due_at)
+    if not due_at or not title:
+        return []
+    fp = fingerprint(title, due_at)
+    needs = []
+    for stage in stages:
+        fire_at = due_at - timedelta(minutes=stage)
+        if fire_at < now:
+            continue
+        hit = texts.get((str(item_id), stage))
+        if hit and hit[0] == fp:
+            continue
+        needs.append({"source": source, "item_id": str(item_id), "stage": stage,
+                      "title": title, "due_at": due_at, "fingerprint": fp, "fire_at": fire_at})
+    return needs
+
+
+async def _generate(db: AsyncSession, needs: list) -> int:
+    """Write the copy for every need (bounded LLM parallelism) and upsert it"""
+    from app.services.ai_service import generate_friendly_reminder
+    from app.services.notification_service import format_local_time
+
+    if not needs:
+        return 0
+    semaphore = asyncio.Semaphore(settings.REMINDER_TEXT_CONCURRENCY)
+
+    async def write(need):
+        async with semaphore:
+            return await generate_friendly_reminder(
+                need["title"], format_local_time(need["due_at"]), need["stage"], fallback=False
+            )
+
+    bodies = await asyncio.gather(*[write(n) for n in needs], return_exceptions=True)
+
+    rows = []
+    for need, body in zip(needs, bodies):
+        # No row on failure: the send path falls back to get_natural_message
+        if isinstance(body, Exception) or not body:
+            continue
+        rows.append({
+            "source": need["source"], "item_id": need["item_id"], "stage": need["stage"],
+            "fingerprint": need["fingerprint"], "body": body, "fire_at": need["fire_at"]
+        })
+    if rows:
+        stmt = insert(ReminderText).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_reminder_texts_key",
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "body": stmt.excluded.body,
+                "fire_at": stmt.excluded.fire_at,
+            }
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+async def pregenerate_task(task_id: int):
+    """Write the copy for every upcoming stage of one task (own session)"""
+    try:
+        async with AsyncSessionLocal() as db:
+            task = await db.get(Task, task_id)
+            if not task or task.status != "pending" or not task.due_date:
+                return
+            now = datetime.now(timezone.utc)
+            texts = await load(db, SOURCE_TASK, [task.id])
+            needs = _stage_needs(SOURCE_TASK, task.id, task.title, task.due_date, get_offsets(task), texts, now)
+            written = await _generate(db, needs)
+            await db.commit()
+            if written:
+                logger.info(f"✍️ [ReminderText] Pre-generated {written} text(s) for task {task.id}")
+    except Exception as e:
+        logger.error(f"❌ [ReminderText] Pre-generation failed for task {task_id}: {e}")
+
+
+def schedule_task_texts(task_id: int):
+    """Pre-generate in the background so creating/updating a task doesn't wait on the LLM"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    job = loop.create_task(pregenerate_task(task_id))
+    _background.add(job)
+    job.add_done_callback(_background.discard)
+
+
+async def warm_window(db: AsyncSession, now: datetime) -> int:
+    """
+    Make sure every stage firing within REMINDER_TEXT_LOOKAHEAD_MINUTES has copy
+    matching the current title/time. Runs from the scheduler, so reminders
+    created while the app was down, or edited in Google, are covered too.
+    """
+    # One worker at a time; the others skip this run instead of paying for the same LLM calls
+    locked = await db.execute(select(func.pg_try_advisory_xact_lock(WARM_LOCK_KEY)))
+    if not locked.scalar():
+        return 0
+
+    horizon = now + timedelta(minutes=settings.REMINDER_TEXT_LOOKAHEAD_MINUTES)
+    # Tasks whose first stage may fall inside the window (custom offsets are
+    # covered by the pre-generation on create/update)
+    max_lead = timedelta(minutes=max(GOOGLE_STAGES + parse_offsets(settings.REMINDER_OFFSETS)))
+    needs = []
+
+    # 1. Local tasks
+    result = await db.execute(select(Task).filter(
+        and_(
+            Task.status == "pending",
+            Task.due_date >= now,
+            Task.due_date <= horizon + max_lead
+        )
+    ))
+    tasks = result.scalars().all()
+    texts = await load(db, SOURCE_TASK, [t.id for t in tasks])
+    for task in tasks:
+        needs += _stage_needs(SOURCE_TASK, task.id, task.title, task.due_date, get_offsets(task), texts, now)
+
+    # 2. Google items from the mirror
+    result = await db.execute(select(GoogleItem).filter(
+        and_(
+            GoogleItem.deleted == False,
+            GoogleItem.start_at >= now,
+            GoogleItem.start_at <= horizon + max_lead,
+            GoogleItem.status.is_distinct_from("cancelled"),
+            GoogleItem.status.is_distinct_from("completed")
+        )
+    ))
+    items = result.scalars().all()
+    texts = await load(db, SOURCE_GOOGLE, [i.id for i in items])
+    for item in items:
+        needs += _stage_needs(SOURCE_GOOGLE, item.id, item.title, item.start_at, GOOGLE_STAGES, texts, now)
+
+    # Soonest first, and only stages that fire inside the window
+    needs = sorted((n for n in needs if n["fire_at"] <= horizon), key=lambda n: n["fire_at"])
+    written = await _generate(db, needs[:settings.REMINDER_TEXT_BATCH_SIZE])
+    # Commit also releases the advisory lock
+    await db.commit()
+    return written
+
+
+async def prune(db: AsyncSession, now: datetime):
+    """Remove texts of stages that fired more than RETENTION ago"""
+    await db.execute(delete(ReminderText).where(ReminderText.fire_at < now - RETENTION))
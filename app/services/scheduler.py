@@ -1,36 +1,62 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES
 from app.core.database import AsyncSessionLocal
 from app.services.notification_service import check_and_send_notifications
+from app.services.reminder_engine import reminder_engine
+from app.core.job_stats import job_stats
 import logging
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
+JOB_INTERVAL_SECONDS = 60
+
 async def scheduled_task_check():
     """Background task that runs every minute"""
     async with AsyncSessionLocal() as db:
         try:
             logger.info("⏰ Running scheduled task check...")
-            await check_and_send_notifications(db)
+            with job_stats.run(JOB_INTERVAL_SECONDS):
+                # Local reminders are delivered by the reminder engine while it runs
+                await check_and_send_notifications(db, include_local_reminders=not reminder_engine.running)
+            phases = ", ".join(
+                f"{name}={stats.last_seconds:.2f}s" for name, stats in job_stats.phases.items()
+                if stats.last_run_at >= job_stats.last_run_at
+            )
+            logger.info(f"⏱️ Task check finished in {job_stats.last_run_seconds:.2f}s ({phases})")
+            if job_stats.last_run_seconds > JOB_INTERVAL_SECONDS:
+                logger.warning(f"⚠️ Task check overran its {JOB_INTERVAL_SECONDS}s interval")
         except Exception as e:
             logger.error(f"❌ Error in scheduled task check: {e}")
 
+def on_job_skipped(event):
+    """Count runs APScheduler dropped because they were late or the previous one was still busy"""
+    if event.code == EVENT_JOB_MAX_INSTANCES:
+        job_stats.skipped_runs += 1
+        logger.warning("⚠️ Task check skipped: previous run still in progress")
+    else:
+        job_stats.missed_runs += 1
+        logger.warning(f"⚠️ Task check misfired (scheduled for {event.scheduled_run_time})")
+
 def start_scheduler():
-    """Start the APScheduler background job"""
+    """Start the APScheduler background job and the reminder engine"""
     if not scheduler.running:
         scheduler.add_job(
-            scheduled_task_check, 
-            "interval", 
-            minutes=1,
+            scheduled_task_check,
+            "interval",
+            seconds=JOB_INTERVAL_SECONDS,
             id="task_notification_job",
             replace_existing=True
         )
+        scheduler.add_listener(on_job_skipped, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
         scheduler.start()
         logger.info("🚀 Background Scheduler started (Runs every 1 min)")
+    reminder_engine.start()
 
 def shutdown_scheduler():
     """Shut down the scheduler on app exit"""
+    reminder_engine.stop()
     if scheduler.running:
         scheduler.shutdown()
         logger.info("🛑 Background Scheduler stopped")
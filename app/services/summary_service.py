@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, and_, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.job_stats import count_rows
+from app.models.user import User
+from app.models.user_setting import UserSetting
+from app.models.daily_summary import DailySummary
+
+logger = logging.getLogger(__name__)
+
+# summary_type -> (enabled flag, delivery time "HH:MM", date it was last sent)
+SUMMARY_SETTINGS = {
+    "MORNING": ("morning_enabled", "morning_time", "last_morning_summary_at"),
+    "EVENING": ("evening_enabled", "evening_time", "last_evening_summary_at"),
+}
+# Summaries older than this are pruned
+RETENTION = timedelta(days=2)
+# pg advisory lock id serializing prebuild across worker processes
+PREBUILD_LOCK_KEY = 7310902
+
+
+def minute_of_day(hhmm: str):
+    """"08:30" -> 510, None if the setting is malformed"""
+    try:
+        hours, minutes = hhmm.split(":")
+        value = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    return value if 0 <= value < 24 * 60 else None
+
+
+def due_summaries(setting: UserSetting, now_ist: datetime, ahead: int, behind: int) -> list:
+    """
+    Summary types not yet sent today whose delivery time lies between
+    `behind` minutes ago and `ahead` minutes from now (local time).
+    """
+    today = now_ist.strftime("%Y-%m-%d")
+    now_minute = now_ist.hour * 60 + now_ist.minute
+    due = []
+    for summary_type, (enabled, time_field, sent_field) in SUMMARY_SETTINGS.items():
+        scheduled = minute_of_day(getattr(setting, time_field))
+        if not getattr(setting, enabled) or scheduled is None:
+            continue
+        if getattr(setting, sent_field) == today:
+            continue
+        if -behind <= scheduled - now_minute <= ahead:
+            due.append(summary_type)
+    return due
+
+
+def fingerprint(summary_type: str, user_name: str, tasks: list) -> str:
+    """Identifies the exact prompt input (name + task titles/times); any change invalidates the text"""
+    raw = "|".join([summary_type, user_name or ""] + [
+        f"{t.title}@{t.due_date.isoformat() if t.due_date else ''}" for t in tasks
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+async def get_or_build(db: AsyncSession, user_id: int, user_name: str, summary_type: str, day, fallback: bool = True):
+    """
+    Summary text for the user's tasks of `day`. The stored draft is reused while
+    it still matches the tasks; otherwise it is rewritten (and stored) first.
+    Returns None (or the generic line with fallback) if the LLM fails.
+    """
+    from app.services.ai_service import generate_ai_summary, summary_fallback
+    from app.services.notification_service import get_user_tasks_for_day
+    from app.core.groq_client import get_groq_client
+
+    summary_date = day.isoformat()
+    tasks = await get_user_tasks_for_day(db, user_id, day)
+    fp = fingerprint(summary_type, user_name, tasks)
+
+    result = await db.execute(select(DailySummary.fingerprint, DailySummary.body).filter(
+        and_(
+            DailySummary.user_id == user_id,
+            DailySummary.summary_type == summary_type,
+            DailySummary.summary_date == summary_date
+        )
+    ))
+    draft = result.first()
+    if draft and draft.fingerprint == fp:
+        return draft.body
+
+    body = await generate_ai_summary(summary_type, user_name, tasks, fallback=False)
+    if not body:
+        return summary_fallback(summary_type) if fallback and get_groq_client() else None
+
+    stmt = insert(DailySummary).values(
+        user_id=user_id, summary_type=summary_type, summary_date=summary_date, fingerprint=fp, body=body
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_daily_summaries_key",
+        set_={"fingerprint": fp, "body": body, "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+    await db.commit()
+    return body
+
+
+async def prebuild(db: AsyncSession, now_utc: datetime) -> int:
+    """
+    Write the summaries due within SUMMARY_PREBUILD_MINUTES, so the delivery
+    minute only has to send them. Runs every minute until the delivery time,
+    which also rewrites a draft (and only that draft) when the tasks change.
+    """
+    # One worker at a time; the others skip this run instead of paying for the same LLM calls
+    locked = await db.execute(select(func.pg_try_advisory_xact_lock(PREBUILD_LOCK_KEY)))
+    if not locked.scalar():
+        return 0
+
+    # Simple IST conversion, same as check_and_send_summaries
+    now_ist = now_utc + timedelta(hours=5, minutes=30)
+    query = select(User.id, User.full_name, UserSetting).join(UserSetting, User.id == UserSetting.user_id).filter(
+        and_(
+            UserSetting.push_enabled == True,
+            UserSetting.fcm_token != None
+        )
+    )
+    result = await db.execute(query)
+    rows = result.all()
+    count_rows(len(rows))
+
+    jobs = []
+    for user_id, user_name, setting in rows:
+        for summary_type in due_summaries(setting, now_ist, ahead=settings.SUMMARY_PREBUILD_MINUTES, behind=-1):
+            jobs.append((user_id, user_name, summary_type))
+    if not jobs:
+        await db.commit()
+        return 0
+
+    semaphore = asyncio.Semaphore(settings.SUMMARY_CONCURRENCY)
+
+    async def build(user_id: int, user_name: str, summary_type: str):
+        async with semaphore:
+            # Each worker gets its own session: one AsyncSession can't run queries concurrently
+            async with AsyncSessionLocal() as worker_db:
+                return await get_or_build(worker_db, user_id, user_name, summary_type, now_ist.date(), fallback=False)
+
+    bodies = await asyncio.gather(*[build(*job) for job in jobs], return_exceptions=True)
+    # Commit releases the advisory lock
+    await db.commit()
+    failed = [job for job, body in zip(jobs, bodies) if isinstance(body, Exception) or not body]
+    for user_id, _, summary_type in failed:
+        logger.warning(f"⚠️ [Summary] Could not pre-build {summary_type} summary for user {user_id}")
+    return len(jobs) - len(failed)
+
+
+async def prune(db: AsyncSession, now_utc: datetime):
+    """Remove summaries of past days"""
+    cutoff = (now_utc + timedelta(hours=5, minutes=30) - RETENTION).strftime("%Y-%m-%d")
+    await db.execute(delete(DailySummary).where(DailySummary.summary_date < cutoff))
@@ -1,56 +1,49 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, func, literal, tuple_, DateTime
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.services.reminder_engine import reminder_engine
+from app.services.reminder_schedule import refresh_next_fire, reset_reminder_state
+from app.services.reminder_text_service import schedule_task_texts
+from app.services import task_stats_service, daily_stats_service, plan_cache
+from app.core.config import settings
+import asyncio
+import base64
 from datetime import datetime, timedelta, timezone
 
+# Largest page GET /tasks/ returns
+TASK_PAGE_MAX = 500
+
 async def check_time_overlap(db: AsyncSession, user_id: int, start_time: datetime, end_time: datetime = None):
     """
     Checks if there's an existing pending task/meeting that overlaps with the given time.
+    Existing tasks occupy their busy_range (end_time, else 60 min for meetings / 30 min otherwise).
     """
     if not start_time:
         return None
 
+    # Naive times come from the app's local clock (IST), as in create_new_task
+    ist_tz = timezone(timedelta(hours=5, minutes=30))
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=ist_tz)
+    if end_time and end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=ist_tz)
+
     # Use a default 30-min duration for tasks without an end_time for overlap checking
-    if not end_time:
+    if not end_time or end_time <= start_time:
         end_time = start_time + timedelta(minutes=30)
-    
-    # Window for query (day of start_time)
-    day_start = datetime.combine(start_time.date(), datetime.min.time()).replace(tzinfo=start_time.tzinfo)
-    day_end = datetime.combine(start_time.date(), datetime.max.time()).replace(tzinfo=start_time.tzinfo)
 
-    # Fetch pending tasks for that day
+    # Single GiST lookup: first pending task whose interval intersects [start, end)
+    wanted = func.tstzrange(
+        literal(start_time, DateTime(timezone=True)), literal(end_time, DateTime(timezone=True)), "[)"
+    )
     query = select(Task).filter(
         Task.user_id == user_id,
         Task.status == "pending",
-        Task.due_date >= (day_start - timedelta(days=1)), # Wider window for TZ safety
-        Task.due_date <= (day_end + timedelta(days=1))
-    )
+        Task.busy_range.op("&&")(wanted)
+    ).order_by(Task.due_date).limit(1)
     result = await db.execute(query)
-    tasks = result.scalars().all()
-
-    for t in tasks:
-        if not t.due_date:
-            continue
-            
-        t_start = t.due_date
-        if t_start.tzinfo is None:
-            t_start = t_start.replace(tzinfo=timezone.utc)
-            
-        # Determine end time for existing task
-        t_end = t.end_time
-        if not t_end:
-            # Assume 30 mins for tasks/reminders, 1 hour for meetings
-            duration = 60 if t.type == "meeting" else 30
-            t_end = t_start + timedelta(minutes=duration)
-        elif t_end.tzinfo is None:
-            t_end = t_end.replace(tzinfo=timezone.utc)
-
-        # Overlap check: (StartA < EndB) and (EndA > StartB)
-        if start_time < t_end and end_time > t_start:
-            return t
-            
-    return None
+    return result.scalars().first()
 
 async def create_new_task(db: AsyncSession, task: TaskCreate, user_id: int):
     import logging
@@ -112,11 +105,20 @@ async def create_new_task(db: AsyncSession, task: TaskCreate, user_id: int):
             end_time=normalized_end_time,
             type=safe_type,
             status="pending", # Force default status
+            reminder_offsets=task.reminder_offsets,
             user_id=user_id
         )
+        # ⏰ Materialize the first reminder stage for the next_fire_at sweep
+        refresh_next_fire(db_task)
         db.add(db_task)
+        # 📊 Counters are updated in the same transaction as the task
+        await task_stats_service.record_created(db, db_task)
+        await plan_cache.invalidate(db, user_id)
         await db.commit()
         await db.refresh(db_task)
+        reminder_engine.schedule_task(db_task)
+        # ✍️ Write the AI reminder copy now, off the send path
+        schedule_task_texts(db_task.id)
         
         logger.info(f"✅ Task created successfully! ID: {db_task.id}")
         return db_task
@@ -125,9 +127,75 @@ async def create_new_task(db: AsyncSession, task: TaskCreate, user_id: int):
         await db.rollback()
         raise
 
-async def get_tasks(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(Task).filter(Task.user_id == user_id).offset(skip).limit(limit))
-    return result.scalars().all()
+def _encode_cursor(task: Task) -> str:
+    raw = f"{task.due_date.isoformat() if task.due_date else ''}|{task.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    """-> (due_date or None, id); ValueError if the cursor wasn't issued by us"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        due, task_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(due) if due else None), int(task_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+async def get_tasks(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, cursor: str = None,
+                    status: str = None, task_type: str = None, due_from: datetime = None, due_to: datetime = None,
+                    is_external: bool = None):
+    """
+    One page of the user's tasks ordered by (due_date, id), undated tasks last.
+    Pass the returned next_cursor back as `cursor` for the following page
+    (keyset pagination on ix_tasks_user_due_id; `skip` is only used without a cursor).
+    Returns (tasks, next_cursor or None).
+    """
+    limit = max(1, min(limit, TASK_PAGE_MAX))
+    ist_tz = timezone(timedelta(hours=5, minutes=30))
+
+    filters = [Task.user_id == user_id]
+    if status:
+        filters.append(Task.status == status.lower())
+    if task_type:
+        filters.append(Task.type == task_type.lower())
+    if is_external is not None:
+        filters.append(func.coalesce(Task.is_external, False) == is_external)
+    # Naive bounds are local (IST) times, as in create_new_task
+    if due_from:
+        filters.append(Task.due_date >= (due_from if due_from.tzinfo else due_from.replace(tzinfo=ist_tz)))
+    if due_to:
+        filters.append(Task.due_date <= (due_to if due_to.tzinfo else due_to.replace(tzinfo=ist_tz)))
+    # A date range never matches undated tasks
+    include_undated = not (due_from or due_to)
+
+    if cursor is None and skip:
+        # Legacy offset paging (same order; its next_cursor switches to keyset)
+        query = select(Task).filter(*filters).order_by(Task.due_date.asc().nulls_last(), Task.id)
+        result = await db.execute(query.offset(skip).limit(limit + 1))
+        tasks = list(result.scalars().all())
+    else:
+        after_due, after_id = _decode_cursor(cursor) if cursor else (None, None)
+
+        # Two bounded index ranges: dated tasks with (due_date, id) past the cursor,
+        # then the undated ones by id (one OR across both would not be a range scan)
+        tasks = []
+        if cursor is None or after_due is not None:
+            query = select(Task).filter(*filters, Task.due_date != None)
+            if after_due is not None:
+                query = query.filter(
+                    tuple_(Task.due_date, Task.id) > tuple_(literal(after_due, DateTime(timezone=True)), literal(after_id))
+                )
+            result = await db.execute(query.order_by(Task.due_date, Task.id).limit(limit + 1))
+            tasks = list(result.scalars().all())
+
+        if include_undated and len(tasks) <= limit:
+            query = select(Task).filter(*filters, Task.due_date == None)
+            if after_due is None and after_id is not None:
+                query = query.filter(Task.id > after_id)
+            result = await db.execute(query.order_by(Task.id).limit(limit + 1 - len(tasks)))
+            tasks.extend(result.scalars().all())
+
+    next_cursor = _encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+    return tasks[:limit], next_cursor
 
 async def get_task(db: AsyncSession, task_id: int, user_id: int):
     result = await db.execute(select(Task).filter(Task.id == task_id, Task.user_id == user_id))
@@ -145,6 +213,8 @@ async def update_task_status(db: AsyncSession, task_id: int, task_update: TaskUp
         if user and task_update.status:
             success = await patch_google_task_status(user, db, task_update.external_id, task_update.status)
             if success:
+                from app.services.google_mirror_service import set_task_status
+                await set_task_status(db, user_id, task_update.external_id, task_update.status)
                 # Return a dummy task object to match response model
                 return Task(id=0, status=task_update.status, title="Google Sync", external_id=task_update.external_id)
         return None
@@ -158,12 +228,32 @@ async def update_task_status(db: AsyncSession, task_id: int, task_update: TaskUp
     if 'external_id' in update_data:
         del update_data['external_id']
 
+    stats = task_stats_service.TaskStatsTracker()
+    stats.watch(db_task)
+
+    # Completion time feeds the daily rollup (completed that day, on time, latency)
+    if 'status' in update_data and update_data['status'] != db_task.status:
+        db_task.completed_at = datetime.now(timezone.utc) if update_data['status'] == "completed" else None
+
+    # A rescheduled task gets its reminder stages again
+    if 'due_date' in update_data and update_data['due_date'] != db_task.due_date:
+        reset_reminder_state(db_task)
+    if 'end_time' in update_data and update_data['end_time'] != db_task.end_time:
+        db_task.notified_end = False
+
     for key, value in update_data.items():
         setattr(db_task, key, value)
         
+    refresh_next_fire(db_task)
     db.add(db_task)
+    await stats.flush(db)
+    await plan_cache.invalidate(db, user_id)
     await db.commit()
     await db.refresh(db_task)
+    reminder_engine.schedule_task(db_task)
+    # Copy mentions the title and time, so rewrite it when either changes
+    if {'title', 'due_date', 'reminder_offsets'} & update_data.keys():
+        schedule_task_texts(db_task.id)
     return db_task
 
 async def postpone_task_reminder(db: AsyncSession, task_id: int, user_id: int):
@@ -175,9 +265,12 @@ async def postpone_task_reminder(db: AsyncSession, task_id: int, user_id: int):
     
     # Update last_nudged_at to now, so backend waits another 30 min
     db_task.last_nudged_at = datetime.now(timezone.utc)
+    refresh_next_fire(db_task)
     db.add(db_task)
+    await plan_cache.invalidate(db, user_id)
     await db.commit()
     await db.refresh(db_task)
+    reminder_engine.schedule_task(db_task)
     print(f"⏳ [Postpone] Task {task_id} postponed for 30 minutes")
     return db_task
 
@@ -186,11 +279,6 @@ async def get_daily_plan(db: AsyncSession, user_id: int, date_str: str = None):
     import random
     from app.models.user import User
     
-    # Fetch user for name
-    user_res = await db.execute(select(User).filter(User.id == user_id))
-    user = user_res.scalar_one_or_none()
-    user_name = user.full_name if user else "Friend"
-    
     # Determine Greeting based on current time
     # Determine Greeting based on current time
     # ✅ Fix: Railway server is UTC, so we add 5:30 for IST (User's timezone)
@@ -221,6 +309,24 @@ async def get_daily_plan(db: AsyncSession, user_id: int, date_str: str = None):
         target_date = now_ist.date()
     
     logger.info(f"📅 [get_daily_plan] Target date: {target_date} (IST)")
+
+    # ⚡ Served from memory until this user's tasks / Google mirror change
+    cache_key = await plan_cache.plan_key(db, user_id, target_date)
+    cached = plan_cache.cache.get(cache_key)
+    if cached is not None:
+        return _plan_response(cached, greeting_time)
+
+    # 🚀 Google mirror freshness check / sync runs in its own session while the
+    # local queries below run, and gets at most GOOGLE_PLAN_BUDGET_SECONDS
+    from app.services import google_mirror_service
+    google_fresh = asyncio.ensure_future(
+        google_mirror_service.ensure_fresh_within(user_id, settings.GOOGLE_PLAN_BUDGET_SECONDS)
+    )
+
+    # Fetch user for name
+    user_res = await db.execute(select(User).filter(User.id == user_id))
+    user = user_res.scalar_one_or_none()
+    user_name = user.full_name if user else "Friend"
     
     # 🌍 Fix: Handle Timezone properly.
     # Postgres stores UTC. We construct Aware UTC ranges to query.
@@ -304,14 +410,22 @@ async def get_daily_plan(db: AsyncSession, user_id: int, date_str: str = None):
     # Sort today's tasks
     tasks.sort(key=lambda x: x.due_date)
 
+    # 🚀 NEW: Fetch "Upcoming" tasks (next 5 tasks after today)
+    upcoming_query = select(Task).filter(
+        Task.user_id == user_id,
+        Task.due_date > dt_utc_end, # Use dt_utc_end for strict "after today"
+        Task.status == "pending"
+    ).order_by(Task.due_date).limit(5)
+    
+    upcoming_res = await db.execute(upcoming_query)
+    upcoming_tasks = upcoming_res.scalars().all()
+
     # 🚀 NEW: Merge Google Calendar Data (Events + Tasks)
+    # Served from the local mirror; if its sync didn't finish within the budget the
+    # last known items are used (the sync carries on) and the plan is marked partial
+    partial = not await google_fresh
     try:
-        from app.services import google_calendar_service
-        google_data = await google_calendar_service.get_google_data(
-            user, db, 
-            time_min=dt_utc_start.isoformat().replace('+00:00', 'Z'),
-            time_max=dt_utc_end.isoformat().replace('+00:00', 'Z')
-        )
+        google_data = await google_mirror_service.get_mirror_data(db, user_id, dt_utc_start, dt_utc_end)
         
         # 1. Merge Events
         google_events = google_data.get("events", [])
@@ -431,27 +545,20 @@ async def get_daily_plan(db: AsyncSession, user_id: int, date_str: str = None):
     from datetime import datetime
     tasks.sort(key=lambda x: x.due_date if x.due_date else datetime.min.replace(tzinfo=timezone.utc))
     
-    # 🚀 NEW: Fetch "Upcoming" tasks (next 5 tasks after today)
-    upcoming_query = select(Task).filter(
-        Task.user_id == user_id,
-        Task.due_date > dt_utc_end, # Use dt_utc_end for strict "after today"
-        Task.status == "pending"
-    ).order_by(Task.due_date).limit(5)
-    
-    upcoming_res = await db.execute(upcoming_query)
-    upcoming_tasks = upcoming_res.scalars().all()
-    
     logger.info(f"📊 [get_daily_plan] Found {len(tasks)} items total (Tasks + Google) and {len(upcoming_tasks)} upcoming.")
     
     if not tasks and not upcoming_tasks:
-        return {
-            "morning_message": f"{greeting_time}! 🙂 Your schedule is looking nice and light today.",
+        plan = {
             "user_name": user_name,
             "sections": [],
             "total_count": 0,
             "upcoming": [],
-            "time_bound_count": 0
+            "time_bound_count": 0,
+            "overdue_count": overdue_count,
+            "partial": partial
         }
+        _cache_plan(cache_key, plan)
+        return _plan_response(plan, greeting_time)
     
     sections_map = {
         "Overdue": overdue_tasks,
@@ -488,27 +595,58 @@ async def get_daily_plan(db: AsyncSession, user_id: int, date_str: str = None):
         else:
             sections_map["Night"].append(t)
             
-    sections = [{"slot": k, "items": v} for k, v in sections_map.items() if len(v) > 0]
-    
-    count = len(tasks)
+    # Serialized once here so the cached copy doesn't hold (expiring) ORM objects
+    sections = [
+        {"slot": k, "items": [_plan_item(t) for t in v]}
+        for k, v in sections_map.items() if len(v) > 0
+    ]
+
+    plan = {
+        "user_name": user_name,
+        "sections": sections,
+        "total_count": len(tasks),
+        "upcoming": [_plan_item(t) for t in upcoming_tasks],
+        "time_bound_count": time_bound_count,
+        "overdue_count": overdue_count,
+        "partial": partial
+    }
+    _cache_plan(cache_key, plan)
+    return _plan_response(plan, greeting_time)
+
+def _cache_plan(key: str, plan: dict):
+    # A partial plan is only good until the background Google sync lands
+    if not plan["partial"]:
+        plan_cache.cache.set(key, plan)
+
+def _plan_item(task: Task) -> dict:
+    return TaskResponse.model_validate(task).model_dump()
+
+def _plan_response(plan: dict, greeting_time: str) -> dict:
+    """PlanResponse body; the greeting depends on the hour, so it isn't cached"""
+    count = plan["total_count"]
+    overdue_count = plan["overdue_count"]
+    time_bound_count = plan["time_bound_count"]
     overdue_msg = f" Also, you have {overdue_count} pending tasks from before." if overdue_count > 0 else ""
     
-    if count == 1:
+    if not count and not plan["upcoming"]:
+        msg = f"{greeting_time}! 🙂 Your schedule is looking nice and light today."
+    elif count == 1:
         msg = f"{greeting_time}! You have 1 task today.{overdue_msg} Let's make it count!"
     elif count > 1:
         msg = f"{greeting_time}! You have {count} tasks scheduled today.{overdue_msg} {time_bound_count} are time-sensitive."
     elif overdue_count > 0:
         msg = f"{greeting_time}! Nothing new for today, but you have {overdue_count} tasks carried over from before."
     else:
-        msg = f"{greeting_time}! Nothing scheduled for today, but you have {len(upcoming_tasks)} upcoming tasks."
+        msg = f"{greeting_time}! Nothing scheduled for today, but you have {len(plan['upcoming'])} upcoming tasks."
 
     return {
         "morning_message": msg,
-        "user_name": user_name,
-        "sections": sections,
+        "user_name": plan["user_name"],
+        "sections": plan["sections"],
         "total_count": count,
-        "upcoming": upcoming_tasks,
-        "time_bound_count": time_bound_count
+        "upcoming": plan["upcoming"],
+        "time_bound_count": time_bound_count,
+        "partial": plan["partial"]
     }
 
 async def get_end_of_day_summary(db: AsyncSession, user_id: int):
@@ -558,30 +696,21 @@ async def get_end_of_day_summary(db: AsyncSession, user_id: int):
         "pending_items": pending
     }
 
-async def get_user_insights(db: AsyncSession, user_id: int):
+async def get_user_insights(db: AsyncSession, user_id: int, range_name: str = None):
     """
-    Calculate productivity metrics for the Insights screen
+    Calculate productivity metrics for the Insights screen.
+    range_name ("week" / "month") adds per-day history from the daily rollup.
     """
-    from datetime import datetime
-    
     # helper for percentage
     def get_pct(part, whole):
         return int((part / whole) * 100) if whole > 0 else 0
 
-    # 1. Total Tasks
-    result = await db.execute(select(Task).filter(Task.user_id == user_id))
-    all_tasks = result.scalars().all()
-    
-    total = len(all_tasks)
-    completed = len([t for t in all_tasks if t.status == 'completed'])
-    pending = len([t for t in all_tasks if t.status == 'pending'])
-    
-    # 2. Overdue Check
-    now = datetime.now()
-    overdue = 0
-    for t in all_tasks:
-        if t.status == 'pending' and t.due_date and t.due_date < now:
-            overdue += 1
+    # 1. Counters (kept current on every task change, so this is one row lookup)
+    stats = await task_stats_service.get_stats(db, user_id)
+    total = stats["total_tasks"]
+    completed = stats["completed_tasks"]
+    pending = stats["pending_tasks"]
+    overdue = stats["overdue_tasks"]
             
     completion_rate = get_pct(completed, total)
     
@@ -591,7 +720,7 @@ async def get_user_insights(db: AsyncSession, user_id: int):
     score = (completion_rate * 5) + (completed * 10) - (overdue * 20)
     if score < 0: score = 0
     
-    return {
+    insights = {
         "total_tasks": total,
         "completed_tasks": completed,
         "pending_tasks": pending,
@@ -600,6 +729,13 @@ async def get_user_insights(db: AsyncSession, user_id: int):
         "productivity_score": score
     }
 
+    # 4. History: one row per local day, straight from the rollup
+    if range_name:
+        today = daily_stats_service.local_day(datetime.now(timezone.utc))
+        insights["history"] = await daily_stats_service.get_range(db, user_id, range_name, today)
+    return insights
+
+async def delete_task(db: AsyncSession, task_id: int, user_id: int):
     from app.models.notification import Notification
     
     db_task = await get_task(db, task_id, user_id)
@@ -629,6 +765,9 @@ async def get_user_insights(db: AsyncSession, user_id: int):
         if n.data and n.data.get("task_id") == str(task_id):
             await db.delete(n)
     
+    await task_stats_service.record_deleted(db, db_task)
     await db.delete(db_task)
+    await plan_cache.invalidate(db, user_id)
     await db.commit()
+    reminder_engine.unschedule_task(task_id)
     return db_task
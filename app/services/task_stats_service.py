@@ -0,0 +1,125 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task
+from app.models.user_task_stats import UserTaskStats
+from app.services import daily_stats_service
+
+# Counter columns, in the order used by contribution()
+COUNTERS = ("total_tasks", "completed_tasks", "pending_tasks", "overdue_tasks")
+
+
+def is_overdue(task: Task) -> bool:
+    """
+    A task counts as overdue once the sweep has processed its Due Now stage
+    while it is still pending. Rescheduling resets last_fired_stage, so a
+    task moved into the future stops counting automatically.
+    """
+    return task.status == "pending" and task.due_date is not None and task.last_fired_stage == 0
+
+
+def contribution(task: Task) -> tuple:
+    """What a single task adds to each counter"""
+    return (
+        1,
+        int(task.status == "completed"),
+        int(task.status == "pending"),
+        int(is_overdue(task)),
+    )
+
+
+async def apply_delta(db: AsyncSession, user_id: int, delta: tuple):
+    """Add a delta to the user's counters (creates the row on first use)"""
+    if user_id is None or not any(delta):
+        return
+    values = dict(zip(COUNTERS, delta))
+    stmt = insert(UserTaskStats).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserTaskStats.user_id],
+        set_={
+            **{name: getattr(UserTaskStats, name) + stmt.excluded[name] for name in COUNTERS},
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(stmt)
+
+
+async def record_created(db: AsyncSession, task: Task):
+    await apply_delta(db, task.user_id, contribution(task))
+    await daily_stats_service.apply_delta(db, task.user_id, daily_stats_service.contribution(task))
+
+
+async def record_deleted(db: AsyncSession, task: Task):
+    await apply_delta(db, task.user_id, tuple(-c for c in contribution(task)))
+    await daily_stats_service.apply_delta(
+        db, task.user_id, {k: -v for k, v in daily_stats_service.contribution(task).items()}
+    )
+
+
+class TaskStatsTracker:
+    """
+    Snapshot tasks before they are modified, then flush() the net change of
+    every watched task into the counters and the daily rollup (within the
+    caller's transaction).
+    """
+
+    def __init__(self):
+        self._watched = {}  # id(task) -> (task, contribution, daily contribution at last flush)
+
+    def watch(self, task: Task):
+        self._watched[id(task)] = (task, contribution(task), daily_stats_service.contribution(task))
+
+    async def flush(self, db: AsyncSession):
+        per_user, per_user_daily = {}, {}
+        for key, (task, before, daily_before) in self._watched.items():
+            after = contribution(task)
+            if after != before:
+                total = per_user.get(task.user_id, (0, 0, 0, 0))
+                per_user[task.user_id] = tuple(t + a - b for t, a, b in zip(total, after, before))
+            daily_after = daily_stats_service.contribution(task)
+            daily = per_user_daily.setdefault(task.user_id, {})
+            for k, v in daily_stats_service.diff(daily_after, daily_before).items():
+                daily[k] = daily.get(k, 0) + v
+            self._watched[key] = (task, after, daily_after)
+        for user_id, delta in per_user.items():
+            await apply_delta(db, user_id, delta)
+        for user_id, delta in per_user_daily.items():
+            await daily_stats_service.apply_delta(db, user_id, {k: v for k, v in delta.items() if v})
+
+
+async def get_stats(db: AsyncSession, user_id: int) -> dict:
+    """O(1) read of the user's counters (counted from the tasks table if the row is missing)"""
+    stats = await db.get(UserTaskStats, user_id)
+    if stats is None:
+        return await count_tasks(db, user_id)
+    return {name: getattr(stats, name) for name in COUNTERS}
+
+
+async def count_tasks(db: AsyncSession, user_id: int) -> dict:
+    """
+    The counters straight from the tasks table: one aggregate, answered by an
+    index-only scan of ix_tasks_user_status_due.
+    """
+    query = select(
+        func.count(),
+        func.count().filter(Task.status == "completed"),
+        func.count().filter(Task.status == "pending"),
+        func.count().filter(
+            (Task.status == "pending") & (Task.due_date != None) & (Task.last_fired_stage == 0)
+        ),
+    ).filter(Task.user_id == user_id)
+    counts = (await db.execute(query)).one()
+    return dict(zip(COUNTERS, counts))
+
+
+async def recompute(db: AsyncSession, user_id: int) -> dict:
+    """Rebuild one user's counters from the tasks table (repairs drift)"""
+    values = await count_tasks(db, user_id)
+
+    stmt = insert(UserTaskStats).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserTaskStats.user_id],
+        set_={**values, "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+    return values
@@ -3,6 +3,7 @@ from sqlalchemy import select
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import get_password_hash, verify_password
+from app.services import plan_cache
 
 async def create_user(db: AsyncSession, user_in: UserCreate):
     hashed_password = get_password_hash(user_in.password)
@@ -27,6 +28,8 @@ async def update_user_profile(db: AsyncSession, user_id: int, user_update: dict)
         for key, value in user_update.items():
             if hasattr(db_user, key):
                 setattr(db_user, key, value)
+        # The daily plan greets the user by name
+        await plan_cache.invalidate(db, user_id)
         await db.commit()
         await db.refresh(db_user)
     return db_user
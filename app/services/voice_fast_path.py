@@ -0,0 +1,289 @@
+"""
+Deterministic parser for the most common voice command shapes:
+
+    "remind me to call mom at 5 pm tomorrow"
+    "add task to pay rent on monday at 10am"
+    "find hospitals near me"
+
+It returns the same dict as ai_service.process_voice_command, or None when it
+is not confident, in which case the command goes to the LLM as before.
+Anything unusual (recurrence, durations, several tasks in one sentence,
+ambiguous hours, unknown verbs) is left to the model on purpose.
+"""
+
+import re
+import time
+import logging
+from datetime import datetime, timedelta
+from dateutil import parser
+
+logger = logging.getLogger(__name__)
+
+TASK_PREFIX = re.compile(
+    r"^(?:(?:please|hey lara|lara|ok|okay)[, ]+)*"
+    r"(?P<kind>remind me to|set a reminder to|add (?:a )?task to|add a reminder to|i need to|i have to|i must)\s+(?P<rest>.+)$"
+)
+NEARBY = re.compile(
+    r"^(?:(?:please|hey lara|lara|ok|okay)[, ]+)*"
+    r"(?:find|search for|show me|look for|i'?m looking for|where is)\s+(?:(?:the|a|an|some|me)\s+)*"
+    r"(?P<near1>nearest |closest |nearby )?(?P<category>[a-z][a-z ]{1,30}?)"
+    r"(?P<near2>\s+(?:near me|nearby|around me|close by|close to me|near here))?$"
+)
+
+CLOCK = re.compile(
+    r"\b(?:at\s+)?(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?P<ampm>a\.?\s?m\.?|p\.?\s?m\.?|o'?\s?clock)?(?=\s|$)"
+)
+PART_OF_DAY = re.compile(r"\b(?:in the\s+)?(?P<part>morning|afternoon|evening|tonight|night)\b")
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAY_WORD = re.compile(r"\b(?:(?P<rel>day after tomorrow|tomorrow|today)|(?:on\s+|next\s+|this\s+)?(?P<weekday>" + "|".join(WEEKDAYS) + r"))\b")
+
+# First words of titles we are sure are a plain action
+KNOWN_VERBS = {
+    "attend", "book", "bring", "buy", "call", "cancel", "charge", "check", "clean", "collect", "cook",
+    "do", "drink", "drop", "email", "exercise", "feed", "fill", "finish", "fix", "get", "go", "join",
+    "make", "meet", "message", "order", "pack", "pay", "pick", "prepare", "practice", "print", "read",
+    "renew", "reply", "return", "review", "send", "ship", "start", "study", "submit", "take", "text",
+    "visit", "walk", "wash", "watch", "water", "wish", "write",
+}
+# Words that mean the sentence carries more than one title + one time
+LOW_CONFIDENCE = re.compile(
+    r"\b(?:and|or|then|every|daily|weekly|monthly|each|from|until|till|between|for \d+|hours?|minutes?|"
+    r"not|don'?t|never|cancel|delete|remove|after|before|later|noon|midnight|weekend|week|month|am|pm|o'?clock)\b|\d"
+)
+TITLE_SMALL_WORDS = {"a", "an", "the", "to", "of", "for", "with", "at", "on", "in", "up"}
+SECOND_PERSON = {"i": "you", "me": "you", "my": "your", "mine": "yours", "myself": "yourself", "our": "your"}
+
+
+class FastPathStats:
+    """How much voice traffic the fast path answers without the model"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.hits = {}          # intent -> count
+        self.fast_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def record_hit(self, intent: str, seconds: float):
+        self.hits[intent] = self.hits.get(intent, 0) + 1
+        self.fast_seconds += seconds
+
+    def record_llm(self, seconds: float):
+        self.llm_calls += 1
+        self.llm_seconds += seconds
+
+    def snapshot(self) -> dict:
+        hits = sum(self.hits.values())
+        return {
+            "attempts": self.attempts,
+            "hits": hits,
+            "hits_by_intent": dict(self.hits),
+            "hit_rate": round(hits / self.attempts, 4) if self.attempts else 0,
+            "avg_fast_path_ms": round(self.fast_seconds / hits * 1000, 3) if hits else 0,
+            "llm_calls": self.llm_calls,
+            "avg_llm_ms": round(self.llm_seconds / self.llm_calls * 1000, 1) if self.llm_calls else 0,
+        }
+
+
+fast_path_stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[!?]+$|\.$", "", text).strip()
+    return re.sub(r"\s+", " ", text)
+
+
+def _clock_label(dt: datetime, full: bool) -> str:
+    """5:00 PM (full) / 5 PM or 5:30 PM (spoken)"""
+    hour = dt.strftime("%I").lstrip("0")
+    if full or dt.minute:
+        return f"{hour}:{dt.strftime('%M %p')}"
+    return f"{hour} {dt.strftime('%p')}"
+
+
+def _day_label(dt: datetime, now: datetime) -> str:
+    days = (dt.date() - now.date()).days
+    if days == 0:
+        return "today"
+    if days == 1:
+        return "tomorrow"
+    return dt.strftime("%A")
+
+
+def _title(body: str) -> str:
+    words = [w for w in body.split() if w not in ("my", "our", "your")]
+    return " ".join(
+        w if (i and w in TITLE_SMALL_WORDS) else w[:1].upper() + w[1:]
+        for i, w in enumerate(words)
+    )
+
+
+def _second_person(body: str) -> str:
+    return " ".join(SECOND_PERSON.get(w, w) for w in body.split())
+
+
+def _extract_when(rest: str, now: datetime):
+    """(body without the date/time words, due datetime) or None if unsure"""
+    clocks = list(CLOCK.finditer(rest))
+    if len(clocks) != 1:
+        return None
+    clock = clocks[0]
+    hour = int(clock.group("hour"))
+    minute = int(clock.group("minute") or 0)
+    ampm = (clock.group("ampm") or "").replace(".", "").replace(" ", "")
+    rest = rest[:clock.start()] + " " + rest[clock.end():]
+
+    part = None
+    parts = list(PART_OF_DAY.finditer(rest))
+    if len(parts) > 1:
+        return None
+    if parts:
+        part = parts[0].group("part")
+        rest = rest[:parts[0].start()] + " " + rest[parts[0].end():]
+
+    if minute > 59 or hour > 23:
+        return None
+    if ampm in ("am", "pm"):
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm == "pm" else 0)
+        if part and (part == "morning") != (ampm == "am"):
+            return None
+    elif hour > 12:
+        pass  # 24h clock
+    elif part == "morning":
+        hour = hour % 12
+    elif part in ("afternoon", "evening", "tonight", "night"):
+        hour = hour % 12 + 12
+    else:
+        # "at 5" could be either; let the model ask or decide
+        return None
+
+    days = list(DAY_WORD.finditer(rest))
+    if len(days) > 1:
+        return None
+    explicit_day = None
+    if days:
+        day = days[0]
+        rel, weekday = day.group("rel"), day.group("weekday")
+        if rel:
+            explicit_day = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}[rel]
+        else:
+            explicit_day = (WEEKDAYS.index(weekday) - now.weekday() - 1) % 7 + 1
+        rest = rest[:day.start()] + " " + rest[day.end():]
+    elif part == "tonight":
+        explicit_day = 0
+
+    due = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=explicit_day or 0)
+    if due <= now:
+        if explicit_day is not None:
+            # "today at 9 am" at noon: not something to guess
+            return None
+        # Times that have passed today mean tomorrow
+        due += timedelta(days=1)
+
+    body = re.sub(r"\s+", " ", rest).strip()
+    body = re.sub(r"\s+(?:at|on|by)$", "", body)
+    return body, due
+
+
+def _task(match, now: datetime):
+    if now is None:
+        return None
+    when = _extract_when(match.group("rest"), now)
+    if not when:
+        return None
+    body, due = when
+    words = body.split()
+    if not words or len(words) > 8 or words[0] not in KNOWN_VERBS:
+        return None
+    if LOW_CONFIDENCE.search(body) or not re.fullmatch(r"[a-z' ]+", body):
+        return None
+
+    is_reminder = "remind" in match.group("kind")
+    day = _day_label(due, now)
+    action = _second_person(body)
+    return {
+        "status": "ready",
+        "intent": "CreateTask",
+        "title": _title(body),
+        "corrected_sentence": f"You have a {'reminder' if is_reminder else 'task'} to {action} {day if day in ('today', 'tomorrow') else 'on ' + day} at {_clock_label(due, True)}.",
+        "time": due.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end_time": None,
+        "category": None,
+        "destination": None,
+        "type": "reminder" if is_reminder else "task",
+        "message": f"Got it. I've set a {'reminder' if is_reminder else 'task'} to {action} for {day} at {_clock_label(due, False)}.",
+        "is_cancelled": False
+    }
+
+
+def _nearby(match):
+    # Only "near me"-style searches; "find my keys" is not a map search
+    if not (match.group("near1") or match.group("near2")):
+        return None
+    category = match.group("category").strip()
+    words = category.split()
+    if not words or len(words) > 3 or LOW_CONFIDENCE.search(category) or words[0] in ("my", "your", "me"):
+        return None
+
+    plural = category
+    last = words[-1]
+    if last.endswith("ies"):
+        last = last[:-3] + "y"
+    elif last.endswith(("ches", "shes", "sses")):
+        last = last[:-2]
+    elif last.endswith("s") and not last.endswith("ss"):
+        last = last[:-1]
+    elif last.endswith("y") and last[-2:-1] not in "aeiou":
+        plural = f"{category[:-1]}ies"
+    else:
+        plural = f"{category}s"
+    singular = " ".join(words[:-1] + [last])
+
+    return {
+        "status": "ready",
+        "intent": "NearbySearch",
+        "title": f"Find {_title(plural)}",
+        "corrected_sentence": f"You want to find {plural} nearby.",
+        "time": None,
+        "end_time": None,
+        "category": singular,
+        "destination": None,
+        "type": "map_search",
+        "message": f"Searching for {plural} nearby...",
+        "is_cancelled": False
+    }
+
+
+def parse(text: str, current_time: str = None):
+    """
+    Voice command -> process_voice_command response, or None to use the LLM.
+    Times are resolved against the client's current_time (local wall clock),
+    so task commands without it always go to the model.
+    """
+    started = time.perf_counter()
+    fast_path_stats.attempts += 1
+    result = None
+    try:
+        now = None
+        if current_time:
+            now = parser.parse(current_time).replace(tzinfo=None)
+        normalized = _normalize(text or "")
+
+        match = TASK_PREFIX.match(normalized)
+        if match:
+            result = _task(match, now)
+        else:
+            match = NEARBY.match(normalized)
+            if match:
+                result = _nearby(match)
+    except (ValueError, OverflowError) as e:
+        logger.debug(f"Fast path skipped '{text}': {e}")
+        result = None
+
+    if result:
+        fast_path_stats.record_hit(result["intent"], time.perf_counter() - started)
+        logger.info(f"⚡ [FastPath] '{text}' -> {result['intent']} '{result['title']}' {result['time'] or ''}")
+    return result
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache with LRU eviction and a per-entry TTL.
+    Optionally persisted to a JSON file so entries survive restarts.
+    Not thread-safe; meant for use from the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, path: str = None, save_every: int = 50):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self.path = path
+        self.save_every = save_every
+        # key -> (value, expires_at as wall-clock time so it survives a restart)
+        self._data = OrderedDict()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            self.load()
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value):
+        self._data[key] = (value, time.time() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+        self._unsaved += 1
+        if self.path and self._unsaved >= self.save_every:
+            self.save()
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "persistent": bool(self.path),
+        }
+
+    def load(self):
+        """Read persisted entries, dropping expired ones"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ [Cache] Could not load {self.path}: {e}")
+            return
+        now = time.time()
+        # File is written oldest first, so LRU order is restored as well
+        for key, value, expires_at in entries:
+            if expires_at > now:
+                self._data[key] = (value, expires_at)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        logger.info(f"📦 [Cache] Loaded {len(self._data)} entries from {self.path}")
+
+    def save(self):
+        """Write live entries to disk (atomic replace)"""
+        if not self.path:
+            return
+        now = time.time()
+        entries = [[key, value, expires_at] for key, (value, expires_at) in self._data.items() if expires_at > now]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            self._unsaved = 0
+        except OSError as e:
+            logger.warning(f"⚠️ [Cache] Could not save {self.path}: {e}")
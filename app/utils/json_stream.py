@@ -0,0 +1,50 @@
+import json
+import re
+
+# One top-level `"key": scalar` pair, anchored at the current position
+_FIELD = re.compile(
+    r'\s*[{,]?\s*"(?P<key>[A-Za-z_][A-Za-z0-9_]*)"\s*:\s*'
+    r'(?P<value>"(?:[^"\\]|\\.)*"|null|true|false|-?\d+(?:\.\d+)?(?=\s*[,}]))'
+)
+
+
+class JsonFieldStream:
+    """
+    Pulls the scalar fields of a flat JSON object out of a streamed completion
+    as soon as each one is complete, e.g. "corrected_sentence" while the model
+    is still writing "message". Stops at the first value it can't read
+    (nested objects/arrays); the caller parses the full text at the end anyway.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = None
+        self._stuck = False
+
+    def feed(self, chunk: str) -> list:
+        """Add streamed text; returns the (key, value) pairs completed by it"""
+        self.text += chunk or ""
+        if self._pos is None:
+            start = self.text.find("{")
+            if start < 0:
+                return []
+            self._pos = start
+        fields = []
+        while not self._stuck:
+            match = _FIELD.match(self.text, self._pos)
+            if not match:
+                # Partial pair: wait for more text. Anything else: give up streaming fields
+                rest = self.text[self._pos:].lstrip(" \n\r\t{,")
+                if rest and not rest.startswith('"') and not rest.startswith("}"):
+                    self._stuck = True
+                break
+            fields.append((match.group("key"), json.loads(match.group("value"))))
+            self._pos = match.end()
+        return fields
+
+    def result(self) -> dict:
+        """The complete object (tolerates text around the JSON)"""
+        start, end = self.text.find("{"), self.text.rfind("}")
+        if start < 0 or end < start:
+            raise ValueError("No JSON object in completion")
+        return json.loads(self.text[start:end + 1])
@@ -0,0 +1,230 @@
+"""
+Load test for the AI service against a local fake Groq server.
+
+Drives generate_friendly_reminder, generate_ai_summary, process_voice_command
+and the /tasks/process-voice endpoints at increasing concurrency and reports
+throughput, p50/p95/p99 latency, errors and event-loop lag.
+
+    python tests/bench_ai_service.py --latency-ms 800 --jitter-ms 200 --levels 1,10,25,50
+
+The endpoint scenarios need the database from DATABASE_URL (the overlap check
+queries it); pass --skip-endpoints without one.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="AI service load test")
+    arg_parser.add_argument("--latency-ms", type=float, default=800)
+    arg_parser.add_argument("--jitter-ms", type=float, default=200)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--levels", default="1,10,25,50", help="Concurrency levels, comma separated")
+    arg_parser.add_argument("--requests-per-level", type=int, default=0, help="Default: 2x the concurrency (min 10)")
+    arg_parser.add_argument("--scenarios", default="reminder,summary,voice,endpoint,endpoint_stream")
+    arg_parser.add_argument("--skip-endpoints", action="store_true")
+    arg_parser.add_argument("--groq-concurrency", type=int, default=None, help="Overrides GROQ_MAX_CONCURRENCY")
+    return arg_parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_groq(port: int):
+    """Serve the fake Groq API from a background thread (its own event loop)"""
+    import uvicorn
+    from tests.fake_groq_server import app as fake_app
+
+    server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+class LoopLagMonitor:
+    """Measures how late a 10 ms sleep wakes up, i.e. how long the loop was blocked"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - started - self.interval, 0))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> dict:
+        self._task.cancel()
+        samples = sorted(self.samples) or [0]
+        return {"p99_ms": percentile(samples, 0.99) * 1000, "max_ms": samples[-1] * 1000}
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(int(len(sorted_values) * p), len(sorted_values) - 1)]
+
+
+async def run_level(name: str, make_call, concurrency: int, total: int) -> dict:
+    """Run `total` calls with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await make_call(i)
+            except Exception as e:
+                ok = False
+                if errors == 0:
+                    print(f"   [WARN] {name}: {type(e).__name__}: {e}", flush=True)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    lag = LoopLagMonitor()
+    lag.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - started
+    loop_lag = lag.stop()
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput": total / elapsed if elapsed else 0,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0,
+        "errors": errors,
+        "lag_p99_ms": loop_lag["p99_ms"],
+        "lag_max_ms": loop_lag["max_ms"],
+    }
+
+
+def print_row(row: dict):
+    print(
+        f"{row['scenario']:<16}{row['concurrency']:>6}{row['requests']:>8}"
+        f"{row['throughput']:>10.1f}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}"
+        f"{row['errors']:>8}{row['lag_p99_ms']:>10.1f}{row['lag_max_ms']:>10.1f}",
+        flush=True
+    )
+
+
+async def main(args):
+    from unittest.mock import AsyncMock, patch
+    from types import SimpleNamespace
+    import httpx
+    from app.core.config import settings
+    from app.services import ai_service
+    from app.core.groq_client import close_groq_client
+    from app.core.llm_telemetry import llm_telemetry
+    from tests import fake_groq_server
+
+    fake_groq_server.config.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    # Measure the model path: no local parser, no caches (every input is unique anyway)
+    settings.VOICE_FAST_PATH_ENABLED = False
+    user = SimpleNamespace(id=1, full_name="Bench User")
+
+    async def reminder(i):
+        return bool(await ai_service.generate_friendly_reminder(f"Bench task {i} {time.time()}", "05:00 PM", 10, fallback=False))
+
+    async def summary(i):
+        tasks = [SimpleNamespace(title=f"Task {n}", due_date=None) for n in range(5)]
+        return bool(await ai_service.generate_ai_summary("MORNING", f"User {i}", tasks, fallback=False))
+
+    async def voice(i):
+        res = await ai_service.process_voice_command(f"plan the trip with friends number {i} {time.time()}", None, user.id, "2026-01-28T09:00:00")
+        return res.get("status") != "error"
+
+    scenarios = {"reminder": reminder, "summary": summary, "voice": voice}
+
+    client = None
+    if not args.skip_endpoints:
+        from app.main import app
+        from app.api.deps import get_current_user
+        app.dependency_overrides[get_current_user] = lambda: user
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+        async def endpoint(i):
+            resp = await client.post("/api/v1/tasks/process-voice", json={
+                "text": f"plan the trip with friends number {i} {time.time()}", "current_time": "2026-01-28T09:00:00"
+            })
+            return resp.status_code == 200 and resp.json().get("status") != "error"
+
+        async def endpoint_stream(i):
+            resp = await client.post("/api/v1/tasks/process-voice/stream", json={
+                "text": f"plan the trip with friends number {i} {time.time()}", "current_time": "2026-01-28T09:00:00"
+            })
+            return resp.status_code == 200 and "event: done" in resp.text and '"status": "error"' not in resp.text
+
+        scenarios.update(endpoint=endpoint, endpoint_stream=endpoint_stream)
+
+    levels = [int(level) for level in args.levels.split(",")]
+    print(f"[BENCH] Fake Groq latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, error rate {args.error_rate:.0%}, "
+          f"GROQ_MAX_CONCURRENCY={settings.GROQ_MAX_CONCURRENCY}", flush=True)
+    print("-" * 95, flush=True)
+    print(f"{'scenario':<16}{'conc':>6}{'reqs':>8}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}{'lag p99':>10}{'lag max':>10}", flush=True)
+    print("-" * 95, flush=True)
+
+    # The momentum lookup isn't what this measures (and needs a real session)
+    with patch.object(ai_service, "get_user_insights", AsyncMock(return_value={"completion_rate": 0, "overdue_tasks": 0})):
+        for name in [s.strip() for s in args.scenarios.split(",")]:
+            if name not in scenarios:
+                print(f"[SKIP] {name}", flush=True)
+                continue
+            for concurrency in levels:
+                total = args.requests_per_level or max(concurrency * 2, 10)
+                print_row(await run_level(name, scenarios[name], concurrency, total))
+
+    print("-" * 95, flush=True)
+    print(f"[INFO] Fake server saw {fake_groq_server.stats['requests']} requests, "
+          f"max {fake_groq_server.stats['max_in_flight']} in flight", flush=True)
+    for site, data in llm_telemetry.snapshot()["call_sites"].items():
+        print(f"[INFO] {site}: {data['requests']} requests, outcomes {data['outcomes']}, "
+              f"queue avg {data['avg_queue_seconds'] * 1000:.0f} ms, tokens {data['prompt_tokens']}+{data['completion_tokens']}", flush=True)
+
+    if client:
+        await client.aclose()
+    await close_groq_client()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    port = free_port()
+    # Must be set before app.core.config / groq_client are imported
+    os.environ["GROQ_API_KEY"] = "fake-key"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+    if args.groq_concurrency:
+        os.environ["GROQ_MAX_CONCURRENCY"] = str(args.groq_concurrency)
+
+    server = start_fake_groq(port)
+    try:
+        asyncio.run(main(args))
+    finally:
+        server.should_exit = True
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the Groq API (OpenAI-compatible chat completions) with
+configurable latency, jitter and error rate, for load tests.
+
+Run standalone:
+    python tests/fake_groq_server.py --port 8765 --latency-ms 800 --jitter-ms 200
+and point the app at it:
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+
+tests/bench_ai_service.py starts it in-process.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Tunable at runtime (the benchmark changes them between scenarios)
+config = {"latency_ms": 800.0, "jitter_ms": 200.0, "error_rate": 0.0}
+stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+app = FastAPI(title="Fake Groq")
+
+VOICE_JSON = {
+    "status": "ready",
+    "intent": "CreateTask",
+    "title": "Plan Trip",
+    "corrected_sentence": "You want to plan the trip with your friends tomorrow at 10:00 AM.",
+    "time": "2026-01-29T10:00:00",
+    "end_time": None,
+    "category": None,
+    "destination": None,
+    "type": "task",
+    "message": "Got it. I've added planning the trip for tomorrow at 10 AM."
+}
+
+
+def _delay() -> float:
+    jitter = random.uniform(-config["jitter_ms"], config["jitter_ms"])
+    return max(config["latency_ms"] + jitter, 0) / 1000
+
+
+def _content(body: dict) -> str:
+    if (body.get("response_format") or {}).get("type") == "json_object" or "JSON object" in json.dumps(body.get("messages", [])):
+        return json.dumps(VOICE_JSON)
+    return "Hey! Quick heads-up: your task is coming up soon. You've got this! 💪"
+
+
+def _usage(body: dict, content: str) -> dict:
+    # Rough token estimate (~4 chars per token) so the telemetry has numbers to add up
+    prompt = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+    completion = len(content) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        delay = _delay()
+        if random.random() < config["error_rate"]:
+            await asyncio.sleep(delay / 4)
+            return JSONResponse(status_code=503, content={"error": {"message": "Service unavailable (fake)", "type": "server_error"}})
+
+        content = _content(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "llama-3.1-8b-instant")
+        usage = _usage(body, content)
+
+        if body.get("stream"):
+            # Time to first token is the configured latency, the rest streams quickly
+            await asyncio.sleep(delay)
+
+            async def events():
+                pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+                for index, piece in enumerate(pieces):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    if index == len(pieces) - 1:
+                        chunk["choices"][0]["finish_reason"] = "stop"
+                        chunk["x_groq"] = {"id": completion_id, "usage": usage}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(0.005)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(delay)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+    finally:
+        stats["in_flight"] -= 1
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    arg_parser = argparse.ArgumentParser(description="Fake Groq API")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--latency-ms", type=float, default=800)
+    arg_parser.add_argument("--jitter-ms", type=float, default=200)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    args = arg_parser.parse_args()
+    config.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
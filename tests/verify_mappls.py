@@ -1,7 +1,7 @@
 import asyncio
 import sys
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -59,10 +59,11 @@ async def test_mappls_integration():
     print("[TEST] 3. Testing AI Intent Injection...", flush=True)
     
     with patch('app.services.ai_service.get_groq_client') as mock_groq, \
+         patch('app.services.ai_service.create_chat_completion', new_callable=AsyncMock) as mock_create, \
          patch('app.services.ai_service.get_user_insights') as mock_insights:
         
         mock_chat = MagicMock()
-        mock_groq.return_value.chat.completions.create.return_value = mock_chat
+        mock_create.return_value = mock_chat
         
         # Simulate AI identifying 'NearbySearch'
         mock_chat.choices = [MagicMock()]
@@ -1,7 +1,7 @@
 import asyncio
 import sys
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -16,28 +16,35 @@ async def test_adaptive_logic():
     
     # We need to mock get_user_insights to return specific momentum states
     with patch('app.services.ai_service.get_user_insights') as mock_insights, \
-         patch('app.services.ai_service.get_groq_client') as mock_client_getter:
+         patch('app.services.ai_service.get_groq_client') as mock_client_getter, \
+         patch('app.services.ai_service.create_chat_completion', new_callable=AsyncMock) as mock_create:
              
         # Setup Mock API Client to capture the prompt
-        mock_client = MagicMock()
-        mock_client_getter.return_value = mock_client
+        mock_client_getter.return_value = MagicMock()
         mock_completion = MagicMock()
         
         # Mock the API response to avoid actual network call errors
         mock_completion.choices = [MagicMock()]
         mock_completion.choices[0].message.content = '{"status": "ready", "title": "Test Task", "corrected_sentence": "Test", "time": null}'
-        mock_client.chat.completions.create.return_value = mock_completion
+        mock_create.return_value = mock_completion
 
-        from app.services.ai_service import process_voice_command
+        from app.services.ai_service import process_voice_command, voice_cache, _voice_inflight
+
+        def reset_voice_cache():
+            # Each case must reach the (mocked) model, not a cached parse
+            voice_cache.clear()
+            _voice_inflight.clear()
+            mock_create.reset_mock()
 
         # TEST 1: Low Energy (16:00 / 4 PM), Low Momentum (Overwhelmed)
         print("Test Case 1: 4 PM (Afternoon Slump) + Low Momentum")
         mock_insights.return_value = {"completion_rate": 10, "overdue_tasks": 10} # Low momentum
+        reset_voice_cache()
         
         await process_voice_command("add task", mock_db, user_id, current_time="2026-02-05T16:00:00")
         
         # Capture calls
-        call_args = mock_client.chat.completions.create.call_args
+        call_args = mock_create.call_args
         messages = call_args[1]['messages']
         system_prompt = messages[0]['content']
         
@@ -52,11 +59,12 @@ async def test_adaptive_logic():
         # TEST 2: High Energy (9:00 / 9 AM), High Momentum (Crushing it)
         print("Test Case 2: 9 AM (Morning Freshness) + High Momentum")
         mock_insights.return_value = {"completion_rate": 80, "overdue_tasks": 0} # High momentum
+        reset_voice_cache()
         
         await process_voice_command("add task", mock_db, user_id, current_time="2026-02-05T09:00:00")
         
         # Capture calls
-        call_args = mock_client.chat.completions.create.call_args
+        call_args = mock_create.call_args
         messages = call_args[1]['messages']
         system_prompt = messages[0]['content']
         
@@ -0,0 +1,84 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.voice_fast_path import parse, fast_path_stats
+
+# Wednesday afternoon
+NOW = "2026-01-28T14:30:00"
+
+HITS = [
+    ("remind me to call my mom at 5 pm tomorrow", "Call Mom", "2026-01-29T17:00:00"),
+    ("Remind me to call mom tomorrow morning 5 o'clock", "Call Mom", "2026-01-29T05:00:00"),
+    ("add task to pay rent on monday at 10am", "Pay Rent", "2026-02-02T10:00:00"),
+    ("please remind me to take my medicine at 9:30 pm", "Take Medicine", "2026-01-28T21:30:00"),
+    ("remind me to water the plants at 8 am", "Water the Plants", "2026-01-29T08:00:00"),
+    ("i need to submit the report at 18:00", "Submit the Report", "2026-01-28T18:00:00"),
+]
+
+NEARBY = [
+    ("find hospitals near me", "hospital"),
+    ("find the nearest pharmacy", "pharmacy"),
+    ("search for gas stations nearby", "gas station"),
+]
+
+# Left to the LLM
+MISSES = [
+    "remind me to call mom at 5",                        # am or pm?
+    "remind me to call mom and buy milk at 5 pm",        # two tasks
+    "remind me to exercise every day at 7 am",           # recurrence
+    "add task to meeting with team from 2 pm to 3 pm",   # duration
+    "remind me to call mom today at 9 am",               # already passed today
+    "i meeting my friends at 6 pm",                      # broken grammar
+    "remind me to call mom tomorrow",                    # no time
+    "find my keys",                                      # not a map search
+    "book a hotel in chennai for tomorrow",              # other intents
+    "what's the weather like",
+]
+
+
+def verify_voice_fast_path():
+    print("[TEST] Starting Voice Fast Path Verification...", flush=True)
+    print("-" * 30, flush=True)
+
+    print("[TEST] 1. Task commands...", flush=True)
+    for text, title, time in HITS:
+        res = parse(text, NOW)
+        if res and res["intent"] == "CreateTask" and res["title"] == title and res["time"] == time and res["status"] == "ready":
+            print(f"[PASS] '{text}' -> {res['title']} @ {res['time']} | {res['message']}", flush=True)
+        else:
+            print(f"[FAIL] '{text}' -> {res}", flush=True)
+
+    print("-" * 30, flush=True)
+    print("[TEST] 2. Nearby searches...", flush=True)
+    for text, category in NEARBY:
+        res = parse(text, NOW)
+        if res and res["intent"] == "NearbySearch" and res["category"] == category:
+            print(f"[PASS] '{text}' -> {res['category']} | {res['message']}", flush=True)
+        else:
+            print(f"[FAIL] '{text}' -> {res}", flush=True)
+
+    print("-" * 30, flush=True)
+    print("[TEST] 3. Low confidence falls through to the LLM...", flush=True)
+    for text in MISSES:
+        res = parse(text, NOW)
+        if res is None:
+            print(f"[PASS] '{text}' -> LLM", flush=True)
+        else:
+            print(f"[FAIL] '{text}' was parsed locally: {res}", flush=True)
+
+    print("-" * 30, flush=True)
+    print("[TEST] 4. Task commands need the client's current time...", flush=True)
+    if parse("remind me to call mom at 5 pm tomorrow") is None:
+        print("[PASS] No current_time -> LLM", flush=True)
+    else:
+        print("[FAIL] Parsed without current_time", flush=True)
+
+    print("-" * 30, flush=True)
+    print(f"[INFO] Stats: {fast_path_stats.snapshot()}", flush=True)
+
+
+if __name__ == "__main__":
+    verify_voice_fast_path()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import app.main
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.utils.json_stream import JsonFieldStream
+from app.services import ai_service
+
+NOW = "2026-01-28T14:30:00"
+
+# Key order of the prompt's examples: the sentence leads
+TASK = {
+    "corrected_sentence": "You are meeting your friends today at 6:00 PM.",
+    "status": "ready",
+    "intent": "CreateTask",
+    "title": "Meet Friends",
+    "time": "2026-01-28T18:00:00",
+    "end_time": None,
+    "type": "task",
+    "message": "Got it. I've added meeting your friends at 6 PM.",
+}
+
+# A model that ignored the example order
+LATE_SENTENCE = {
+    "status": "ready",
+    "intent": "NearbySearch",
+    "title": "Find Pharmacies",
+    "category": "pharmacy",
+    "corrected_sentence": "You want to find pharmacies nearby.",
+    "type": "map_search",
+    "message": "Searching for pharmacies nearby...",
+}
+
+
+def chunked(obj: dict, size: int = 7):
+    text = json.dumps(obj, indent=2)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def fake_stream(obj: dict):
+    async def stream(call_site, **kwargs):
+        for piece in chunked(obj):
+            yield piece
+    return stream
+
+
+async def sse_events(client, text: str, **extra):
+    events = []
+    async with client.stream("POST", "/api/v1/tasks/process-voice/stream",
+                             json={"text": text, "current_time": NOW, **extra}) as resp:
+        body = "".join([chunk async for chunk in resp.aiter_text()])
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def check_order(name: str, events: list, expected_tail: list):
+    kinds = [kind for kind, _ in events]
+    fields = [kind for kind in kinds if kind == "field"]
+    expected = ["sentence"] + fields + expected_tail
+    if kinds == expected:
+        print(f"[PASS] {name}: {' -> '.join(kinds)}", flush=True)
+    else:
+        print(f"[FAIL] {name}: {kinds}", flush=True)
+
+
+async def verify_voice_stream():
+    print("[TEST] Starting Voice Stream Order Verification...", flush=True)
+    print("-" * 30, flush=True)
+    settings.VOICE_FAST_PATH_ENABLED = False
+
+    print("[TEST] 1. JsonFieldStream emits fields as soon as they are complete...", flush=True)
+    stream = JsonFieldStream()
+    names = [name for piece in chunked(TASK) for name, _ in stream.feed(piece)]
+    if names[:1] == ["corrected_sentence"] and names == list(TASK) and stream.result() == TASK:
+        print(f"[PASS] {names}", flush=True)
+    else:
+        print(f"[FAIL] {names}", flush=True)
+
+    with patch('app.services.ai_service.get_groq_client', return_value=object()), \
+         patch('app.services.ai_service._build_voice_prompt', new_callable=AsyncMock, return_value="prompt"):
+
+        print("-" * 30, flush=True)
+        print("[TEST] 2. stream_voice_command: live stream, then a cached replay...", flush=True)
+        for label in ("live", "replay"):
+            with patch('app.services.ai_service.stream_chat_completion', fake_stream(TASK)):
+                events = [event async for event in ai_service.stream_voice_command("i meeting my friends at 6 pm", None, 1, NOW)]
+            kinds = [event[0] for event in events]
+            first = events[0][1] if events[0][0] == "field" else None
+            if first == "corrected_sentence" and kinds[-2:] == ["draft", "result"] and set(kinds[:-2]) == {"field"}:
+                print(f"[PASS] {label}: corrected_sentence first, {len(kinds) - 2} fields, draft, result", flush=True)
+            else:
+                print(f"[FAIL] {label}: {[event[:2] for event in events]}", flush=True)
+
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="u@x.com")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            print("-" * 30, flush=True)
+            print("[TEST] 3. /process-voice/stream event order...", flush=True)
+            ai_service.voice_cache.clear()
+            with patch('app.services.ai_service.stream_chat_completion', fake_stream(TASK)), \
+                 patch('app.services.task_service.check_time_overlap', new_callable=AsyncMock, return_value=None):
+                check_order("task", await sse_events(client, "i meeting my friends at 6 pm"), ["message", "done"])
+
+            ai_service.voice_cache.clear()
+            existing = SimpleNamespace(title="Gym", type="task", due_date=ai_service.datetime(2026, 1, 28, 12, 30))
+            with patch('app.services.ai_service.stream_chat_completion', fake_stream(TASK)), \
+                 patch('app.services.task_service.check_time_overlap', new_callable=AsyncMock, return_value=existing):
+                check_order("task with conflict", await sse_events(client, "i meeting my friends at 6 pm"),
+                            ["message", "conflict", "done"])
+
+            print("-" * 30, flush=True)
+            print("[TEST] 4. Fields written before the sentence are held until it...", flush=True)
+            places = [{"placeName": "City Pharmacy", "placeAddress": "MG Road", "distance": 450}]
+            with patch('app.services.ai_service.stream_chat_completion', fake_stream(LATE_SENTENCE)), \
+                 patch('app.services.google_maps_service.GoogleMapsService.search_nearby', new_callable=AsyncMock, return_value=places):
+                events = await sse_events(client, "where can i buy medicine around here", lat=13.08, lng=80.27)
+            check_order("nearby search", events, ["message", "places", "done"])
+            held = [list(data)[0] for kind, data in events if kind == "field"]
+            if held[:3] == ["intent", "title", "category"]:
+                print(f"[PASS] Held fields kept their order: {held}", flush=True)
+            else:
+                print(f"[FAIL] Held fields: {held}", flush=True)
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(verify_voice_stream())